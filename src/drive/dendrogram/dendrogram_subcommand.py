@@ -3,6 +3,7 @@ from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Union
 
 import matplotlib.pyplot as plt
+import numpy as np
 import numpy.typing as npt
 import pandas as pd
 import scipy.cluster.hierarchy as sch
@@ -509,14 +510,49 @@ def generate_dendrograms(args) -> None:
         id_list = id_dict["ids"]
         haplotype_list = id_dict["haplotypes"]
 
-        filter_obj: IbdFilter = IbdFilter.load_file(args.ibd, indices, target_gene)
+        filter_obj: IbdFilter = IbdFilter.load_file(
+            args.ibd,
+            indices,
+            target_gene,
+            cache_dir=args.ibd_cache,
+            index_file=args.ibd_index,
+            reader_engine=args.ibd_reader,
+            min_centimorgan=args.min_cm,
+            threads=args.threads,
+            memory_limit=args.memory_limit,
+        )
 
         # choosing the proper way to filter the ibd files
         filter_obj.set_filter(args.segment_overlap)
         # Filter the IBD data to only the sites that were used in the DRIVE analysis
-        filter_obj.preprocess(args.min_cm, id_list)
+        filter_obj.preprocess(
+            args.min_cm,
+            id_list,
+            args.chromosome_early_stop,
+            args.sorted_input,
+            args.prefetch_chunks,
+        )
 
-        ibd_segments = filter_obj.ibd_pd
+        # The edges only have the integer haplotype ids so the haplotype and
+        # individual ids are looked up from the vertices table. The haplotype
+        # strings are rebuilt to compare them to the haplotypes in the networks
+        haplotypes = np.array(
+            filter_obj.haplotype_mapper().format_haplotypes(
+                filter_obj.ibd_vs["hapID"].to_numpy()
+            ),
+            dtype=object,
+        )
+        individual_ids = filter_obj.ibd_vs["IID"].to_numpy()
+
+        ibd_segments = pd.DataFrame(
+            {
+                "hapid1": haplotypes[filter_obj.ibd_pd["idnum1"]],
+                "hapid2": haplotypes[filter_obj.ibd_pd["idnum2"]],
+                "pair_1": individual_ids[filter_obj.ibd_pd["idnum1"]],
+                "pair_2": individual_ids[filter_obj.ibd_pd["idnum2"]],
+                "length": filter_obj.ibd_pd["cm"],
+            }
+        )
         print(ibd_segments)
 
         # We need to make sure that the we are look at only the
@@ -526,14 +562,6 @@ def generate_dendrograms(args) -> None:
             & (ibd_segments.hapid2.isin(haplotype_list))
         ]
 
-        haplotype_filtered_ibd_segments = haplotype_filtered_ibd_segments.rename(
-            columns={
-                indices.id1_indx: "pair_1",
-                indices.id2_indx: "pair_2",
-                indices.cM_indx: "length",
-            }
-        )
-
         # matrix_id_list, distance_matrix = make_distance_matrix(
         #     haplotype_filtered_ibd_segments[["pair_1", "pair_2", "length"]],
         #     args.min_cm,
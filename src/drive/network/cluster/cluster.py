@@ -1,14 +1,18 @@
-import itertools
 import logging
 import sys
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Set, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field, replace
+from typing import Any, ContextManager, Dict, List, Optional, Set, Tuple
 
 import igraph as ig
+import numpy as np
+import numpy.typing as npt
+import scipy.sparse as sp
 from log import CustomLogger
 from pandas import DataFrame
 
-from drive.network.models import Filter, Network, Network_Interface
+from drive.network.models import Filter, HaplotypeMapper, Network, Network_Interface
 
 # creating a logger
 logger: logging.Logger = CustomLogger.get_logger(__name__)
@@ -16,6 +20,143 @@ logger: logging.Logger = CustomLogger.get_logger(__name__)
 # Create a generic variable that can represents the class from the
 
 
+@dataclass
+class ClusterSummary:
+    """Members and edge counts of every cluster from a random walk
+
+    Parameters
+    ----------
+    names : npt.NDArray
+        name of each vertex in the graph. The names are the dense haplotype
+        codes of the vertices
+
+    vertex_ids : List[npt.NDArray[np.int64]]
+        vertex ids of the members of each cluster in increasing order
+
+    internal_edge_counts : npt.NDArray[np.int64]
+        number of edges with both ends in each cluster
+
+    false_negative_edges : List[npt.NDArray[np.int64]]
+        sorted edge ids of the false negative edges of each cluster
+    """
+
+    names: npt.NDArray
+    vertex_ids: List[npt.NDArray[np.int64]]
+    internal_edge_counts: npt.NDArray[np.int64]
+    false_negative_edges: List[npt.NDArray[np.int64]]
+
+
+@dataclass
+class EdgeIndex:
+    """Edges of the whole graph with the ids of the edges of each vertex in
+    compressed sparse row order. The edges within a network can then be found
+    from the edges of its members without scanning every edge
+
+    Parameters
+    ----------
+    idnum1 : npt.NDArray[np.int32]
+        dense haplotype code of the first haplotype in each edge
+
+    idnum2 : npt.NDArray[np.int32]
+        dense haplotype code of the second haplotype in each edge
+
+    cm : npt.NDArray[np.floating]
+        length of each edge in centimorgans
+
+    indptr : npt.NDArray[np.int64]
+        position in edge_ids where the edges of each haplotype code start. The
+        edges of the code i are edge_ids[indptr[i]:indptr[i + 1]]
+
+    edge_ids : npt.NDArray[np.int64]
+        edge ids grouped by the haplotype codes at either end of the edge
+    """
+
+    idnum1: npt.NDArray[np.int32]
+    idnum2: npt.NDArray[np.int32]
+    cm: npt.NDArray[np.floating]
+    indptr: npt.NDArray[np.int64]
+    edge_ids: npt.NDArray[np.int64]
+
+    @classmethod
+    def from_edges(
+        cls,
+        idnum1: npt.NDArray[np.int32],
+        idnum2: npt.NDArray[np.int32],
+        cm: npt.NDArray[np.floating],
+        vertex_count: int,
+    ) -> "EdgeIndex":
+        """Group the edge ids by the haplotype codes at each end of the edges
+
+        Parameters
+        ----------
+        idnum1 : npt.NDArray[np.int32]
+            dense haplotype code of the first haplotype in each edge
+
+        idnum2 : npt.NDArray[np.int32]
+            dense haplotype code of the second haplotype in each edge
+
+        cm : npt.NDArray[np.floating]
+            length of each edge in centimorgans
+
+        vertex_count : int
+            number of haplotype codes in the vertices table
+
+        Returns
+        -------
+        EdgeIndex
+            returns the index of the edges of each haplotype code
+        """
+        edge_ends = np.concatenate([idnum1, idnum2])
+
+        edge_ids = np.tile(np.arange(len(idnum1), dtype=np.int64), 2)
+
+        indptr = np.zeros(vertex_count + 1, dtype=np.int64)
+
+        np.cumsum(np.bincount(edge_ends, minlength=vertex_count), out=indptr[1:])
+
+        return cls(
+            idnum1,
+            idnum2,
+            cm,
+            indptr,
+            edge_ids[np.argsort(edge_ends, kind="stable")],
+        )
+
+    def network_edges(self, members: npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+        """Find the edges that have both ends in the network. The work is
+        proportional to the number of edges of the members
+
+        Parameters
+        ----------
+        members : npt.NDArray[np.int64]
+            sorted dense haplotype codes of the members of the network
+
+        Returns
+        -------
+        npt.NDArray[np.int64]
+            returns the ids of the edges within the network in increasing
+            order, which is the order of the edges in the whole graph
+        """
+        starts = self.indptr[members]
+        edge_counts = self.indptr[members + 1] - starts
+
+        # position of every edge of the members in edge_ids. Each run of
+        # positions starts at the member's start and counts up by one
+        run_offsets = np.cumsum(edge_counts) - edge_counts
+
+        positions = np.repeat(starts - run_offsets, edge_counts) + np.arange(
+            edge_counts.sum()
+        )
+
+        # edges between two members and self loops are listed more than once
+        member_edges = np.unique(self.edge_ids[positions])
+
+        return member_edges[
+            np.isin(self.idnum1[member_edges], members)
+            & np.isin(self.idnum2[member_edges], members)
+        ]
+
+
 @dataclass
 class ClusterHandler:
     """Class responsible for performing the cluster on the network objects"""
@@ -27,42 +168,85 @@ class ClusterHandler:
     min_cluster_size: int
     segment_dist_threshold: int
     hub_threshold: float
-    haplotype_mappings: Dict[str, int]
+    haplotype_mappings: HaplotypeMapper
     recluster: bool
+    workers: int = 1
     check_times: int = 0
     recheck_clsts: Dict[int, List[Network_Interface]] = field(default_factory=dict)
     final_clusters: List[Network_Interface] = field(default_factory=list)
 
     @staticmethod
     def generate_graph(
-        ibd_edges: DataFrame,
-        ibd_vertices: Optional[DataFrame] = None,
+        idnum1: npt.NDArray[np.int32],
+        idnum2: npt.NDArray[np.int32],
+        cm: npt.NDArray[np.floating],
+        vertex_ids: Optional[npt.NDArray[np.int32]] = None,
     ) -> ig.Graph:
         """Method that will be responsible for creating the graph
-        used in the network analysis
+        used in the network analysis. The graph is built straight from the
+        integer edge arrays so igraph does not have to look up each vertex
+        name
 
         Parameters
         ----------
-        ibd_edges : DataFrame
-            DataFrame that has the edges of the graph with the length
-            of the edges.
+        idnum1 : npt.NDArray[np.int32]
+            dense haplotype code of the first haplotype in each edge
+
+        idnum2 : npt.NDArray[np.int32]
+            dense haplotype code of the second haplotype in each edge
 
-        ibd_vertices : Optional[DataFrame]
-            DataFrame that has information for each vertice in the
-            graph. This value will be none when we are redoing the clustering
+        cm : npt.NDArray[np.floating]
+            length of each edge in centimorgans. This value is stored as
+            the 'cm' edge attribute
+
+        vertex_ids : Optional[npt.NDArray[np.int32]]
+            sorted dense haplotype codes of the vertices in the graph. Each
+            vertex is named by its code and the edges are mapped to the
+            position of each code in this array. Other information about
+            the vertices stays in the vertices table, which is indexed by
+            the same codes. This value will be none when we are redoing the
+            clustering, in which case the codes are used as the vertex ids.
+
+        Returns
+        -------
+        ig.Graph
+            returns the undirected graph with the 'cm' edge attribute
         """
-        if ibd_vertices is not None:
+        if vertex_ids is not None:
             logger.debug("Generating graph with vertex labels.")
-            return ig.Graph.DataFrame(
-                ibd_edges, directed=False, vertices=ibd_vertices, use_vids=False
-            )
 
+            vertex_count = len(vertex_ids)
+
+            # The codes of the whole vertices table already match the vertex
+            # positions so they only have to be mapped for a subgraph
+            if vertex_count == 0 or vertex_ids[-1] == vertex_count - 1:
+                source, target = idnum1, idnum2
+            else:
+                source = np.searchsorted(vertex_ids, idnum1)
+                target = np.searchsorted(vertex_ids, idnum2)
         else:
             logger.debug(
                 "No vertex metadata provided. Vertex ids will be nonnegative integers"
             )
-            # return ig.Graph.DataFrame(ibd_edges, directed=False, use_vids=False)
-            return ig.Graph.DataFrame(ibd_edges, directed=False)
+
+            source, target = idnum1, idnum2
+
+            vertex_count = (
+                int(max(idnum1.max(), idnum2.max())) + 1 if len(idnum1) > 0 else 0
+            )
+
+        graph = ig.Graph(
+            n=vertex_count,
+            edges=zip(source.tolist(), target.tolist()),
+            directed=False,
+        )
+
+        graph.es["cm"] = cm.tolist()
+
+        if vertex_ids is not None:
+            graph.vs["name"] = vertex_ids.tolist()
+
+        return graph
 
     def random_walk(self, graph: ig.Graph) -> ig.VertexClustering:
         """Method used to perform the random walk from igraph.community_walktrap
@@ -70,7 +254,7 @@ class ClusterHandler:
         Parameters
         ----------
         graph : ig.Graph
-            graph object created by ig.Graph.DataFrame
+            graph object created by generate_graph
 
         Returns
         -------
@@ -116,123 +300,227 @@ class ClusterHandler:
         ]
 
     @staticmethod
-    def _gather_members(
-        random_walk_members: List[int], clst_id: int, graph: ig.Graph
-    ) -> Tuple[List[int], List[int]]:
-        """Generate a list of individuals ids in the network
+    def _summarize_clusters(
+        graph: ig.Graph, random_walk_members: List[int]
+    ) -> ClusterSummary:
+        """Find the members, internal edges, and false negative edges of every
+        cluster in one pass over the membership list and the edge list
 
         Parameters
         ----------
-        random_walk_members : List[int]
-            list of all members from the random walk results
-
-        clst_id : int
-            id for the cluster. This value is used to pull out members
-            that belong to the cluster
-
         graph : ig.Graph
-            Graph object formed by ig.Graph.DataFrame
+            Graph object formed by generate_graph
+
+        random_walk_members : List[int]
+            cluster id of each vertex from the random walk results
 
         Returns
         -------
-        Tuple[List[int], List[int]]
-            returns a list of ids of individuals in the network and then
-            a list of vertex ids. The individual ids are just the index
-            of the element in the membership list and the vertex ids are
-            the list of ids provided by nme label in the vs() property.
+        ClusterSummary
+            returns the summary of every cluster in the graph
+
+        Raises
+        ------
+        ValueError
+            raises a ValueError if the membership list does not have a
+            cluster for every vertex in the graph
         """
-        member_list = []
-        # this list has the ids. It is sometimes the same as the
-        # member_list but it will not be the same in the redo_networks
-        # graph
-        vertex_ids = []
+        membership = np.asarray(random_walk_members, dtype=np.int64)
+
+        if len(membership) != graph.vcount():
+            raise ValueError(
+                f"Expected a cluster id for each of the {graph.vcount()} vertices in the graph. Instead there were {len(membership)} cluster ids"  # noqa: E501
+            )
+
+        cluster_count = int(membership.max()) + 1 if len(membership) > 0 else 0
+
+        edges = np.array(graph.get_edgelist(), dtype=np.int64).reshape(-1, 2)
+        source, target = edges[:, 0], edges[:, 1]
+
+        source_clusters = membership[source]
+        target_clusters = membership[target]
+
+        internal = source_clusters == target_clusters
+
+        # Every edge with one end outside of the cluster is a false negative
+        # edge for the clusters at both ends. Within a cluster, only the first
+        # edge between each pair of vertices is counted as a connection, so
+        # self loops and repeated edges between a pair are also false
+        # negatives
+        internal_pairs = np.flatnonzero(internal & (source != target))
+
+        pair_keys = np.minimum(source, target)[internal_pairs] * graph.vcount() + (
+            np.maximum(source, target)[internal_pairs]
+        )
 
-        for member_id, assigned_clst_id in enumerate(random_walk_members):
-            if assigned_clst_id == clst_id:
-                member_list.append(graph.vs()[member_id]["name"])
-                vertex_ids.append(member_id)
+        _, first_pair_edges = np.unique(pair_keys, return_index=True)
 
-        return member_list, vertex_ids
+        repeated_internal = np.ones(len(edges), dtype=bool)
+        repeated_internal[internal_pairs[first_pair_edges]] = False
+        repeated_internal &= internal
+
+        boundary = np.flatnonzero(~internal)
+        repeated = np.flatnonzero(repeated_internal)
+
+        false_negative_edges = np.concatenate([boundary, boundary, repeated])
+        false_negative_clusters = np.concatenate(
+            [
+                source_clusters[boundary],
+                target_clusters[boundary],
+                source_clusters[repeated],
+            ]
+        )
+
+        # The edges are grouped by cluster and sorted by edge id within each
+        # cluster before they are split into a list per cluster
+        edge_order = np.lexsort((false_negative_edges, false_negative_clusters))
+
+        vertex_order = np.argsort(membership, kind="stable")
+
+        return ClusterSummary(
+            np.asarray(graph.vs["name"]),
+            np.split(
+                vertex_order,
+                np.cumsum(np.bincount(membership, minlength=cluster_count))[:-1],
+            ),
+            np.bincount(source_clusters[internal], minlength=cluster_count),
+            np.split(
+                false_negative_edges[edge_order],
+                np.cumsum(
+                    np.bincount(false_negative_clusters, minlength=cluster_count)
+                )[:-1],
+            ),
+        )
 
     @staticmethod
-    def _determine_true_positive_edges(
-        member_list: List[int], clst_id: int, random_walk_results: ig.VertexClustering
-    ) -> Tuple[int, float]:
-        """determining the number of true positive edges
+    def _hub_statistics(
+        idnum1: npt.NDArray[np.int32],
+        idnum2: npt.NDArray[np.int32],
+        cm: npt.NDArray[np.floating],
+        members: List[int],
+    ) -> DataFrame:
+        """Find how connected each member of a network is so that hub
+        individuals can be removed. The statistics of every member are
+        computed at once from the edge arrays
 
         Parameters
         ----------
-        member_list : List[int]
-            list of ids within the specific network
+        idnum1 : npt.NDArray[np.int32]
+            dense haplotype code of the first haplotype in each edge of the
+            network
 
-        clst_id : int
-            id for the original cluster
+        idnum2 : npt.NDArray[np.int32]
+            dense haplotype code of the second haplotype in each edge of the
+            network
 
-        random_walk_results : ig.VertexClustering
-            vertexClustering object returned after the random
-            walk that has the different clusters
+        cm : npt.NDArray[np.floating]
+            length of each edge in centimorgans
+
+        members : List[int]
+            dense haplotype codes of the members of the network
 
         Returns
         -------
-        Tuple[int, float]
-            returns a tuple where the first element is the
-            number of edges in the graph and the second
-            element is the ratio of actually edges in the
-            graph compared to the theoretical maximum number
-            of edges in the graph.
+        DataFrame
+            returns a DataFrame indexed by the member ids with the columns
+            'idnum', 'conn', 'conn.N', and 'TP'. The 'conn' column is the sum
+            of 1/cM over the edges of the member, 'conn.N' is the number of
+            edges of the member, and 'TP' is the number of edges between the
+            neighbors of the member divided by the number of possible edges
+            between the 'conn.N' neighbors
+
+        Raises
+        ------
+        ZeroDivisionError
+            raises a ZeroDivisionError if a member has no edges in the network
         """
-        # getting the total number of edges possible
-        theoretical_edge_count = len(list(itertools.combinations(member_list, 2)))
+        member_ids = np.asarray(members, dtype=np.int64)
 
-        # Getting the number of edges within the graph and saving it
-        # as a dictionary key, 'true_positive_n'
-        cluster_edge_count = len(random_walk_results.subgraph(clst_id).get_edgelist())
+        vertices = np.unique(np.concatenate([member_ids, idnum1, idnum2]))
 
-        return cluster_edge_count, cluster_edge_count / theoretical_edge_count
+        vertex_count = len(vertices)
 
-    def _determine_false_positive_edges(
-        graph: ig.Graph, vertex_list: List[int]
-    ) -> Tuple[int, List[int]]:
-        """determine the number of false positive edges
+        source = np.searchsorted(vertices, idnum1)
+        target = np.searchsorted(vertices, idnum2)
+        member_positions = np.searchsorted(vertices, member_ids)
 
-        Parameters
-        ----------
-        graph : ig.Graph
-            graph object returned from ig.Graph.DataFrame
+        inverse_cm = 1 / np.asarray(cm, dtype=np.float64)
 
-        vertex_list : List[int]
-            list of vertex ids within the specific network
+        self_loops = source == target
 
-        Returns
-        -------
-        Tuple[int, List[int]]
-            returns a tuple where the first element is the
-            number of edges in the graph and the second
-            element is a list of false positive edges.
-        """
-        all_edge = set([])
-
-        for mem in vertex_list:
-            all_edge = all_edge.union(set(graph.incident(mem)))
-
-        false_negative_edges = list(
-            all_edge.difference(
-                list(
-                    graph.get_eids(
-                        pairs=list(itertools.combinations(vertex_list, 2)),
-                        directed=False,
-                        error=False,
-                    )
-                )
+        # A self loop is one edge of the member but the member is listed as
+        # its own neighbor twice
+        conn = (
+            np.bincount(source, inverse_cm, minlength=vertex_count)
+            + np.bincount(target, inverse_cm, minlength=vertex_count)
+            - np.bincount(
+                source[self_loops], inverse_cm[self_loops], minlength=vertex_count
+            )
+        )
+
+        degree = np.bincount(source, minlength=vertex_count) + np.bincount(
+            target, minlength=vertex_count
+        )
+
+        loop_counts = np.bincount(source[self_loops], minlength=vertex_count)
+
+        # adjacency matrix with the number of edges between each pair of
+        # different vertices in both directions
+        pair_source = np.concatenate([source[~self_loops], target[~self_loops]])
+        pair_target = np.concatenate([target[~self_loops], source[~self_loops]])
+
+        adjacency = sp.csr_matrix(
+            (np.ones(len(pair_source), dtype=np.int64), (pair_source, pair_target)),
+            shape=(vertex_count, vertex_count),
+        )
+
+        # row of each member with a 1 for every vertex that is its neighbor
+        neighbors = (adjacency + sp.diags(loop_counts, format="csr", dtype=np.int64))[
+            member_positions
+        ]
+        neighbors.eliminate_zeros()
+        neighbors.data = np.ones(len(neighbors.data), dtype=np.int64)
+
+        # Each edge between two neighbors is found from both of its ends so
+        # the count is halved. Self loops of the neighbors are added once
+        neighbor_edges = (
+            np.asarray((neighbors @ adjacency).multiply(neighbors).sum(axis=1)).ravel()
+            // 2
+            + neighbors @ loop_counts
+        )
+
+        member_degree = degree[member_positions]
+
+        if (member_degree == 0).any():
+            raise ZeroDivisionError(
+                f"There was a zero division error encountered when looking at the network with the id {member_ids[member_degree == 0][0]}"  # noqa: E501
+            )
+
+        # A member with only one edge is treated as fully connected
+        with np.errstate(divide="ignore", invalid="ignore"):
+            connected_ratio = np.where(
+                member_degree == 1,
+                1.0,
+                neighbor_edges / (member_degree * (member_degree - 1) / 2),
             )
+
+        return DataFrame(
+            {
+                "idnum": member_ids,
+                "conn": conn[member_positions],
+                "conn.N": member_degree,
+                "TP": connected_ratio,
+            },
+            index=member_ids,
         )
-        return len(false_negative_edges), false_negative_edges
 
     def _map_ids_back_to_haplotypes(
         self, members: List[int]
     ) -> Tuple[List[str], Set[str]]:
         """remap the haplotype integer ids back to the haplotype
-        strings for the output file
+        strings for the output file. The strings are rebuilt from the
+        integer haplotype keys so they are only created for the haplotypes
+        in the final networks
 
         Parameters
         ----------
@@ -248,11 +536,7 @@ class ClusterHandler:
             within the networks. This will be the same as the haplotype
             id without the phase number
         """
-        haplotypes = [self.haplotype_mappings[value] for value in members]
-
-        member_ids = {value[:-2] for value in haplotypes}
-
-        return haplotypes, member_ids
+        return self.haplotype_mappings.map_ids(members)
 
     def gather_cluster_info(
         self,
@@ -268,7 +552,7 @@ class ClusterHandler:
         Parameters
         ----------
         graph : ig.Graph
-            Graph object generated by ig.Graph.DataFrame
+            Graph object generated by generate_graph
 
         cluster_ids : List[int]
             list of integers for each cluster id
@@ -280,6 +564,9 @@ class ClusterHandler:
             id of the original cluster that is now being broken up. Child
             cluster ids will take the form parent_id.child_id
         """
+        cluster_summary = ClusterHandler._summarize_clusters(
+            graph, random_walk_clusters.membership
+        )
 
         for clst_id in cluster_ids:
             # We need to form the appropriate id if the cluster has a
@@ -290,24 +577,23 @@ class ClusterHandler:
                 clst_name = f"{clst_id}"
 
             # We are going to get the vertex id and member id of each
-            # graph
-            member_list, vertex_ids = ClusterHandler._gather_members(
-                random_walk_clusters.membership, clst_id, graph
-            )
+            # graph. The member ids are the names of the vertices
+            vertex_ids = cluster_summary.vertex_ids[clst_id].tolist()
+
+            member_list = cluster_summary.names[vertex_ids].tolist()
 
             # Next we get the number of edges/ ratio of actual edges to
             # the potential edges
-            (
-                true_pos_count,
-                true_pos_ratio,
-            ) = ClusterHandler._determine_true_positive_edges(
-                member_list, clst_id, random_walk_clusters
+            true_pos_count = int(cluster_summary.internal_edge_counts[clst_id])
+
+            true_pos_ratio = true_pos_count / (
+                len(member_list) * (len(member_list) - 1) // 2
             )
+
             # next we determine the number of false positive edges
-            (
-                false_neg_count,
-                false_neg_list,
-            ) = ClusterHandler._determine_false_positive_edges(graph, vertex_ids)
+            false_neg_list = cluster_summary.false_negative_edges[clst_id].tolist()
+
+            false_neg_count = len(false_neg_list)
 
             # If the graph is too sparse and it is too large and the max
             # number of rechecks has not been reached then we will put
@@ -338,26 +624,33 @@ class ClusterHandler:
                 self.recheck_clsts.setdefault(self.check_times, []).append(network)
 
             else:
-                # we need to convert the integer ids back to strings
-                haplotype_ids, member_ids = self._map_ids_back_to_haplotypes(
-                    member_list
-                )
-
+                # The integer ids are converted back to strings by
+                # map_final_clusters once every round of reclustering is done
                 network = Network(
                     clst_name,
                     true_pos_count,
                     true_pos_ratio,
                     false_neg_list,
                     false_neg_count,
-                    member_ids,
-                    haplotype_ids,
+                    member_list,
+                    vertex_ids,
                 )
-                # logger.info(f"members: {member_ids}\nhaplotypes: {haplotype_ids}")
 
                 self.final_clusters.append(network)
 
+    def map_final_clusters(self) -> None:
+        """Method that will convert the integer ids of the members of each
+        final network back to the haplotype strings and the sample ids. This
+        step happens in the main process after the reclustering so that the
+        networks from the worker processes are formatted the same way as the
+        networks that were reclustered in the main process"""
+        for network in self.final_clusters:
+            network.haplotypes, network.members = self._map_ids_back_to_haplotypes(
+                network.members
+            )
+
     def redo_clustering(
-        self, network: Network_Interface, ibd_pd: DataFrame, ibd_vs: DataFrame
+        self, network: Network_Interface, edge_index: EdgeIndex
     ) -> None:
         """Method that will redo the clustering, if the
         networks were too large or did not show a high degree
@@ -370,26 +663,31 @@ class ClusterHandler:
             about the cluster id, number and ratio of edges, true_positive_percent,
             false_negative_edges, false_negative_count
 
-        ibd_pd : pd.DataFrame
-            DataFrame that has information about the edges that a pair shares
+        edge_index : EdgeIndex
+            index of the edges of the whole graph created by
+            EdgeIndex.from_edges
         """
         # pulling the id from the original cluster
         original_id = network.clst_id
         # logger.debug("In redo_clustering section")
-        # filters for the specific cluster
-        redopd = ibd_pd[
-            (ibd_pd["idnum1"].isin(network.haplotypes))
-            & (ibd_pd["idnum2"].isin(network.haplotypes))
-        ]
+        # The members are the haplotype codes so the edges of the specific
+        # cluster are found from the edges of each member
+        redo_vs = np.unique(np.asarray(network.members, dtype=np.int64))
+
+        redo_edges = edge_index.network_edges(redo_vs)
 
-        redo_vs = ibd_vs[ibd_vs.idnum.isin(network.haplotypes)]
+        redo_idnum1 = edge_index.idnum1[redo_edges]
+        redo_idnum2 = edge_index.idnum2[redo_edges]
+        redo_cm = edge_index.cm[redo_edges]
 
-        # If the redopd or redo_vs is empty it causes strange behavior and the code will
+        # If there are no edges or vertices it causes strange behavior and the code will
         # usually fail. The desired behavior is for the program to tell teh user that
         # the graph could not be constructed and then for it to move on.
-        if not redopd.empty and not redo_vs.empty:
+        if len(redo_edges) > 0 and len(redo_vs) > 0:
             # We are going to generate a new Networks object using the redo graph
-            redo_networks = ClusterHandler.generate_graph(redopd, redo_vs)
+            redo_networks = ClusterHandler.generate_graph(
+                redo_idnum1, redo_idnum2, redo_cm, redo_vs
+            )
             # redo_networks = ClusterHandler.generate_graph(redopd)
             # performing the random walk
             redo_walktrap_clusters = self.random_walk(redo_networks)
@@ -398,47 +696,10 @@ class ClusterHandler:
 
             # If only one cluster is found
             if len(redo_walktrap_clusters.sizes()) == 1:
-                # creates an empty dataframe with these columns
-                clst_conn = DataFrame(columns=["idnum", "conn", "conn.N", "TP"])
-                # iterate over each member id
-                # for idnum in network.haplotypes:
-
-                for idnum in network.members:
-                    conn = sum(
-                        list(
-                            map(
-                                lambda x: 1 / x,
-                                redopd.loc[
-                                    (redopd["idnum1"] == idnum)
-                                    | (redopd["idnum2"] == idnum)
-                                ]["cm"],
-                            )
-                        )
-                    )
-                    conn_idnum = list(
-                        redopd.loc[(redopd["idnum1"] == idnum)]["idnum2"]
-                    ) + list(redopd.loc[(redopd["idnum2"] == idnum)]["idnum1"])
-                    conn_tp = len(
-                        redopd.loc[
-                            redopd["idnum1"].isin(conn_idnum)
-                            & redopd["idnum2"].isin(conn_idnum)
-                        ].index
-                    )
-
-                    # assert 1 == 0
-                    if len(conn_idnum) == 1:
-                        connTP = 1
-                    else:
-                        try:
-                            connTP = conn_tp / (
-                                len(conn_idnum) * (len(conn_idnum) - 1) / 2
-                            )
-                        except ZeroDivisionError:
-                            raise ZeroDivisionError(
-                                f"There was a zero division error encountered when looking at the network with the id {idnum}"  # noqa: E501
-                            )  # noqa: E501
-
-                    clst_conn.loc[idnum] = [idnum, conn, len(conn_idnum), connTP]
+                clst_conn = ClusterHandler._hub_statistics(
+                    redo_idnum1, redo_idnum2, redo_cm, network.members
+                )
+
                 rmID = list(
                     clst_conn.loc[
                         (
@@ -455,14 +716,18 @@ class ClusterHandler:
                     ]["idnum"]
                 )
 
-                redopd = redopd.loc[
-                    (~redopd["idnum1"].isin(rmID)) & (~redopd["idnum2"].isin(rmID))
-                ]
-                redo_graph = self.generate_graph(
-                    redopd,
+                kept_edges = ~np.isin(redo_idnum1, rmID) & ~np.isin(redo_idnum2, rmID)
+
+                # The members of the new clusters are gathered from this graph
+                # so it has to keep the haplotype codes as the vertex names
+                redo_networks = self.generate_graph(
+                    redo_idnum1[kept_edges],
+                    redo_idnum2[kept_edges],
+                    redo_cm[kept_edges],
+                    redo_vs[~np.isin(redo_vs, rmID)],
                 )
                 # redo_g = ig.Graph.DataFrame(redopd, directed=False)
-                redo_walktrap_clusters = self.random_walk(redo_graph)
+                redo_walktrap_clusters = self.random_walk(redo_networks)
                 # redo_walktrap = ig.Graph.community_walktrap(
                 #     redo_g, weights="cm", steps=self.random_walk_step_size
                 # )
@@ -476,14 +741,149 @@ class ClusterHandler:
             )
         else:
             logger.debug(
-                f"A graph was not able to be generated when we attempted to recluster the network: {original_id}. This error probably indicates that there were There were none of the {len(network.haplotypes)} individuals in that specific network that shared ibd segments with one another."
+                f"A graph was not able to be generated when we attempted to recluster the network: {original_id}. This error probably indicates that there were There were none of the {len(network.members)} individuals in that specific network that shared ibd segments with one another."
             )
 
+    def recluster_in_pool(
+        self, networks: List[Network_Interface], executor: ProcessPoolExecutor
+    ) -> None:
+        """Method that will redo the clustering of each network in a pool of
+        worker processes. The largest networks are submitted first so that
+        they do not hold up the end of the round. The child networks are added
+        in the order of the networks so that the results are the same as
+        reclustering one network at a time
+
+        Parameters
+        ----------
+        networks : List[Network_Interface]
+            networks from the previous round that were too large and too
+            sparse
+
+        executor : ProcessPoolExecutor
+            process pool created by _recluster_pool. Each worker already has
+            the index of the edges of the whole graph
+        """
+        network_order = sorted(
+            range(len(networks)),
+            key=lambda network_indx: len(networks[network_indx].members),
+            reverse=True,
+        )
+
+        recluster_results: Dict[int, Future] = {
+            network_indx: executor.submit(
+                _recluster_network, networks[network_indx], self.check_times
+            )
+            for network_indx in network_order
+        }
+
+        for network_indx in range(len(networks)):
+            recheck_networks, final_networks = recluster_results[network_indx].result()
+
+            self.recheck_clsts.setdefault(self.check_times, []).extend(recheck_networks)
+
+            self.final_clusters.extend(final_networks)
+
+
+# handler and edges shared by every network that a worker process reclusters.
+# These are sent once to each worker process when the process pool starts
+_RECLUSTER_SETTINGS: Dict[str, Any] = {}
+
+
+def _init_recluster_worker(
+    cluster_handler: ClusterHandler, edge_index: EdgeIndex
+) -> None:
+    """Store the cluster settings and the index of the edges of the whole graph
+    in the worker process
+
+    Parameters
+    ----------
+    cluster_handler : ClusterHandler
+        handler with the clustering settings and without any networks
+
+    edge_index : EdgeIndex
+        index of the edges of the whole graph created by EdgeIndex.from_edges
+    """
+    _RECLUSTER_SETTINGS.update(cluster_handler=cluster_handler, edge_index=edge_index)
+
+
+def _recluster_network(
+    network: Network_Interface, check_times: int
+) -> Tuple[List[Network_Interface], List[Network_Interface]]:
+    """Redo the clustering of one network in a worker process
+
+    Parameters
+    ----------
+    network : Network_Interface
+        network that was too large and too sparse
+
+    check_times : int
+        number of the current recheck round
+
+    Returns
+    -------
+    Tuple[List[Network_Interface], List[Network_Interface]]
+        returns the child networks that have to be checked again in the next
+        round and the child networks that are final
+    """
+    network_handler = replace(
+        _RECLUSTER_SETTINGS["cluster_handler"],
+        check_times=check_times,
+        recheck_clsts={},
+        final_clusters=[],
+    )
+
+    network_handler.redo_clustering(network, _RECLUSTER_SETTINGS["edge_index"])
+
+    return (
+        network_handler.recheck_clsts.get(check_times, []),
+        network_handler.final_clusters,
+    )
+
+
+def _recluster_pool(
+    cluster_obj: ClusterHandler, edge_index: EdgeIndex
+) -> ContextManager[Optional[ProcessPoolExecutor]]:
+    """Create the process pool used to recluster the networks
+
+    Parameters
+    ----------
+    cluster_obj : ClusterHandler
+        Object that contains information about how the random walk needs to
+        be performed
+
+    edge_index : EdgeIndex
+        index of the edges of the whole graph created by EdgeIndex.from_edges
+
+    Returns
+    -------
+    ContextManager[Optional[ProcessPoolExecutor]]
+        returns a context manager for the process pool. The context manager
+        returns None if only one worker was requested or if no network has to
+        be reclustered, in which case the networks are reclustered in the
+        main process
+    """
+    if cluster_obj.workers <= 1 or not cluster_obj.recheck_clsts.get(
+        cluster_obj.check_times
+    ):
+        return nullcontext()
+
+    logger.verbose(
+        f"Reclustering the networks with {cluster_obj.workers} worker processes"
+    )
+
+    return ProcessPoolExecutor(
+        max_workers=cluster_obj.workers,
+        initializer=_init_recluster_worker,
+        initargs=(
+            replace(cluster_obj, recheck_clsts={}, final_clusters=[]),
+            edge_index,
+        ),
+    )
+
 
 def cluster(
     filter_obj: Filter,
     cluster_obj: ClusterHandler,
-    centimorgan_indx: int,
 ) -> List[Network_Interface]:
     """Main function that will perform the clustering using igraph
 
@@ -492,7 +892,8 @@ def cluster(
     filter_obj : Filter
         Filter object that has two attributes: ibd_pd and ibd_vs. These
         attributes are two dataframes that have information about the
-        edges and information about the vertices.
+        edges and information about the vertices. The edges dataframe has
+        the columns idnum1, idnum2, and cm.
 
     cluster_obj : ClusterHandler
         Object that contains information about how the random walk
@@ -504,16 +905,16 @@ def cluster(
 
         Returns
     """
-    filter_obj.ibd_pd = filter_obj.ibd_pd.rename(columns={centimorgan_indx: "cm"})
-    # filtering the edges dataframe to the correct columns
-    ibd_pd = filter_obj.ibd_pd.loc[:, ["idnum1", "idnum2", "cm"]]
+    ibd_pd = filter_obj.ibd_pd
 
     ibd_vs = filter_obj.ibd_vs.reset_index(drop=True)
 
     # Generate the first pass networks
     network_graph = cluster_obj.generate_graph(
-        ibd_pd,
-        ibd_vs,
+        ibd_pd["idnum1"].to_numpy(),
+        ibd_pd["idnum2"].to_numpy(),
+        ibd_pd["cm"].to_numpy(),
+        ibd_vs["idnum"].to_numpy(),
     )
 
     random_walk_results = cluster_obj.random_walk(network_graph)
@@ -522,17 +923,38 @@ def cluster(
 
     cluster_obj.gather_cluster_info(network_graph, allclst, random_walk_results)
 
-    while (
-        cluster_obj.check_times < cluster_obj.max_rechecks
-        and len(cluster_obj.recheck_clsts.get(cluster_obj.check_times, [])) > 0
-    ):
-        cluster_obj.check_times += 1
-        logger.verbose(f"recheck: {cluster_obj.check_times}")
+    # The networks that are reclustered only need the edges between their
+    # members, which are found through the edges of each member
+    edge_index = EdgeIndex.from_edges(
+        ibd_pd["idnum1"].to_numpy(),
+        ibd_pd["idnum2"].to_numpy(),
+        ibd_pd["cm"].to_numpy(),
+        len(ibd_vs),
+    )
 
-        _ = cluster_obj.recheck_clsts.setdefault(cluster_obj.check_times, [])
+    # The networks in each round are independent so they can be reclustered
+    # by a pool of worker processes. The pool is kept for every round
+    with _recluster_pool(cluster_obj, edge_index) as executor:
+        while (
+            cluster_obj.check_times < cluster_obj.max_rechecks
+            and len(cluster_obj.recheck_clsts.get(cluster_obj.check_times, [])) > 0
+        ):
+            cluster_obj.check_times += 1
+            logger.verbose(f"recheck: {cluster_obj.check_times}")
+
+            _ = cluster_obj.recheck_clsts.setdefault(cluster_obj.check_times, [])
+
+            recheck_networks = cluster_obj.recheck_clsts.get(
+                cluster_obj.check_times - 1
+            )
+
+            if executor is None:
+                for network in recheck_networks:
+                    cluster_obj.redo_clustering(network, edge_index)
+            else:
+                cluster_obj.recluster_in_pool(recheck_networks, executor)
+    cluster_obj.map_final_clusters()
 
-        for network in cluster_obj.recheck_clsts.get(cluster_obj.check_times - 1):
-            cluster_obj.redo_clustering(network, ibd_pd, ibd_vs)
     # logginng the number of segments, haplotypes, and clusters
     # identified in the analysis
     logger.info(
@@ -0,0 +1,245 @@
+"""Module with the streaming pyarrow reader for the IBD file. Only the columns
+that DRIVE uses are parsed and the position and centimorgan predicate is
+evaluated on the numeric columns with Arrow compute kernels before any rows
+are converted to pandas. This keeps the string id columns of the segments that
+can not pass the filter from ever being materialized as a DataFrame."""
+
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Union
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from log import CustomLogger
+from pandas import DataFrame
+from pyarrow import csv
+
+from drive.network.models import FileIndices
+
+from .segment_store import _batch_to_frame
+
+logger = CustomLogger.get_logger(__name__)
+
+# number of bytes that pyarrow parses at a time
+READ_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+# Arrow type used for each of the dtypes declared by the FileIndices classes
+_ARROW_TYPES = {
+    "string[pyarrow]": pa.string(),
+    "int8": pa.int8(),
+    "int32": pa.int32(),
+    "float32": pa.float32(),
+}
+
+
+def _column_types(indices: FileIndices) -> dict:
+    """Determine the Arrow type of each column that DRIVE reads from the dtypes
+    declared by the FileIndices object
+
+    Parameters
+    ----------
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd file
+
+    Returns
+    -------
+    dict
+        returns a dictionary mapping the autogenerated column names to the
+        Arrow type of the column
+    """
+    return {
+        f"f{column_indx}": _ARROW_TYPES[dtype]
+        for column_indx, dtype in sorted(indices.column_dtypes().items())
+    }
+
+
+def read_ibd_arrow(
+    ibd_file: Union[Path, pa.NativeFile],
+    indices: FileIndices,
+    chunksize: int,
+    region_start: int,
+    region_end: int,
+    min_centimorgan: Optional[float] = None,
+    use_threads: bool = True,
+    memory_map: bool = False,
+) -> Iterator[DataFrame]:
+    """Stream the ibd file with pyarrow and keep only the segments that overlap
+    the region and that are at least min_centimorgan long. Both the 'contains'
+    and 'overlaps' filters only keep segments that overlap the region, so the
+    exact filter is still applied by the IbdFilter afterwards.
+
+    Parameters
+    ----------
+    ibd_file : Union[Path, pa.NativeFile]
+        Path to the ibd file from hapibd, iLASH, etc... Files ending in .gz
+        are decompressed by pyarrow. An open pyarrow file can also be provided
+
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd file
+
+    chunksize : int
+        number of segments that are collected before a DataFrame is returned
+
+    region_start : int
+        start position of the target region
+
+    region_end : int
+        end position of the target region
+
+    min_centimorgan : Optional[float]
+        minimum segment length. If this value is None then segments are only
+        filtered on position
+
+    use_threads : bool
+        whether pyarrow can use multiple threads to parse the file
+
+    memory_map : bool
+        whether to memory map the file instead of reading it through a file
+        buffer. This option can only be used with an uncompressed file path
+
+    Returns
+    -------
+    Iterator[DataFrame]
+        yields DataFrames whose column labels are the integer column indices of
+        the original ibd file
+    """
+    column_types = _column_types(indices)
+
+    if isinstance(ibd_file, Path):
+        input_file = pa.memory_map(str(ibd_file)) if memory_map else str(ibd_file)
+    else:
+        input_file = ibd_file
+
+    reader = csv.open_csv(
+        input_file,
+        read_options=csv.ReadOptions(
+            autogenerate_column_names=True,
+            block_size=READ_BLOCK_SIZE,
+            use_threads=use_threads,
+        ),
+        parse_options=csv.ParseOptions(delimiter="\t"),
+        convert_options=csv.ConvertOptions(
+            column_types=column_types, include_columns=list(column_types.keys())
+        ),
+    )
+
+    yield from filter_record_batches(
+        reader,
+        indices,
+        chunksize,
+        region_start,
+        region_end,
+        min_centimorgan,
+        source=ibd_file,
+    )
+
+
+def filter_record_batches(
+    batches: Iterable[pa.RecordBatch],
+    indices: FileIndices,
+    chunksize: int,
+    region_start: int,
+    region_end: int,
+    min_centimorgan: Optional[float] = None,
+    source: Union[Path, pa.NativeFile, str] = "the ibd file",
+) -> Iterator[DataFrame]:
+    """Keep only the segments in each record batch that overlap the region and
+    that are at least min_centimorgan long. The predicate is evaluated with
+    Arrow compute kernels and the filtered batches are combined into
+    DataFrames of about chunksize rows
+
+    Parameters
+    ----------
+    batches : Iterable[pa.RecordBatch]
+        record batches where each column is named 'f' followed by the index
+        of the column in the ibd file
+
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd file
+
+    chunksize : int
+        number of segments that are collected before a DataFrame is returned
+
+    region_start : int
+        start position of the target region
+
+    region_end : int
+        end position of the target region
+
+    min_centimorgan : Optional[float]
+        minimum segment length. If this value is None then segments are only
+        filtered on position
+
+    source : Union[Path, pa.NativeFile, str]
+        file that the batches were read from. This value is only used for
+        logging
+
+    Returns
+    -------
+    Iterator[DataFrame]
+        yields DataFrames whose column labels are the integer column indices of
+        the original ibd file
+    """
+    start_col, end_col, cm_col = (
+        f"f{indices.str_indx}",
+        f"f{indices.end_indx}",
+        f"f{indices.cM_indx}",
+    )
+
+    segments_read = 0
+    filtered_batches: List[pa.RecordBatch] = []
+    filtered_count = 0
+
+    for batch in batches:
+        segments_read += batch.num_rows
+
+        mask = pc.and_(
+            pc.less_equal(batch.column(start_col), region_end),
+            pc.greater_equal(batch.column(end_col), region_start),
+        )
+
+        if min_centimorgan is not None:
+            mask = pc.and_(
+                mask, pc.greater_equal(batch.column(cm_col), min_centimorgan)
+            )
+
+        filtered_batch = batch.filter(mask)
+
+        if filtered_batch.num_rows == 0:
+            continue
+
+        filtered_batches.append(filtered_batch)
+        filtered_count += filtered_batch.num_rows
+
+        if filtered_count >= chunksize:
+            yield _batches_to_frame(filtered_batches)
+
+            filtered_batches, filtered_count = [], 0
+
+    if filtered_batches:
+        yield _batches_to_frame(filtered_batches)
+
+    logger.verbose(
+        f"Read {segments_read} segments from {source} with the pyarrow reader"
+    )
+
+
+def _batches_to_frame(batches: List[pa.RecordBatch]) -> DataFrame:
+    """Combine the filtered batches into one DataFrame with integer column
+    labels
+
+    Parameters
+    ----------
+    batches : List[pa.RecordBatch]
+        record batches that passed the position and centimorgan predicate
+
+    Returns
+    -------
+    DataFrame
+        returns the DataFrame with integer column labels
+    """
+    combined = pa.Table.from_batches(batches).combine_chunks().to_batches()[0]
+
+    return _batch_to_frame(
+        combined.rename_columns([name[1:] for name in combined.schema.names])
+    )
@@ -0,0 +1,304 @@
+"""Module that reads block gzipped (BGZF) IBD files such as the files written by
+bgzip. A BGZF file is a series of independent gzip members that are each at
+most 64KB, so the blocks can be decompressed in parallel by a pool of threads.
+zlib releases the GIL while it decompresses so the threads run on separate
+cores. The decompressed lines are then parsed in chunks of about chunksize
+rows."""
+
+import io
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+import pyarrow as pa
+from log import CustomLogger
+from pandas import DataFrame
+
+from drive.network.models import FileIndices
+
+logger = CustomLogger.get_logger(__name__)
+
+# size of the fixed gzip header that comes before the extra field
+GZIP_HEADER_SIZE = 12
+
+# the crc32 and the uncompressed size at the end of every block
+GZIP_FOOTER_SIZE = 8
+
+# number of bytes that are always enough to hold the header of a block
+MAX_HEADER_SIZE = 1024
+
+# number of compressed bytes read from the file at one time
+READ_SIZE = 4 * 1024 * 1024
+
+# number of blocks that each thread can have queued for decompression
+BLOCKS_PER_THREAD = 8
+
+
+def _block_size(header: bytes, offset: int = 0) -> Optional[int]:
+    """Find the size of the BGZF block that starts at the offset. The size is
+    stored in the 'BC' subfield of the gzip extra field
+
+    Parameters
+    ----------
+    header : bytes
+        bytes that contain the gzip header of the block
+
+    offset : int
+        position of the start of the block in header
+
+    Returns
+    -------
+    Optional[int]
+        returns the total size of the block in bytes or None if the bytes at
+        the offset are not a BGZF block header
+    """
+    if (
+        len(header) < offset + GZIP_HEADER_SIZE
+        or header[offset : offset + 4] != b"\x1f\x8b\x08\x04"
+    ):
+        return None
+
+    (extra_length,) = struct.unpack_from("<H", header, offset + 10)
+
+    subfield_offset = offset + GZIP_HEADER_SIZE
+
+    while subfield_offset + 4 <= offset + GZIP_HEADER_SIZE + extra_length:
+        subfield_id = header[subfield_offset : subfield_offset + 2]
+        (subfield_length,) = struct.unpack_from("<H", header, subfield_offset + 2)
+
+        if subfield_id == b"BC" and subfield_length == 2:
+            return struct.unpack_from("<H", header, subfield_offset + 4)[0] + 1
+
+        subfield_offset += 4 + subfield_length
+
+    return None
+
+
+def is_bgzf(ibd_file: Path) -> bool:
+    """Check if the file is block gzipped
+
+    Parameters
+    ----------
+    ibd_file : Path
+        Path to the ibd file
+
+    Returns
+    -------
+    bool
+        returns True if the first block of the file has a BGZF header
+    """
+    with open(ibd_file, "rb") as ibd_fh:
+        header = ibd_fh.read(64)
+
+    return _block_size(header) is not None
+
+
+def _inflate_block(block: bytes) -> bytes:
+    """Decompress one BGZF block
+
+    Parameters
+    ----------
+    block : bytes
+        the complete compressed block including the header and footer
+
+    Returns
+    -------
+    bytes
+        returns the decompressed bytes of the block
+    """
+    (extra_length,) = struct.unpack_from("<H", block, 10)
+
+    return zlib.decompress(
+        block[GZIP_HEADER_SIZE + extra_length : -GZIP_FOOTER_SIZE], wbits=-15
+    )
+
+
+def _iter_blocks(ibd_fh: BinaryIO) -> Iterator[bytes]:
+    """Split the compressed file into BGZF blocks
+
+    Parameters
+    ----------
+    ibd_fh : BinaryIO
+        file opened in binary mode
+
+    Returns
+    -------
+    Iterator[bytes]
+        yields each compressed block in the order they are in the file
+
+    Raises
+    ------
+    ValueError
+        raises a ValueError if the file has bytes that are not a BGZF block
+    """
+    buffer = b""
+    offset = 0
+
+    while True:
+        compressed_bytes = ibd_fh.read(READ_SIZE)
+
+        buffer = buffer[offset:] + compressed_bytes
+        offset = 0
+
+        while offset < len(buffer):
+            # more bytes are read first if the header of the next block could
+            # be split between two reads
+            if compressed_bytes and len(buffer) - offset < MAX_HEADER_SIZE:
+                break
+
+            block_size = _block_size(buffer, offset)
+
+            if block_size is None:
+                raise ValueError(
+                    f"Expected a BGZF block at byte {ibd_fh.tell() - len(buffer) + offset} of the file. Instead the bytes were not a BGZF header. The file may have been compressed with gzip instead of bgzip."  # noqa: E501
+                )
+
+            if offset + block_size > len(buffer):
+                break
+
+            yield buffer[offset : offset + block_size]
+
+            offset += block_size
+
+        if not compressed_bytes:
+            if offset < len(buffer):
+                raise ValueError(
+                    "The BGZF file ended in the middle of a block. The file may be truncated."  # noqa: E501
+                )
+            return
+
+
+def read_bgzf_lines(ibd_file: Path, threads: int, line_count: int) -> Iterator[bytes]:
+    """Decompress the blocks of a BGZF file in a thread pool and return the
+    decompressed bytes in batches of complete lines
+
+    Parameters
+    ----------
+    ibd_file : Path
+        Path to the block gzipped file
+
+    threads : int
+        number of threads used to decompress blocks
+
+    line_count : int
+        minimum number of lines in each batch. The last batch can have
+        fewer lines
+
+    Returns
+    -------
+    Iterator[bytes]
+        yields the decompressed bytes of at least line_count complete lines
+        in the order they are in the file
+    """
+    pending_blocks = deque()
+    decompressed = io.BytesIO()
+    newline_count = 0
+
+    with (
+        open(ibd_file, "rb") as ibd_fh,
+        ThreadPoolExecutor(max_workers=threads) as executor,
+    ):
+        blocks = _iter_blocks(ibd_fh)
+
+        while True:
+            # The queue is kept full so that the threads keep decompressing
+            # while the batch of lines is parsed
+            for block in blocks:
+                pending_blocks.append(executor.submit(_inflate_block, block))
+
+                if len(pending_blocks) >= threads * BLOCKS_PER_THREAD:
+                    break
+
+            if not pending_blocks:
+                break
+
+            block_bytes = pending_blocks.popleft().result()
+
+            decompressed.write(block_bytes)
+            newline_count += block_bytes.count(b"\n")
+
+            if newline_count >= line_count:
+                batch = decompressed.getvalue()
+
+                last_newline = batch.rfind(b"\n") + 1
+
+                yield batch[:last_newline]
+
+                decompressed = io.BytesIO()
+                decompressed.write(batch[last_newline:])
+                newline_count = 0
+
+    remaining = decompressed.getvalue()
+
+    if remaining.strip():
+        yield remaining
+
+
+def read_ibd_bgzf(
+    ibd_file: Path,
+    indices: FileIndices,
+    chunksize: int,
+    threads: int,
+    reader_engine: str = "pandas",
+    region_start: int = 0,
+    region_end: int = 0,
+    min_centimorgan: Optional[float] = None,
+) -> Iterator[DataFrame]:
+    """Read a block gzipped ibd file by decompressing the blocks in parallel.
+    Each batch of about chunksize lines is parsed with the selected engine.
+
+    Parameters
+    ----------
+    ibd_file : Path
+        Path to the block gzipped ibd file
+
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd file
+
+    chunksize : int
+        number of lines that are decompressed before they are parsed
+
+    threads : int
+        number of threads used to decompress blocks
+
+    reader_engine : str
+        engine used to parse the lines. Either 'pandas' or 'pyarrow'
+
+    region_start : int
+        start position of the target region. Only used by the pyarrow engine
+
+    region_end : int
+        end position of the target region. Only used by the pyarrow engine
+
+    min_centimorgan : Optional[float]
+        minimum segment length. Only used by the pyarrow engine
+
+    Returns
+    -------
+    Iterator[DataFrame]
+        yields DataFrames whose column labels are the integer column indices of
+        the ibd file
+    """
+    # These modules import this module so they are imported here
+    from .arrow_reader import read_ibd_arrow
+    from .filter import read_ibd_text
+
+    logger.verbose(
+        f"Decompressing the BGZF blocks of {ibd_file} with {threads} threads"
+    )
+
+    for lines in read_bgzf_lines(ibd_file, threads, chunksize):
+        if reader_engine == "pyarrow":
+            yield from read_ibd_arrow(
+                pa.BufferReader(lines),
+                indices,
+                chunksize,
+                region_start,
+                region_end,
+                min_centimorgan,
+            )
+        else:
+            yield from read_ibd_text(io.BytesIO(lines), indices, chunksize)
@@ -0,0 +1,152 @@
+"""Module with the helpers used to restrict the IBD segments to the target
+chromosome. The chromosome column can be read in as integers or as strings
+with or without the 'chr' prefix depending on the IBD program, so every
+comparison is made on the chromosome name without the prefix."""
+
+from dataclasses import dataclass, field
+from typing import Iterable, List, Set, Union
+
+from log import CustomLogger
+from pandas import Series
+from pandas.api.types import is_numeric_dtype
+
+logger = CustomLogger.get_logger(__name__)
+
+
+def format_chromosome(chromosome: Union[int, str]) -> str:
+    """Convert the chromosome into the name used for comparisons
+
+    Parameters
+    ----------
+    chromosome : Union[int, str]
+        chromosome from the target region or the IBD file
+
+    Returns
+    -------
+    str
+        returns the chromosome as a string without the 'chr' prefix
+    """
+    return str(chromosome).removeprefix("chr")
+
+
+def chromosome_mask(chromosome_col: Series, chromosome: Union[int, str]) -> Series:
+    """Determine which segments are on the target chromosome
+
+    Parameters
+    ----------
+    chromosome_col : Series
+        chromosome column of a chunk of the IBD file
+
+    chromosome : Union[int, str]
+        chromosome of the target region
+
+    Returns
+    -------
+    Series
+        returns a boolean series that is True for the segments on the
+        chromosome
+    """
+    chromosome = format_chromosome(chromosome)
+
+    if is_numeric_dtype(chromosome_col):
+        if not chromosome.isdigit():
+            return Series(False, index=chromosome_col.index)
+
+        return chromosome_col == int(chromosome)
+
+    return chromosome_col.isin([chromosome, f"chr{chromosome}"])
+
+
+@dataclass
+class ChromosomeTracker:
+    """Class that keeps track of the order of the chromosomes in an IBD file
+    that the user has indicated is grouped by chromosome. If it is, then no
+    more segments for the target chromosomes can be found once the file has
+    moved past them. The order is checked while the file is read, but a file
+    that repeats the chromosomes further on can not be told apart from a
+    grouped file until the repeat is read.
+
+    Parameters
+    ----------
+    target_chromosomes : Set[str]
+        chromosomes of the target regions formatted by format_chromosome
+
+    chromosome_order : List[str]
+        chromosomes in the order that they first appear in the file
+
+    grouped : bool
+        whether every chromosome read so far has been in one contiguous
+        block of the file
+    """
+
+    target_chromosomes: Set[str]
+    chromosome_order: List[str] = field(default_factory=list)
+    grouped: bool = True
+
+    @classmethod
+    def from_targets(
+        cls, chromosomes: Iterable[Union[int, str]]
+    ) -> "ChromosomeTracker":
+        """Create the tracker for the chromosomes of the target regions
+
+        Parameters
+        ----------
+        chromosomes : Iterable[Union[int, str]]
+            chromosome of each target region
+
+        Returns
+        -------
+        ChromosomeTracker
+            returns the tracker for the target chromosomes
+        """
+        return cls({format_chromosome(chromosome) for chromosome in chromosomes})
+
+    def update(self, chromosome_col: Series) -> None:
+        """Record the blocks of chromosomes in the chunk. Only the first row of
+        each block of rows with the same chromosome is formatted.
+
+        Parameters
+        ----------
+        chromosome_col : Series
+            chromosome column of a chunk of the IBD file before any filtering
+        """
+        if not self.grouped:
+            return
+
+        block_starts = (
+            (chromosome_col != chromosome_col.shift()).fillna(True).to_numpy(dtype=bool)
+        )
+
+        for value in chromosome_col[block_starts].tolist():
+            chromosome = format_chromosome(value)
+
+            if self.chromosome_order and self.chromosome_order[-1] == chromosome:
+                continue
+
+            if chromosome in self.chromosome_order:
+                self.grouped = False
+
+                logger.warning(
+                    f"The option --chromosome-early-stop was provided but chromosome {chromosome} appears in more than one block of the IBD file. The whole file will be read."  # noqa: E501
+                )
+                return
+
+            self.chromosome_order.append(chromosome)
+
+    def passed_targets(self) -> bool:
+        """Check if the file has moved past every target chromosome
+
+        Returns
+        -------
+        bool
+            returns True if the file has been grouped by chromosome so far, if
+            every target chromosome has been read, and if the current
+            chromosome is not a target chromosome. Always returns False if
+            there are no target chromosomes
+        """
+        return (
+            self.grouped
+            and bool(self.target_chromosomes)
+            and self.chromosome_order[-1] not in self.target_chromosomes
+            and self.target_chromosomes.issubset(self.chromosome_order)
+        )
@@ -0,0 +1,268 @@
+"""Module that picks the number of rows in each chunk of a text IBD file when
+the user does not provide a chunksize. The first chunk is used to measure how
+many bytes each row takes in memory, which depends on the IBD format and the
+length of the ids, and the chunks are capped so that one chunk fits in a
+memory budget based on the memory that is available on the node. The chunk
+size is then doubled for as long as doing so increases the number of rows
+read per second."""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Iterator, Optional
+
+from log import CustomLogger
+from pandas import DataFrame
+from pandas.io.parsers import TextFileReader
+
+logger = CustomLogger.get_logger(__name__)
+
+# chunksize of the first chunk and of the readers that are not tuned
+DEFAULT_CHUNKSIZE = 100_000
+
+MIN_CHUNKSIZE = 10_000
+
+MAX_CHUNKSIZE = 2_000_000
+
+# The memory used by one chunk is capped at this many bytes or at a fraction
+# of the available memory, whichever is smaller. Several chunks can be in
+# memory at once because of prefetching and the copies made while filtering
+MAX_CHUNK_MEMORY = 64 * 1024 * 1024
+AVAILABLE_MEMORY_FRACTION = 32
+
+# the chunk size keeps doubling while the rows per second increase by at
+# least this factor
+MIN_THROUGHPUT_GAIN = 1.05
+
+# cgroup v2 file with the memory limit of the job on a cluster node
+CGROUP_MEMORY_MAX = Path("/sys/fs/cgroup/memory.max")
+
+
+def available_memory() -> Optional[int]:
+    """Find the number of bytes of memory that are available to DRIVE. The
+    memory limit of the job's cgroup is used if it is smaller than the free
+    memory of the node
+
+    Returns
+    -------
+    Optional[int]
+        returns the available memory in bytes or None if it can not be
+        determined on this operating system
+    """
+    try:
+        free_memory = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+    try:
+        cgroup_limit = CGROUP_MEMORY_MAX.read_text().strip()
+    except OSError:
+        return free_memory
+
+    if cgroup_limit.isdigit():
+        return min(free_memory, int(cgroup_limit))
+
+    return free_memory
+
+
+def chunk_memory_budget() -> int:
+    """Determine how many bytes one chunk can use
+
+    Returns
+    -------
+    int
+        returns the memory budget for one chunk in bytes
+    """
+    free_memory = available_memory()
+
+    if free_memory is None:
+        return MAX_CHUNK_MEMORY
+
+    return min(MAX_CHUNK_MEMORY, free_memory // AVAILABLE_MEMORY_FRACTION)
+
+
+@dataclass
+class ChunkSizeTuner:
+    """Class that picks the size of the next chunk from the chunks that were
+    already read
+
+    Parameters
+    ----------
+    memory_budget : int
+        number of bytes that one chunk can use
+
+    chunksize : int
+        number of rows in the next chunk
+
+    previous_chunksize : int
+        number of rows in the chunks before the chunk size was last doubled
+
+    max_chunksize : Optional[int]
+        largest number of rows that fits in the memory budget. This value is
+        measured from the first chunk
+
+    best_throughput : float
+        largest number of rows per second that has been observed
+
+    settled : bool
+        whether the tuner has stopped changing the chunk size
+    """
+
+    memory_budget: int
+    chunksize: int = DEFAULT_CHUNKSIZE
+    previous_chunksize: int = DEFAULT_CHUNKSIZE
+    max_chunksize: Optional[int] = None
+    best_throughput: float = 0.0
+    settled: bool = False
+
+    def update(self, row_count: int, chunk_bytes: int, seconds: float) -> int:
+        """Record the size and the time of the chunk that was just read and
+        pick the size of the next chunk
+
+        Parameters
+        ----------
+        row_count : int
+            number of rows in the chunk
+
+        chunk_bytes : int
+            number of bytes that the chunk uses in memory
+
+        seconds : float
+            time from when the chunk was requested until the next chunk was
+            requested. If the chunks are prefetched then this time also
+            includes waiting for the filtering thread to make room for the
+            chunk, so it measures the throughput of the whole pipeline
+
+        Returns
+        -------
+        int
+            returns the number of rows to read in the next chunk
+        """
+        if self.settled or row_count == 0:
+            return self.chunksize
+
+        throughput = row_count / max(seconds, 1e-9)
+
+        if self.max_chunksize is None:
+            bytes_per_row = chunk_bytes / row_count
+
+            self.max_chunksize = int(
+                min(
+                    MAX_CHUNKSIZE,
+                    max(MIN_CHUNKSIZE, self.memory_budget // bytes_per_row),
+                )
+            )
+
+            logger.debug(
+                f"The ibd file uses {bytes_per_row:.1f} bytes per row in memory so at most {self.max_chunksize} rows fit in the chunk memory budget of {self.memory_budget / 1024 / 1024:.1f} MB"  # noqa: E501
+            )
+
+            self.best_throughput = throughput
+
+            if self.chunksize >= self.max_chunksize:
+                return self._settle(self.max_chunksize)
+
+            return self._grow()
+
+        if throughput >= self.best_throughput * MIN_THROUGHPUT_GAIN:
+            self.best_throughput = throughput
+
+            if self.chunksize >= self.max_chunksize:
+                return self._settle(self.chunksize)
+
+            return self._grow()
+
+        # The larger chunks were not faster so the previous size is kept
+        return self._settle(self.previous_chunksize)
+
+    def _grow(self) -> int:
+        """Double the chunk size without going past the memory budget
+
+        Returns
+        -------
+        int
+            returns the number of rows to read in the next chunk
+        """
+        self.previous_chunksize = self.chunksize
+        self.chunksize = min(self.chunksize * 2, self.max_chunksize)
+
+        logger.debug(f"Trying a chunksize of {self.chunksize} rows")
+
+        return self.chunksize
+
+    def _settle(self, chunksize: int) -> int:
+        """Stop tuning and use the chunk size for the rest of the file
+
+        Parameters
+        ----------
+        chunksize : int
+            number of rows to read in each of the remaining chunks
+
+        Returns
+        -------
+        int
+            returns the number of rows to read in the next chunk
+        """
+        self.chunksize = chunksize
+        self.settled = True
+
+        logger.verbose(
+            f"Reading the rest of the ibd file in chunks of {self.chunksize} rows. The best observed throughput was {self.best_throughput:,.0f} rows per second and at most {self.max_chunksize} rows fit in the chunk memory budget of {self.memory_budget / 1024 / 1024:.1f} MB"  # noqa: E501
+        )
+
+        return self.chunksize
+
+
+def tuned_chunks(
+    reader: TextFileReader, tuner: Optional[ChunkSizeTuner] = None
+) -> Iterator[DataFrame]:
+    """Read the text file with the chunk sizes picked by the tuner
+
+    Parameters
+    ----------
+    reader : TextFileReader
+        pandas reader returned by read_csv with a chunksize
+
+    tuner : Optional[ChunkSizeTuner]
+        tuner that picks the size of each chunk. If no tuner is provided then
+        one is created with the memory budget from chunk_memory_budget
+
+    Returns
+    -------
+    Iterator[DataFrame]
+        yields the chunks of the file in order
+    """
+    if tuner is None:
+        tuner = ChunkSizeTuner(chunk_memory_budget())
+
+    chunksize = tuner.chunksize
+
+    # The time for each chunk runs from when it is requested until the next
+    # chunk is requested. Without prefetching this includes the time spent
+    # filtering the chunk. With prefetching this generator runs in the reader
+    # thread and the yield waits until the filtering thread takes a chunk
+    # from the queue, so once the queue is full the time is set by how fast
+    # the chunks are filtered. In both cases the chunks grow while the rows
+    # read and filtered per second improve
+    cycle_start = perf_counter()
+
+    while True:
+        try:
+            chunk = reader.get_chunk(chunksize)
+        except StopIteration:
+            return
+
+        yield chunk
+
+        cycle_end = perf_counter()
+
+        # the last chunk of the file can be shorter so it is not measured
+        if not tuner.settled and len(chunk) == chunksize:
+            chunksize = tuner.update(
+                len(chunk),
+                int(chunk.memory_usage(deep=True).sum()),
+                cycle_end - cycle_start,
+            )
+
+        cycle_start = cycle_end
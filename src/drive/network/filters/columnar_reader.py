@@ -0,0 +1,367 @@
+"""Module that reads IBD segments that were already converted to Parquet or
+to the Arrow IPC (Feather) file format. The columns of these files are in the
+same order as the columns of the text file from the IBD program so they are
+mapped through the indices of the FileIndices object. The min and max
+statistics of each Parquet row group are used to skip the row groups that can
+not have a segment that overlaps the target region."""
+
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Tuple, Union
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from log import CustomLogger
+from pandas import DataFrame
+
+from drive.network.models import FileIndices
+
+from .arrow_reader import _ARROW_TYPES, filter_record_batches
+from .chromosomes import format_chromosome
+
+logger = CustomLogger.get_logger(__name__)
+
+# magic bytes at the start of each columnar file format
+PARQUET_MAGIC = b"PAR1"
+ARROW_IPC_MAGIC = b"ARROW1"
+
+
+def columnar_format(ibd_file: Path) -> Optional[str]:
+    """Determine if the ibd file is a Parquet or Arrow IPC file
+
+    Parameters
+    ----------
+    ibd_file : Path
+        Path to the ibd file
+
+    Returns
+    -------
+    Optional[str]
+        returns 'parquet' or 'arrow' if the file starts with the magic bytes
+        of that format. Returns None for text files
+    """
+    with open(ibd_file, "rb") as ibd_fh:
+        header = ibd_fh.read(len(ARROW_IPC_MAGIC))
+
+    if header.startswith(PARQUET_MAGIC):
+        return "parquet"
+    elif header == ARROW_IPC_MAGIC:
+        return "arrow"
+
+    return None
+
+
+def _projected_schema(schema: pa.Schema, indices: FileIndices) -> pa.Schema:
+    """Create the schema of the columns that DRIVE reads. Each column is named
+    'f' followed by its index so the batches match the layout of the pyarrow
+    text reader
+
+    Parameters
+    ----------
+    schema : pa.Schema
+        schema of the columnar file
+
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd file
+
+    Returns
+    -------
+    pa.Schema
+        returns the schema with the declared type of each column
+
+    Raises
+    ------
+    ValueError
+        raises a ValueError if the file has fewer columns than the ibd format
+        needs
+    """
+    column_dtypes = indices.column_dtypes()
+
+    if max(column_dtypes) >= len(schema):
+        raise ValueError(
+            f"Expected the columnar ibd file to have at least {max(column_dtypes) + 1} columns in the same order as the text output of the IBD program ({indices}). Instead the file only had the columns: {', '.join(schema.names)}"  # noqa: E501
+        )
+
+    # Columns with a dtype that is not in _ARROW_TYPES keep the type that they
+    # have in the file
+    return pa.schema(
+        [
+            pa.field(
+                f"f{column_indx}",
+                _ARROW_TYPES.get(dtype, schema.field(column_indx).type),
+            )
+            for column_indx, dtype in column_dtypes.items()
+        ]
+    )
+
+
+def _prepare_batch(
+    batch: pa.RecordBatch, projected_schema: pa.Schema
+) -> pa.RecordBatch:
+    """Rename the columns of the batch and cast them to the declared types
+
+    Parameters
+    ----------
+    batch : pa.RecordBatch
+        batch with the projected columns in the order of projected_schema
+
+    projected_schema : pa.Schema
+        schema created by _projected_schema
+
+    Returns
+    -------
+    pa.RecordBatch
+        returns the batch with the projected schema
+    """
+    return batch.rename_columns(projected_schema.names).cast(projected_schema)
+
+
+def _statistic_range(
+    row_group: pq.RowGroupMetaData, column_indx: int
+) -> Optional[Tuple[Any, Any]]:
+    """Get the min and max statistics of a column in a row group
+
+    Parameters
+    ----------
+    row_group : pq.RowGroupMetaData
+        metadata of the row group
+
+    column_indx : int
+        index of the column in the file
+
+    Returns
+    -------
+    Optional[Tuple[Any, Any]]
+        returns the min and max value or None if the row group does not have
+        statistics for the column
+    """
+    statistics = row_group.column(column_indx).statistics
+
+    if statistics is None or not statistics.has_min_max:
+        return None
+
+    return statistics.min, statistics.max
+
+
+def _row_group_can_match(
+    row_group: pq.RowGroupMetaData,
+    indices: FileIndices,
+    region_start: int,
+    region_end: int,
+    min_centimorgan: Optional[float] = None,
+    target_chromosome: Optional[Union[int, str]] = None,
+) -> bool:
+    """Check if the row group can have a segment that passes the filters. Both
+    the 'contains' and 'overlaps' filters only keep segments that overlap the
+    region so a row group can be skipped if none of its segments overlap
+
+    Parameters
+    ----------
+    row_group : pq.RowGroupMetaData
+        metadata of the row group
+
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd file
+
+    region_start : int
+        start position of the target region
+
+    region_end : int
+        end position of the target region
+
+    min_centimorgan : Optional[float]
+        minimum segment length
+
+    target_chromosome : Optional[Union[int, str]]
+        chromosome of the target region
+
+    Returns
+    -------
+    bool
+        returns False if the statistics show that no segment in the row group
+        can pass the filters
+    """
+    start_range = _statistic_range(row_group, indices.str_indx)
+    end_range = _statistic_range(row_group, indices.end_indx)
+    cm_range = _statistic_range(row_group, indices.cM_indx)
+    chromosome_range = _statistic_range(row_group, indices.chr_indx)
+
+    if start_range is not None and start_range[0] > region_end:
+        return False
+
+    if end_range is not None and end_range[1] < region_start:
+        return False
+
+    if (
+        min_centimorgan is not None
+        and cm_range is not None
+        and cm_range[1] < min_centimorgan
+    ):
+        return False
+
+    # Row groups from files that are grouped by chromosome usually have one
+    # chromosome so they can be skipped if it is not the target chromosome
+    if (
+        target_chromosome is not None
+        and chromosome_range is not None
+        and chromosome_range[0] == chromosome_range[1]
+        and format_chromosome(chromosome_range[0])
+        != format_chromosome(target_chromosome)
+    ):
+        return False
+
+    return True
+
+
+def read_ibd_parquet(
+    ibd_file: Path,
+    indices: FileIndices,
+    chunksize: int,
+    region_start: int,
+    region_end: int,
+    min_centimorgan: Optional[float] = None,
+    target_chromosome: Optional[Union[int, str]] = None,
+) -> Iterator[DataFrame]:
+    """Read the segments of a Parquet file that overlap the target region. Row
+    groups are skipped if their statistics show that none of their segments
+    can pass the filters and the rest of the segments are filtered with the
+    same predicate as the pyarrow text reader
+
+    Parameters
+    ----------
+    ibd_file : Path
+        Path to the Parquet file
+
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd file
+
+    chunksize : int
+        number of segments that are collected before a DataFrame is returned
+
+    region_start : int
+        start position of the target region
+
+    region_end : int
+        end position of the target region
+
+    min_centimorgan : Optional[float]
+        minimum segment length
+
+    target_chromosome : Optional[Union[int, str]]
+        chromosome of the target region
+
+    Returns
+    -------
+    Iterator[DataFrame]
+        yields DataFrames whose column labels are the integer column indices of
+        the ibd file
+    """
+    # The file is closed once the segments are read or the caller closes the
+    # generator
+    with pq.ParquetFile(ibd_file, memory_map=True) as parquet_file:
+        projected_schema = _projected_schema(parquet_file.schema_arrow, indices)
+
+        row_groups: List[int] = [
+            row_group_indx
+            for row_group_indx in range(parquet_file.num_row_groups)
+            if _row_group_can_match(
+                parquet_file.metadata.row_group(row_group_indx),
+                indices,
+                region_start,
+                region_end,
+                min_centimorgan,
+                target_chromosome,
+            )
+        ]
+
+        logger.verbose(
+            f"Reading {len(row_groups)} of the {parquet_file.num_row_groups} row groups in {ibd_file}. The other row groups can not overlap the target region."  # noqa: E501
+        )
+
+        column_names = [
+            parquet_file.schema_arrow.names[column_indx]
+            for column_indx in indices.column_dtypes()
+        ]
+
+        batches = (
+            _prepare_batch(batch, projected_schema)
+            for batch in parquet_file.iter_batches(
+                batch_size=chunksize, row_groups=row_groups, columns=column_names
+            )
+        )
+
+        yield from filter_record_batches(
+            batches,
+            indices,
+            chunksize,
+            region_start,
+            region_end,
+            min_centimorgan,
+            source=ibd_file,
+        )
+
+
+def read_ibd_ipc(
+    ibd_file: Path,
+    indices: FileIndices,
+    chunksize: int,
+    region_start: int,
+    region_end: int,
+    min_centimorgan: Optional[float] = None,
+) -> Iterator[DataFrame]:
+    """Read the segments of an Arrow IPC (Feather) file that overlap the target
+    region. The file is memory mapped so only the columns that DRIVE uses are
+    read from disk
+
+    Parameters
+    ----------
+    ibd_file : Path
+        Path to the Arrow IPC file
+
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd file
+
+    chunksize : int
+        number of segments that are collected before a DataFrame is returned
+
+    region_start : int
+        start position of the target region
+
+    region_end : int
+        end position of the target region
+
+    min_centimorgan : Optional[float]
+        minimum segment length
+
+    Returns
+    -------
+    Iterator[DataFrame]
+        yields DataFrames whose column labels are the integer column indices of
+        the ibd file
+    """
+    # The file is closed once the segments are read or the caller closes the
+    # generator
+    with (
+        pa.memory_map(str(ibd_file)) as mapped_file,
+        pa.ipc.open_file(mapped_file) as reader,
+    ):
+        projected_schema = _projected_schema(reader.schema, indices)
+
+        column_indices = list(indices.column_dtypes())
+
+        batches = (
+            _prepare_batch(
+                reader.get_batch(batch_indx).select(column_indices),
+                projected_schema,
+            )
+            for batch_indx in range(reader.num_record_batches)
+        )
+
+        yield from filter_record_batches(
+            batches,
+            indices,
+            chunksize,
+            region_start,
+            region_end,
+            min_centimorgan,
+            source=ibd_file,
+        )
@@ -0,0 +1,192 @@
+"""Module with the accumulator that collects the edges of the graph while the IBD
+file is read in chunks. The edges are kept in preallocated numpy arrays that
+grow geometrically so that the total amount of copying stays linear in the
+number of edges. If a memory limit is provided then the arrays are moved to
+memory mapped files in a temporary directory once they would grow past the
+limit so that the operating system can page the edges out to disk."""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Optional
+
+import numpy as np
+import numpy.typing as npt
+from log import CustomLogger
+from pandas import DataFrame
+
+logger = CustomLogger.get_logger(__name__)
+
+# number of bytes used to store one edge in the idnum1, idnum2, and cm arrays
+EDGE_BYTES = 12
+
+
+@dataclass
+class EdgeAccumulator:
+    """Class that collects the integer haplotype ids of each pair and the length
+    of the shared segment
+
+    Parameters
+    ----------
+    capacity : int
+        number of edges that can be stored before the arrays have to grow
+
+    size : int
+        number of edges that have been added
+
+    idnum1 : npt.NDArray[np.int32]
+        integer id of the first haplotype of each pair
+
+    idnum2 : npt.NDArray[np.int32]
+        integer id of the second haplotype of each pair
+
+    cm : npt.NDArray[np.float32]
+        length of each shared segment in centimorgans
+
+    memory_limit : Optional[int]
+        number of bytes that the arrays can use in memory. Once the arrays
+        would grow past this limit they are stored in memory mapped files
+        instead. If this value is None then the arrays are always kept in
+        memory
+
+    spill_dir : Optional[TemporaryDirectory]
+        temporary directory that has the memory mapped files. The directory
+        is removed when the accumulator is garbage collected
+    """
+
+    capacity: int = 65_536
+    size: int = 0
+    idnum1: npt.NDArray[np.int32] = field(init=False)
+    idnum2: npt.NDArray[np.int32] = field(init=False)
+    cm: npt.NDArray[np.float32] = field(init=False)
+    memory_limit: Optional[int] = None
+    spill_dir: Optional[TemporaryDirectory] = field(init=False, default=None)
+
+    def __post_init__(self) -> None:
+        self.idnum1 = np.empty(self.capacity, dtype=np.int32)
+        self.idnum2 = np.empty(self.capacity, dtype=np.int32)
+        self.cm = np.empty(self.capacity, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def spilled(self) -> bool:
+        """Whether the arrays are stored in memory mapped files"""
+        return self.spill_dir is not None
+
+    def _allocate(self, attr_name: str, dtype: np.dtype, capacity: int) -> npt.NDArray:
+        """Create an empty array for one of the edge attributes. If the edges
+        have been spilled to disk then a new memory mapped file is created
+
+        Parameters
+        ----------
+        attr_name : str
+            name of the attribute that the array is for
+
+        dtype : np.dtype
+            data type of the array
+
+        capacity : int
+            number of elements in the array
+
+        Returns
+        -------
+        npt.NDArray
+            returns the uninitialized array
+        """
+        if not self.spilled:
+            return np.empty(capacity, dtype=dtype)
+
+        return np.memmap(
+            Path(self.spill_dir.name) / f"{attr_name}_{capacity}.bin",
+            dtype=dtype,
+            mode="w+",
+            shape=(capacity,),
+        )
+
+    def _grow(self, required_size: int) -> None:
+        """Double the capacity of the arrays until they can hold required_size
+        edges
+
+        Parameters
+        ----------
+        required_size : int
+            number of edges that the arrays need to be able to hold
+        """
+        new_capacity = self.capacity
+
+        while new_capacity < required_size:
+            new_capacity *= 2
+
+        if (
+            self.memory_limit is not None
+            and not self.spilled
+            and new_capacity * EDGE_BYTES > self.memory_limit
+        ):
+            self.spill_dir = TemporaryDirectory(prefix="drive_edges_")
+
+            logger.info(
+                f"The edges would use more than the memory limit of {self.memory_limit} bytes. Spilling {self.size} edges to memory mapped files in {self.spill_dir.name}"  # noqa: E501
+            )
+
+        for attr_name in ["idnum1", "idnum2", "cm"]:
+            old_array = getattr(self, attr_name)
+            new_array = self._allocate(attr_name, old_array.dtype, new_capacity)
+            new_array[: self.size] = old_array[: self.size]
+            setattr(self, attr_name, new_array)
+
+            # The file of the smaller memory mapped array is no longer needed
+            if isinstance(old_array, np.memmap):
+                Path(old_array.filename).unlink()
+
+        self.capacity = new_capacity
+
+    def append(
+        self,
+        idnum1: npt.ArrayLike,
+        idnum2: npt.ArrayLike,
+        cm: npt.ArrayLike,
+    ) -> None:
+        """Add the edges from a chunk of the ibd file
+
+        Parameters
+        ----------
+        idnum1 : npt.ArrayLike
+            integer id of the first haplotype of each pair
+
+        idnum2 : npt.ArrayLike
+            integer id of the second haplotype of each pair
+
+        cm : npt.ArrayLike
+            length of each shared segment in centimorgans
+        """
+        edge_count = len(idnum1)
+
+        if self.size + edge_count > self.capacity:
+            self._grow(self.size + edge_count)
+
+        self.idnum1[self.size : self.size + edge_count] = idnum1
+        self.idnum2[self.size : self.size + edge_count] = idnum2
+        self.cm[self.size : self.size + edge_count] = cm
+
+        self.size += edge_count
+
+    def to_frame(self) -> DataFrame:
+        """Create the edges DataFrame. The columns are views of the filled part
+        of each array so no copy is made. If the edges were spilled to disk
+        then the columns are backed by the memory mapped files
+
+        Returns
+        -------
+        DataFrame
+            returns a dataframe with the columns idnum1, idnum2, and cm
+        """
+        return DataFrame(
+            {
+                "idnum1": self.idnum1[: self.size],
+                "idnum2": self.idnum2[: self.size],
+                "cm": self.cm[: self.size],
+            },
+            copy=False,
+        )
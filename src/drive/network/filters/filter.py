@@ -1,14 +1,54 @@
+import gzip
 import sys
+from contextlib import closing, nullcontext
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Callable, Dict, Iterator, List, Optional, TypeVar
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import numpy as np
+import numpy.typing as npt
 from log import CustomLogger
-from pandas import DataFrame, concat, read_csv
-
-from drive.network.models import FileIndices, Genes
+from pandas import DataFrame, Index, factorize, read_csv
+
+from drive.network.models import (
+    FileIndices,
+    Genes,
+    HaplotypeMapper,
+    pack_haplotypes,
+    unpack_haplotypes,
+)
+from drive.utilities.functions import is_standard_stream
+
+from .arrow_reader import read_ibd_arrow
+from .chromosomes import ChromosomeTracker, chromosome_mask
+from .chunk_tuner import DEFAULT_CHUNKSIZE, tuned_chunks
+from .columnar_reader import columnar_format, read_ibd_ipc, read_ibd_parquet
+from .bgzf_reader import is_bgzf, read_ibd_bgzf
+from .edge_accumulator import EdgeAccumulator
+from .multi_file_reader import MultiFileReader
+from .parallel_reader import GZIP_MAGIC, ByteRange, ParallelReader, is_gzipped
+from .prefetch_reader import prefetch_chunks
+from .segment_store import (
+    load_index_metadata,
+    read_segment_index,
+    read_segment_store,
+    segment_index_path,
+    segment_store_path,
+    write_segment_store,
+)
+from .sorted_positions import SortedPositionTracker
 
 logger = CustomLogger.get_logger(__name__)
 
@@ -17,6 +57,71 @@ logger = CustomLogger.get_logger(__name__)
 T = TypeVar("T", bound="IbdFilter")
 
 
+def read_ibd_text(
+    ibd_file: Union[Path, BinaryIO],
+    indices: FileIndices,
+    chunksize: int,
+    memory_map: bool = False,
+) -> Iterator[DataFrame]:
+    """Read the tab separated ibd file in chunks
+
+    Parameters
+    ----------
+    ibd_file : Union[Path, BinaryIO]
+        Path object containing the filepath for the ibd
+        file from hapibd, iLASH, etc... An open binary file
+        can also be provided
+
+    indices: FileIndices
+        Object that has all the indices for the necessary
+        columns in the ibd file.
+
+    chunksize : int
+        number of rows of the dataframe to read in a 1 time.
+
+    memory_map : bool
+        whether to memory map the file instead of reading it through a file
+        buffer. This option can only be used with an uncompressed file path
+
+    Returns
+    -------
+    Iterator[DataFrame]
+        returns an iterator of the dataframe chunks
+    """
+    # Only the columns that DRIVE uses are parsed and each column has a compact
+    # dtype. The ids are always read in as strings
+    col_dtypes = indices.column_dtypes()
+
+    return read_csv(
+        ibd_file,
+        sep="\t",
+        header=None,
+        chunksize=chunksize,
+        usecols=list(col_dtypes.keys()),
+        dtype=col_dtypes,
+        engine="c",
+        memory_map=memory_map,
+    )
+
+
+def open_standard_input() -> BinaryIO:
+    """Open standard input so the segments can be streamed from another
+    program. Gzip compressed input is detected from the first bytes of the
+    stream and decompressed while it is read
+
+    Returns
+    -------
+    BinaryIO
+        returns the binary stream of standard input
+    """
+    stdin = sys.stdin.buffer
+
+    if stdin.peek(len(GZIP_MAGIC))[: len(GZIP_MAGIC)] == GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=stdin, mode="rb")
+
+    return stdin
+
+
 @dataclass
 class IbdFilter:
     """
@@ -47,17 +152,36 @@ class IbdFilter:
 
     ibd_pd : DataFrame
         dataframe representing the pairwise segments. Each row is the pair ids
-        and the length of the segment
-
-    hapid_map : Dict[str, int]
-        dictionary mapping the haplotype to a unique integer id
-
-    all_haplotypes : List[str]
-        list of all the different haplotypes in the IBD data
-
-    haplotype_id : int = 0
-        This value is used as the counter and is incremented as the program runs
-
+        and the length of the segment. The columns are idnum1, idnum2, and cm
+
+    edges : EdgeAccumulator
+        arrays that collect the haplotype ids and segment lengths of each
+        pair while the chunks are read. ibd_pd is created from these arrays
+
+    all_haplotypes : Index
+        table of the integer keys of all the different haplotypes in the IBD
+        data. Each key packs the position of the sample in all_samples with
+        the phase. The position of each haplotype in the table is its integer
+        id so the table maps haplotypes to ids with get_indexer and ids back
+        to haplotypes by position
+
+    all_samples : Index
+        table of the interned sample ids of the haplotypes. The haplotype
+        strings are only rebuilt from this table when the output is written
+
+    haplotype_iids : List[npt.NDArray]
+        individual ids of the haplotypes in all_haplotypes. Each element of
+        the list has the ids of the haplotypes that were added for one chunk
+
+    parallel_reader : Optional[ParallelReader]
+        reader that splits the ibd file into byte ranges that are filtered
+        by worker processes. If this value is None then the chunks in
+        ibd_file are read one at a time
+
+    file_reader : Optional[MultiFileReader]
+        reader for when more than one ibd file was provided. Each file is
+        filtered on its own and the segments are merged in the order of
+        the files
     """
 
     ibd_file: Iterator[
@@ -68,42 +192,102 @@ class IbdFilter:
     filter: Optional[Callable] = None
     ibd_vs: DataFrame = field(default_factory=DataFrame)
     ibd_pd: DataFrame = field(default_factory=DataFrame)
-    hapid_map: Dict[str, int] = field(default_factory=dict)
-    all_haplotypes: List[str] = field(default_factory=list)
-    haplotype_id: int = 0
+    edges: EdgeAccumulator = field(default_factory=EdgeAccumulator)
+    all_haplotypes: Index = field(default_factory=lambda: Index([], dtype=np.int64))
+    all_samples: Index = field(default_factory=lambda: Index([], dtype=object))
+    haplotype_iids: List[npt.NDArray] = field(default_factory=list)
+    parallel_reader: Optional[ParallelReader] = None
+    file_reader: Optional[MultiFileReader] = None
 
     @classmethod
     def load_file(
         cls,
-        ibd_file: Path,
+        ibd_file: Union[Path, List[Path]],
         indices: FileIndices,
         target_gene: Genes,
-        chunksize: int = 100_000,
+        chunksize: Optional[int] = None,
+        cache_dir: Optional[Path] = None,
+        index_file: Optional[Path] = None,
+        reader_engine: str = "pandas",
+        min_centimorgan: Optional[float] = None,
+        threads: int = 1,
+        memory_limit: Optional[int] = None,
     ) -> T:
         """Factory method that returns the IBDFilter model
         This method makes sure that the ibd file exists
 
         Parameters
         ----------
-        ibd_file : Path
+        ibd_file : Union[Path, List[Path]]
             Path object containing the filepath for the ibd
-            file from hapibd, iLASH, etc...
+            file from hapibd, iLASH, etc... The file can also be
+            a Parquet or Arrow IPC (Feather) file with the same
+            columns in the same order. A list of files, such
+            as one file per chromosome, can also be provided. The
+            files are read as if they were concatenated together.
+            If the path is '-' then the segments are streamed from
+            standard input.
 
         indices: FileIndices
             Object that has all the indices for the necessary
             columns in the ibd file. This object also has a
-            get_haplotype_ids method that will form the
-            haplotype ibd.
+            get_haplotype_parts method that splits the
+            haplotypes into the sample id and the phase.
 
         target_gene : Genes
             namedtuple that has attributes for the
             chromosome, the gene start position, and the
             gene end position.
 
-        chunksize : int
+        chunksize : Optional[int]
             number of rows of the dataframe to read in a 1 time.
             Larger chunksize will mean the data is loaded faster
-            but memory also increases.
+            but memory also increases. If this value is None then
+            text files are read with a chunksize that is tuned from
+            the bytes per row of the first chunk, the available
+            memory, and the observed throughput. The other readers
+            use a chunksize of 100,000 rows.
+
+        cache_dir : Optional[Path]
+            directory used to cache the parsed segments. If a cache
+            for the ibd file already exists in this directory then
+            the segments are memory mapped from the cache instead
+            of being parsed. Otherwise the cache is created.
+
+        index_file : Optional[Path]
+            filepath to the segment index built by 'drive utilities
+            index'. If no path is provided then DRIVE looks for an
+            index next to the ibd file. When an up to date index is
+            found only the blocks that can overlap the target region
+            are read. If more than one ibd file is provided then
+            this argument is ignored and each file uses the index
+            next to it if one exists.
+
+        reader_engine : str
+            engine used to parse the text file. 'pandas' reads every
+            row with pandas.read_csv. 'pyarrow' streams the file with
+            pyarrow and only converts the segments that overlap the
+            target region and pass the centimorgan threshold.
+
+        min_centimorgan : Optional[float]
+            minimum segment length used by the pyarrow reader to skip
+            segments while the file is read
+
+        threads : int
+            number of processes used to read the ibd file. If this value
+            is larger than 1 then an uncompressed ibd file is split into
+            byte ranges that are parsed and filtered in parallel and the
+            blocks of a block gzipped (BGZF) file are decompressed by
+            this many threads. The cache and the index are always read
+            by one process. If more than one ibd file is provided then
+            this many files are read at the same time by separate
+            processes.
+
+        memory_limit : Optional[int]
+            number of megabytes that the filtered edges can use in
+            memory. Once the edges would grow past this limit they are
+            spilled to memory mapped files in a temporary directory.
+            If this value is None then the edges are kept in memory.
 
         Returns
         -------
@@ -115,65 +299,410 @@ class IbdFilter:
         FileNotFoundError
             raises an error if the file doesn't exist
         """
+        if isinstance(ibd_file, list) and len(ibd_file) == 1:
+            ibd_file = ibd_file[0]
+
+        edges = EdgeAccumulator(
+            memory_limit=memory_limit * 1024 * 1024 if memory_limit else None
+        )
+
+        if isinstance(ibd_file, list):
+            for input_file in ibd_file:
+                if not input_file.is_file():
+                    raise FileNotFoundError(f"The file, {input_file}, was not found")
+
+            if index_file is not None:
+                logger.warning(
+                    f"More than one ibd file was provided so the ibd index at {index_file} is ignored. Each file uses the index next to it if one exists."  # noqa: E501
+                )
+
+            return cls(
+                iter(()),
+                indices,
+                target_gene,
+                edges=edges,
+                file_reader=MultiFileReader(
+                    ibd_file,
+                    indices,
+                    threads,
+                    chunksize,
+                    cache_dir,
+                    reader_engine,
+                    min_centimorgan,
+                ),
+            )
+
+        # The chunksize is only tuned for the pandas text reader because the
+        # other readers either use the chunksize as a block size or return
+        # chunks that were already filtered
+        tune_chunksize = chunksize is None
+
+        if tune_chunksize:
+            chunksize = DEFAULT_CHUNKSIZE
+
+        # Standard input can only be read once from start to end so it is
+        # always parsed in chunks by the main process
+        if is_standard_stream(ibd_file):
+            logger.verbose("Streaming the ibd input from standard input")
+
+            if threads > 1 or cache_dir or index_file or reader_engine != "pandas":
+                logger.warning(
+                    "The ibd input is streamed from standard input so the threads, ibd cache, ibd index, and reader engine options are ignored."  # noqa: E501
+                )
+
+            input_file_chunks = read_ibd_text(open_standard_input(), indices, chunksize)
+
+            return cls(
+                (
+                    tuned_chunks(input_file_chunks)
+                    if tune_chunksize
+                    else input_file_chunks
+                ),
+                indices,
+                target_gene,
+                edges=edges,
+            )
+
         logger.verbose(f"Reading in the ibd input file at {ibd_file}")
 
         if not ibd_file.is_file():
             raise FileNotFoundError(f"The file, {ibd_file}, was not found")
 
-        # we can set column types
-        col_dtypes = {
-            indices.id1_indx: "string[pyarrow]",
-            indices.id2_indx: "string[pyarrow]",
-            indices.str_indx: "int32",
-            indices.end_indx: "int32",
-            indices.cM_indx: "float32",
-        }
-        # we need to make sure that the id columns read in as strings no matter what
-        input_file_chunks = read_csv(
-            ibd_file,
-            sep="\t",
-            header=None,
-            chunksize=chunksize,
-            dtype=col_dtypes,
-            engine="c",
+        if index_file is None:
+            index_file = segment_index_path(ibd_file)
+
+        block_stats = (
+            load_index_metadata(index_file, ibd_file, indices)
+            if index_file.is_file()
+            else None
         )
 
-        return cls(input_file_chunks, indices, target_gene)
+        file_format = columnar_format(ibd_file)
+
+        if file_format == "parquet":
+            input_file_chunks = read_ibd_parquet(
+                ibd_file,
+                indices,
+                chunksize,
+                target_gene.start,
+                target_gene.end,
+                min_centimorgan,
+                target_gene.chr,
+            )
+        elif file_format == "arrow":
+            input_file_chunks = read_ibd_ipc(
+                ibd_file,
+                indices,
+                chunksize,
+                target_gene.start,
+                target_gene.end,
+                min_centimorgan,
+            )
+        elif block_stats is not None:
+            logger.info(
+                f"Reading the segments that can overlap the target region from the index {index_file}"  # noqa: E501
+            )
+            input_file_chunks = read_segment_index(
+                index_file,
+                block_stats,
+                indices,
+                chunksize,
+                target_gene.start,
+                target_gene.end,
+                target_gene.chr,
+            )
+        elif cache_dir is not None:
+            input_file_chunks = cls._load_from_cache(
+                ibd_file, indices, chunksize, cache_dir
+            )
+        elif threads > 1 and is_bgzf(ibd_file):
+            input_file_chunks = read_ibd_bgzf(
+                ibd_file,
+                indices,
+                chunksize,
+                threads,
+                reader_engine,
+                target_gene.start,
+                target_gene.end,
+                min_centimorgan,
+            )
+        elif threads > 1 and not is_gzipped(ibd_file):
+            return cls(
+                iter(()),
+                indices,
+                target_gene,
+                edges=edges,
+                parallel_reader=ParallelReader(
+                    ibd_file,
+                    indices,
+                    threads,
+                    chunksize,
+                    reader_engine,
+                    min_centimorgan,
+                ),
+            )
+        else:
+            if threads > 1:
+                logger.warning(
+                    f"The file {ibd_file} is gzip compressed so it can not be split into byte ranges or BGZF blocks. The file will be read by one process. Compressing the file with bgzip instead of gzip allows it to be decompressed in parallel."  # noqa: E501
+                )
+
+            # Uncompressed files are memory mapped so that the pages are read
+            # straight from the page cache, which is shared with any other
+            # DRIVE jobs reading the same file
+            memory_map = not is_gzipped(ibd_file)
+
+            if memory_map:
+                logger.verbose(f"Memory mapping the uncompressed ibd file {ibd_file}")
+
+            if reader_engine == "pyarrow":
+                input_file_chunks = read_ibd_arrow(
+                    ibd_file,
+                    indices,
+                    chunksize,
+                    target_gene.start,
+                    target_gene.end,
+                    min_centimorgan,
+                    memory_map=memory_map,
+                )
+            else:
+                input_file_chunks = read_ibd_text(
+                    ibd_file, indices, chunksize, memory_map
+                )
+
+                if tune_chunksize:
+                    input_file_chunks = tuned_chunks(input_file_chunks)
+
+        return cls(input_file_chunks, indices, target_gene, edges=edges)
 
-    def _generate_map(self, chunk_data: DataFrame) -> None:
-        """Method that will generate the dictionary that maps hapibd to integers
+    @staticmethod
+    def _load_from_cache(
+        ibd_file: Path, indices: FileIndices, chunksize: int, cache_dir: Path
+    ) -> Iterator[DataFrame]:
+        """Load the segments from the columnar cache. The cache is built first
+        if this is the first time the ibd file has been read
 
         Parameters
         ----------
-        data_chunk : pd.DataFrame
-            chunk of the ibdfile. The size of this chunk is determined by the
-            chunksize argument to pd.read_csv. This value is currently set to 100,000.
+        ibd_file : Path
+            Path object containing the filepath for the ibd
+            file from hapibd, iLASH, etc...
+
+        indices: FileIndices
+            Object that has all the indices for the necessary
+            columns in the ibd file.
+
+        chunksize : int
+            number of rows of the dataframe to read in a 1 time.
+
+        cache_dir : Path
+            directory used to cache the parsed segments.
+
+        Returns
+        -------
+        Iterator[DataFrame]
+            returns an iterator of the dataframe chunks
         """
-        haplotypes = chunk_data.values.ravel()
+        cache_path = segment_store_path(cache_dir, ibd_file, indices)
 
-        logger.verbose(f"identified {len(haplotypes)} haplotypes in this chunk.")
+        if cache_path.exists():
+            logger.info(f"Loading the cached ibd segments from {cache_path}")
+        else:
+            logger.info(
+                f"No cached segments were found for {ibd_file}. Writing the parsed segments to {cache_path}"  # noqa: E501
+            )
+            try:
+                write_segment_store(
+                    read_ibd_text(ibd_file, indices, chunksize), cache_path, indices
+                )
+            except OSError as e:
+                logger.warning(
+                    f"Unable to write the segment cache to {cache_path} due to the error: {e}. Reading the ibd file without a cache."  # noqa: E501
+                )
+                return read_ibd_text(ibd_file, indices, chunksize)
 
-        # iterate over each haplotype and add it to the
-        # dictionary if the value is not present
-        for value in haplotypes:
-            key_value = self.hapid_map.setdefault(value, self.haplotype_id)
-            if key_value == self.haplotype_id:
-                self.haplotype_id += 1
+        return read_segment_store(cache_path, chunksize)
 
-    def _map_grids(self, data_chunk: DataFrame) -> None:
-        """Function responsible for creating two new columns that
-        have the haplotype id numbers.
+    def _generate_map(self, data_chunk: DataFrame) -> npt.NDArray[np.int32]:
+        """Method that will assign each haplotype an integer id. The
+        haplotypes in the chunk are factorized and only the haplotypes that
+        have not been seen in an earlier chunk are appended to the
+        all_haplotypes table along with the individual id of the haplotype.
+        New haplotypes get ids in the order that they first appear in the
+        chunk.
 
+        Parameters
+        ----------
         data_chunk : pd.DataFrame
-            chunk of the ibdfile. The size of this chunk is
-            determined by the chunksize argument to
+            chunk of the ibdfile that has the columns hapid1 and hapid2. The
+            size of this chunk is determined by the chunksize argument to
             pd.read_csv. This value is currently set to 100,000.
+
+        Returns
+        -------
+        npt.NDArray[np.int32]
+            returns an array with two columns that has the integer ids of
+            hapid1 and hapid2 for each pair
         """
-        # we are going to map the haplotype id to integers in a new
-        # column. this needs to be done for both hapid1 an hapid2
-        data_chunk.loc[:, "idnum1"] = data_chunk["hapid1"].map(self.hapid_map)
+        # The pairs are flattened row by row so that hapid1 and hapid2 for the
+        # same segment are next to each other
+        codes, haplotypes = factorize(
+            data_chunk[["hapid1", "hapid2"]].to_numpy().ravel()
+        )
+
+        # We also need the individual id of each haplotype for the vertices.
+        # The ids are taken from the first row where each haplotype appears
+        individual_ids = data_chunk[
+            [self.indices.id1_indx, self.indices.id2_indx]
+        ].to_numpy()
+
+        _, first_appearance = np.unique(codes, return_index=True)
+
+        haplotype_ids, new_haplotypes = self._add_haplotypes(
+            haplotypes, individual_ids.ravel()[first_appearance]
+        )
+
+        logger.verbose(
+            f"identified {len(haplotypes)} haplotypes in this chunk. {new_haplotypes.sum()} of these haplotypes were not in previous chunks."  # noqa: E501
+        )
+
+        return haplotype_ids[codes].astype(np.int32).reshape(-1, 2)
+
+    def _add_haplotypes(
+        self, haplotypes: npt.NDArray, individual_ids: npt.NDArray
+    ) -> Tuple[npt.NDArray[np.intp], npt.NDArray[np.bool_]]:
+        """Look up the integer id of each haplotype. Haplotypes that are not in
+        the all_haplotypes table yet are appended to it in the order that they
+        are provided
 
-        data_chunk.loc[:, "idnum2"] = data_chunk["hapid2"].map(self.hapid_map)
+        Parameters
+        ----------
+        haplotypes : npt.NDArray
+            array of unique integer haplotype keys
+
+        individual_ids : npt.NDArray
+            array with the individual id of each haplotype
+
+        Returns
+        -------
+        Tuple[npt.NDArray[np.intp], npt.NDArray[np.bool_]]
+            returns a tuple where the first element is the integer id of each
+            haplotype and the second element is a boolean array that is True
+            for the haplotypes that were added to the table
+        """
+        haplotype_ids = self.all_haplotypes.get_indexer(haplotypes)
+
+        new_haplotypes = haplotype_ids == -1
+
+        haplotype_ids[new_haplotypes] = np.arange(
+            len(self.all_haplotypes),
+            len(self.all_haplotypes) + new_haplotypes.sum(),
+        )
+
+        self.all_haplotypes = self.all_haplotypes.append(
+            Index(haplotypes[new_haplotypes], dtype=np.int64)
+        )
+
+        self.haplotype_iids.append(individual_ids[new_haplotypes])
+
+        return haplotype_ids, new_haplotypes
+
+    def _add_samples(self, samples: npt.NDArray) -> npt.NDArray[np.intp]:
+        """Look up the position of each sample in the all_samples table.
+        Samples that are not in the table yet are appended to it
+
+        Parameters
+        ----------
+        samples : npt.NDArray
+            array of unique sample ids
+
+        Returns
+        -------
+        npt.NDArray[np.intp]
+            returns the position of each sample in the all_samples table
+        """
+        sample_indices = self.all_samples.get_indexer(samples)
+
+        new_samples = sample_indices == -1
+
+        sample_indices[new_samples] = np.arange(
+            len(self.all_samples), len(self.all_samples) + new_samples.sum()
+        )
+
+        self.all_samples = self.all_samples.append(
+            Index(samples[new_samples], dtype=object)
+        )
+
+        return sample_indices
+
+    def _haplotype_keys(
+        self, data_chunk: DataFrame, ind_id_indx: int, phase_col_indx: int
+    ) -> npt.NDArray[np.int64]:
+        """Create the integer key of the haplotype in one of the pair columns.
+        The sample ids are factorized so only the unique samples of the chunk
+        are looked up in the sample table
+
+        Parameters
+        ----------
+        data_chunk : pd.DataFrame
+            chunk of the ibdfile
+
+        ind_id_indx : int
+            index of the individual id column of the pair
+
+        phase_col_indx : int
+            index of the phase column of the pair
+
+        Returns
+        -------
+        npt.NDArray[np.int64]
+            returns the haplotype key for each row of the chunk
+        """
+        samples, phases = self.indices.get_haplotype_parts(
+            data_chunk, ind_id_indx, phase_col_indx
+        )
+
+        sample_codes, unique_samples = factorize(samples)
+
+        sample_indices = self._add_samples(np.asarray(unique_samples, dtype=object))
+
+        return pack_haplotypes(sample_indices[sample_codes], phases)
+
+    def haplotype_mapper(self) -> HaplotypeMapper:
+        """Create the object that maps the integer vertex ids back to the
+        haplotype strings and sample ids
+
+        Returns
+        -------
+        HaplotypeMapper
+            returns the mapper for the haplotype table of this object
+        """
+        return HaplotypeMapper(
+            self.all_haplotypes.to_numpy(), self.all_samples.to_numpy(), self.indices
+        )
+
+    def _filter_for_chromosome(self, data_chunk: DataFrame) -> DataFrame:
+        """Restrict the chunk to the segments on the target chromosome. This
+        filter is applied before the positional filters because segments on
+        other chromosomes can have the same positions as the target region
+
+        Parameters
+        ----------
+        data_chunk : pd.DataFrame
+            chunk of the ibdfile
+
+        Returns
+        -------
+        pd.DataFrame
+            returns the segments on the target chromosome. If the target does
+            not have a chromosome then the chunk is returned unchanged
+        """
+        if self.target_gene.chr is None:
+            return data_chunk
+
+        return data_chunk[
+            chromosome_mask(data_chunk[self.indices.chr_indx], self.target_gene.chr)
+        ]
 
     def _contains_filter(self, data_chunk: DataFrame, min_cm: int) -> DataFrame:
         """Method that will filter the ibd file on four conditions: Chromosome number is the same, segment start position is <= target start position, segment end position is >= to the start position, and the size of the segment is >= to the minimum centimorgan threshold.
@@ -202,6 +731,8 @@ class IbdFilter:
             exception is raised. It is assumed to be due the user
             providing the incorrect file by accident
         """  # noqa: E501
+        data_chunk = self._filter_for_chromosome(data_chunk)
+
         # We are going to filter the data and then make a copy
         # of it to return so that we don't get the
         # SettingWithCopyWarning
@@ -239,6 +770,7 @@ class IbdFilter:
             exception is raised. It is assumed to be due the user
             providing the incorrect file by accident
         """  # noqa: E501
+        data_chunk = self._filter_for_chromosome(data_chunk)
 
         # We are going to filter the data and then make a copy
         # of it to return so that we don't get the
@@ -316,31 +848,44 @@ class IbdFilter:
                 f"Expected the keys hapid1 and hapid2 to be in the dataframe. Instead the only keys were: {', '.join(data.columns)}"  # noqa: E501
             )
 
-    def _generate_vertices(self, data_chunk: DataFrame) -> None:
+    def _generate_vertices(self) -> None:
         """Method that will generate the vertices dataframe which just has the
-        columns idnum, hapID, and IID
-
-        Parameters
-        ----------
-        data_chunk : pd.DataFrame
-            chunk of the ibdfile. The size of this chunk is
-            determined by the chunksize argument to
-            pd.read_csv. This value is currently set to 100,000.
+        columns idnum, hapID, and IID. The hapID column has the integer
+        haplotype keys. The vertices are created once from the haplotype table
+        after every chunk has been read
         """
-        id1_df = data_chunk[["idnum1", "hapid1", self.indices.id1_indx]].rename(
-            columns={"idnum1": "idnum", "hapid1": "hapID", 0: "IID"}
+        self.ibd_vs = DataFrame(
+            {
+                "idnum": np.arange(len(self.all_haplotypes), dtype=np.int32),
+                "hapID": self.all_haplotypes.to_numpy(),
+                "IID": np.concatenate(self.haplotype_iids),
+            }
         )
 
-        self.ibd_vs = concat([self.ibd_vs, id1_df])
+    @staticmethod
+    def _build_cohort_lookup(cohort_ids: Optional[List[str]] = None) -> Optional[Index]:
+        """Create the lookup used to restrict the segments to the cohort. The
+        hash table of the Index is built the first time it is used and then it
+        is reused for every chunk instead of being rebuilt by Series.isin
 
-        id2_df = data_chunk[["idnum2", "hapid2", self.indices.id2_indx]].rename(
-            columns={"idnum2": "idnum", "hapid2": "hapID", 2: "IID"}
-        )
+        Parameters
+        ----------
+        cohort_ids : List[str]
+            Lists of ids that make up the cohort.
 
-        self.ibd_vs = concat([self.ibd_vs, id2_df])
+        Returns
+        -------
+        Optional[Index]
+            returns an Index of the unique cohort ids or None if no cohort
+            ids were provided
+        """
+        if not cohort_ids:
+            return None
+
+        return Index(cohort_ids, dtype=object).unique()
 
     def _filter_for_cohort(
-        self, chunk: DataFrame, cohort_ids: Optional[List[str]] = None
+        self, chunk: DataFrame, cohort_lookup: Optional[Index] = None
     ) -> DataFrame:
         """filter cohort chunk to individuals in the cohort
         list
@@ -351,8 +896,9 @@ class IbdFilter:
             chunk of pandas dataframe that has information about the shared
             pairwise IBD segment.
 
-        cohort_ids : List[str]
-            Lists of ids that make up the cohort. The ibd_file will be filtered to only this list.
+        cohort_lookup : Optional[Index]
+            Index of the ids that make up the cohort created by
+            _build_cohort_lookup. The ibd_file will be filtered to only these ids.
 
         Returns
         -------
@@ -361,13 +907,19 @@ class IbdFilter:
         """  # noqa: E501
         # if no cohort ids were provided then we just return the chunk, otherwise we
         # filter the dataframe for where id1 and id2 are in the cohort
-        if not cohort_ids:
+        if cohort_lookup is None or chunk.empty:
             return chunk
         else:
             return chunk[
-                (chunk[self.indices.id1_indx].isin(cohort_ids))
-                & (chunk[self.indices.id2_indx].isin(cohort_ids))
-            ]
+                (
+                    cohort_lookup.get_indexer(chunk[self.indices.id1_indx].to_numpy())
+                    != -1
+                )
+                & (
+                    cohort_lookup.get_indexer(chunk[self.indices.id2_indx].to_numpy())
+                    != -1
+                )
+            ].copy()
 
     def _check_for_no_shared_segments(ibd_pd: DataFrame, ibd_vs: DataFrame) -> None:
         """Check to ensure that there were shared IBD segments
@@ -410,105 +962,469 @@ class IbdFilter:
             )
 
     def _check_empty_dataframes(self) -> None:
-        """Check if the provided dataframe is empty. If it is
-        then it raises an error and exits the program"""
-        if self.ibd_pd.empty:
+        """Check if any edges passed the filters. If none did
+        then it logs a message and exits the program"""
+        if len(self.edges) == 0:
             logger.info(
                 "No individuals from the analysis cohort share an IBD segment across the provided target region. Please ensure that the target region is correct. Exiting program now."  # noqa: E501
             )
             sys.exit(0)
 
-    def preprocess(
+    def _add_segments(self, size_filtered_chunk: DataFrame) -> None:
+        """Add the segments that passed the filters to the edges and vertices
+        of the graph
+
+        Parameters
+        ----------
+        size_filtered_chunk : DataFrame
+            chunk of the ibd file that has already been filtered to the
+            target region and the minimum centimorgan threshold
+        """
+        if size_filtered_chunk.empty:
+            return
+
+        # We have to add two column with the integer haplotype keys
+        size_filtered_chunk["hapid1"] = self._haplotype_keys(
+            size_filtered_chunk, self.indices.id1_indx, self.indices.hap1_indx
+        )
+
+        size_filtered_chunk["hapid2"] = self._haplotype_keys(
+            size_filtered_chunk, self.indices.id2_indx, self.indices.hap2_indx
+        )
+        # We then need to make sure that there are no
+        # duplicates in the dataframe
+        removed_dups = self._remove_dups(size_filtered_chunk)
+
+        # We need to map the haplotypes to integer ids and then keep only the
+        # ids and the segment length for the edges of the graph
+        pair_ids = self._generate_map(removed_dups)
+
+        self.edges.append(
+            pair_ids[:, 0],
+            pair_ids[:, 1],
+            removed_dups[self.indices.cM_indx].to_numpy(),
+        )
+
+    def _segments(
+        self,
+    ) -> Tuple[
+        npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray
+    ]:
+        """Return the edges and the haplotype table so that they can be merged
+        into another filter object. This method is used to send the segments
+        from one byte range back from a worker process
+
+        Returns
+        -------
+        Tuple[npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray]
+            returns a tuple with the idnum1, idnum2, and cm arrays of the
+            edges, the haplotype keys, the individual id of each haplotype,
+            and the sample table used by the haplotype keys
+        """  # noqa: E501
+        edges = self.edges.to_frame()
+
+        individual_ids = (
+            np.concatenate(self.haplotype_iids)
+            if self.haplotype_iids
+            else np.array([], dtype=object)
+        )
+
+        return (
+            edges["idnum1"].to_numpy(),
+            edges["idnum2"].to_numpy(),
+            edges["cm"].to_numpy(),
+            self.all_haplotypes.to_numpy(),
+            individual_ids,
+            self.all_samples.to_numpy(),
+        )
+
+    def _merge_segments(
         self,
+        segments: Tuple[
+            npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray
+        ],
+    ) -> None:
+        """Add the edges and haplotypes returned by _segments for a later part
+        of the file. The haplotype keys are rebuilt with this object's sample
+        table and the haplotype ids of the edges are mapped to the ids in
+        this object's haplotype table so the result is the same as if the
+        segments were read by this object
+
+        Parameters
+        ----------
+        segments : Tuple[npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray]
+            tuple with the idnum1, idnum2, and cm arrays of the edges, the
+            haplotype keys, the individual id of each haplotype, and the
+            sample table used by the haplotype keys
+        """  # noqa: E501
+        idnum1, idnum2, cm, haplotypes, individual_ids, samples = segments
+
+        if len(idnum1) == 0:
+            return
+
+        sample_indices, phases = unpack_haplotypes(haplotypes)
+
+        haplotype_ids, _ = self._add_haplotypes(
+            pack_haplotypes(self._add_samples(samples)[sample_indices], phases),
+            individual_ids,
+        )
+
+        self.edges.append(haplotype_ids[idnum1], haplotype_ids[idnum2], cm)
+
+    def _finalize(self, cohort_ids: Optional[List[str]] = None) -> None:
+        """Create the edges and vertices dataframes once every chunk has been
+        read and record how many of the cohort ids were found
+
+        Parameters
+        ----------
+        cohort_ids : List[str]
+            Lists of ids that make up the cohort. The ibd_file
+            was filtered to only this list.
+        """
+        self.ibd_pd = self.edges.to_frame()
+
+        self._generate_vertices()
+
+        ids_in_ibd_pd = self.ibd_vs["IID"].nunique()
+
+        if cohort_ids:
+            logger.info(
+                f"{ids_in_ibd_pd} out of the {len(cohort_ids)} ids provided were found within the IBD data file after filtering for minimum shared segment size and filtering to the locus chr{self.target_gene.chr}:{self.target_gene.start}-{self.target_gene.end}"
+            )
+        else:
+            logger.info(
+                f"Identified {ids_in_ibd_pd} unique ids within the provided IBD data"
+            )
+
+    def _create_target_filters(self, targets: List[Genes]) -> Dict[Genes, T]:
+        """Create a filter object for each target region. Each target gets its
+        own filter object so that it has its own haplotype mapping. These
+        objects never read from the file themselves
+
+        Parameters
+        ----------
+        targets : List[Genes]
+            list of namedtuples that have the chromosome, start position, and
+            end position of each target region
+
+        Returns
+        -------
+        Dict[Genes, IbdFilter]
+            returns a dictionary where the keys are the target regions and the
+            values are the filter objects for each target
+        """
+        target_filters = {}
+
+        for target in targets:
+            target_filter = IbdFilter(
+                iter(()),
+                self.indices,
+                target,
+                edges=EdgeAccumulator(memory_limit=self.edges.memory_limit),
+            )
+            target_filter.filter = getattr(target_filter, self.filter.__name__)
+            target_filters[target] = target_filter
+
+        return target_filters
+
+    def _collect_segments(
+        self,
+        target_filters: List[T],
         min_centimorgan: int,
         cohort_ids: Optional[List[str]] = None,
+        chromosome_early_stop: bool = False,
+        sorted_input: bool = False,
+        prefetch: int = 0,
     ) -> None:
-        """Method that will filter the ibd file.
+        """Read the ibd file and add the segments that pass each target's filter
+        to that target's filter object. If a parallel reader was created by
+        load_file then the byte ranges of the file are read by worker
+        processes and the segments are merged in the order of the ranges. If
+        more than one ibd file was provided then each file is read on its own
+        and the segments are merged in the order of the files
 
         Parameters
         ----------
+        target_filters : List[IbdFilter]
+            filter objects for each target region
+
         min_centimorgan : int
             Minimum segment threshold that is used to filter
-            the ibd file. Program only keeps segments that
-            are greater than or equal to the threshold.
+            the ibd file.
 
         cohort_ids : List[str]
             Lists of ids that make up the cohort. The ibd_file
             will be filtered to only this list.
+
+        chromosome_early_stop : bool
+            whether to stop reading the ibd file once it has moved past the
+            target chromosomes
+
+        sorted_input : bool
+            whether the ibd file is sorted by segment start position. If it
+            is then the file stops being read once the start positions are
+            past the end of every target region
+
+        prefetch : int
+            number of chunks that a background thread reads ahead while the
+            current chunk is filtered. If this value is 0 then the chunks are
+            read by the same thread that filters them
         """
-        # getting the start time for when the program begines to read in the ibd file
-        start_time = datetime.now()
+        if self.parallel_reader is not None:
+            reader, worker_function = self.parallel_reader, _filter_byte_range
+        elif self.file_reader is not None:
+            reader, worker_function = self.file_reader, _filter_input_file
+        else:
+            self._read_segments(
+                target_filters,
+                min_centimorgan,
+                self._build_cohort_lookup(cohort_ids),
+                chromosome_early_stop,
+                sorted_input,
+                prefetch,
+            )
+            return
+
+        range_settings = {
+            "reader": reader,
+            "target_gene": self.target_gene,
+            "targets": [target_filter.target_gene for target_filter in target_filters],
+            "filter_name": self.filter.__name__,
+            "min_centimorgan": min_centimorgan,
+            "cohort_ids": cohort_ids,
+            "chromosome_early_stop": chromosome_early_stop,
+            "sorted_input": sorted_input,
+            "prefetch": prefetch,
+            "memory_limit": self.edges.memory_limit,
+        }
 
-        for chunk in self.ibd_file:
-            cohort_restricted_chunk = self._filter_for_cohort(chunk, cohort_ids)
+        # When the files are read by one process the worker settings are
+        # stored in this process so they are cleared once the read is done
+        try:
+            for range_segments in reader.map(
+                worker_function, _init_range_worker, (range_settings,)
+            ):
+                for target_filter, segments in zip(target_filters, range_segments):
+                    target_filter._merge_segments(segments)
+        finally:
+            _RANGE_SETTINGS.clear()
+
+    def _read_segments(
+        self,
+        target_filters: List[T],
+        min_centimorgan: int,
+        cohort_lookup: Optional[Index] = None,
+        chromosome_early_stop: bool = False,
+        sorted_input: bool = False,
+        prefetch: int = 0,
+    ) -> None:
+        """Read the chunks of the ibd file and add the segments that pass each
+        target's filter to that target's filter object
 
-            logger.debug(
-                f"Identified {cohort_restricted_chunk.shape[0]} pairs in this chunk"
-            )  # noqa: E501
+        Parameters
+        ----------
+        target_filters : List[IbdFilter]
+            filter objects for each target region
 
-            if cohort_restricted_chunk.empty:
-                continue
+        min_centimorgan : int
+            Minimum segment threshold that is used to filter
+            the ibd file.
 
-            size_filtered_chunk = self.filter(cohort_restricted_chunk, min_centimorgan)
+        cohort_lookup : Optional[Index]
+            Index of the ids that make up the cohort created by
+            _build_cohort_lookup
 
-            logger.debug(
-                f"{size_filtered_chunk.shape[0]} pairs remaining after filtering for the loci of interest with a {min_centimorgan} minimum shared segment threshold"  # noqa: E501
+        chromosome_early_stop : bool
+            whether to stop reading the ibd file once it has moved past the
+            target chromosomes
+
+        sorted_input : bool
+            whether the ibd file is sorted by segment start position. If it
+            is then the file stops being read once the start positions are
+            past the end of every target region
+
+        prefetch : int
+            number of chunks that a background thread reads ahead while the
+            current chunk is filtered. If this value is 0 then the chunks are
+            read by the same thread that filters them
+        """
+        chromosome_tracker = ChromosomeTracker.from_targets(
+            [
+                target_filter.target_gene.chr
+                for target_filter in target_filters
+                if target_filter.target_gene.chr is not None
+            ]
+        )
+
+        position_tracker = SortedPositionTracker.from_targets(
+            [target_filter.target_gene for target_filter in target_filters]
+        )
+
+        # The prefetching generator is closed when the loop stops early so that
+        # the reader thread stops reading the file. The chunks of the file are
+        # closed after the reader thread has stopped so that readers which
+        # stop early also close the file that they opened
+        with (
+            closing(self.ibd_file) if hasattr(self.ibd_file, "close") else nullcontext()
+        ), (
+            closing(prefetch_chunks(self.ibd_file, prefetch))
+            if prefetch > 0
+            else nullcontext(self.ibd_file)
+        ) as chunks:
+            self._filter_chunks(
+                chunks,
+                target_filters,
+                min_centimorgan,
+                cohort_lookup,
+                chromosome_early_stop,
+                sorted_input,
+                chromosome_tracker,
+                position_tracker,
             )
 
-            if not size_filtered_chunk.empty:
-                # We have to add two column with the haplotype ids
-                self.indices.get_haplotype_id(
-                    size_filtered_chunk,
-                    self.indices.id1_indx,
-                    self.indices.hap1_indx,
-                    "hapid1",
+    def _filter_chunks(
+        self,
+        chunks: Iterator[DataFrame],
+        target_filters: List[T],
+        min_centimorgan: int,
+        cohort_lookup: Optional[Index],
+        chromosome_early_stop: bool,
+        sorted_input: bool,
+        chromosome_tracker: ChromosomeTracker,
+        position_tracker: SortedPositionTracker,
+    ) -> None:
+        """Filter each chunk for every target region until the file ends or
+        the file has moved past the target regions
+
+        Parameters
+        ----------
+        chunks : Iterator[DataFrame]
+            chunks of the ibd file
+
+        target_filters : List[IbdFilter]
+            filter objects for each target region
+
+        min_centimorgan : int
+            Minimum segment threshold that is used to filter
+            the ibd file.
+
+        cohort_lookup : Optional[Index]
+            Index of the ids that make up the cohort created by
+            _build_cohort_lookup
+
+        chromosome_early_stop : bool
+            whether to stop reading the ibd file once it has moved past the
+            target chromosomes
+
+        sorted_input : bool
+            whether the ibd file is sorted by segment start position
+
+        chromosome_tracker : ChromosomeTracker
+            tracker of the chromosomes that have been read
+
+        position_tracker : SortedPositionTracker
+            tracker of the start positions on the target chromosomes
+        """
+        for chunk in chunks:
+            logger.debug(f"Identified {chunk.shape[0]} pairs in this chunk")
+
+            if chromosome_early_stop:
+                chromosome_tracker.update(chunk[self.indices.chr_indx])
+
+            if sorted_input:
+                position_tracker.update(
+                    chunk[self.indices.chr_indx], chunk[self.indices.str_indx]
                 )
 
-                self.indices.get_haplotype_id(
-                    size_filtered_chunk,
-                    self.indices.id2_indx,
-                    self.indices.hap2_indx,
-                    "hapid2",
+            for target_filter in target_filters:
+                # The positional filter is applied first because it removes most
+                # of the segments so the cohort lookup only has to check the rest
+                cohort_restricted_chunk = self._filter_for_cohort(
+                    target_filter.filter(chunk, min_centimorgan), cohort_lookup
                 )
-                # We then need to make sure that there are no
-                # duplicates in the dataframe
-                removed_dups = self._remove_dups(size_filtered_chunk)
 
-                # We need to update the mappings for the grids
-                self._generate_map(removed_dups[["hapid1", "hapid2"]])
+                logger.debug(
+                    f"{cohort_restricted_chunk.shape[0]} pairs remaining after filtering for the loci of interest with a {min_centimorgan} minimum shared segment threshold and restricting to the cohort"  # noqa: E501
+                )
 
-                self._map_grids(removed_dups)
-                # concat the filtered dataframe with the ibd_pd
-                # attribute to get all the edges in the graph
-                self.ibd_pd = concat([self.ibd_pd, removed_dups])
+                target_filter._add_segments(cohort_restricted_chunk)
 
-                self._generate_vertices(removed_dups)
+            if chromosome_early_stop and chromosome_tracker.passed_targets():
+                self._log_early_stop(chromosome_tracker)
+                break
 
-        self._check_empty_dataframes()
+            if sorted_input and position_tracker.passed_targets():
+                logger.info(
+                    "The start positions of the segments in the sorted IBD file are past the end of the target region(s). The rest of the file will not be read."  # noqa: E501
+                )
+                break
 
-        self.ibd_pd.reset_index(drop=True, inplace=True)
+    @staticmethod
+    def _log_early_stop(chromosome_tracker: ChromosomeTracker) -> None:
+        """Log that the rest of the ibd file is skipped because the file is
+        grouped by chromosome
 
-        ids_in_ibd_pd = len(
-            np.unique(
-                np.concatenate(
-                    [
-                        self.ibd_pd[self.indices.id1_indx].unique(),
-                        self.ibd_pd[self.indices.id2_indx].unique(),
-                    ]
-                )
-            )
+        Parameters
+        ----------
+        chromosome_tracker : ChromosomeTracker
+            tracker that has the chromosomes that were read from the file
+        """
+        logger.info(
+            f"The option --chromosome-early-stop was provided and the IBD file has moved past the target chromosome(s) {', '.join(sorted(chromosome_tracker.target_chromosomes))}. The rest of the file will not be read."  # noqa: E501
         )
 
-        if len(cohort_ids) != 0:
-            logger.info(
-                f"{ids_in_ibd_pd} out of the {len(cohort_ids)} ids provided were found within the IBD data file after filtering for minimum shared segment size and filtering to the locus chr{self.target_gene.chr}:{self.target_gene.start}-{self.target_gene.end}"
-            )
-        else:
-            logger.info(
-                f"Identified {ids_in_ibd_pd} unique ids within the provided IBD data"
-            )
+    def preprocess(
+        self,
+        min_centimorgan: int,
+        cohort_ids: Optional[List[str]] = None,
+        chromosome_early_stop: bool = False,
+        sorted_input: bool = False,
+        prefetch: int = 0,
+    ) -> None:
+        """Method that will filter the ibd file.
 
-        self.ibd_vs = self.ibd_vs.drop_duplicates().sort_values(by="idnum")
+        Parameters
+        ----------
+        min_centimorgan : int
+            Minimum segment threshold that is used to filter
+            the ibd file. Program only keeps segments that
+            are greater than or equal to the threshold.
+
+        cohort_ids : List[str]
+            Lists of ids that make up the cohort. The ibd_file
+            will be filtered to only this list.
+
+        chromosome_early_stop : bool
+            whether to stop reading the ibd file once it has moved past the
+            target chromosome. The user provides this option when the file is
+            grouped by chromosome
+
+        sorted_input : bool
+            whether the ibd file is sorted by segment start position. If it
+            is then the file stops being read once the start positions are
+            past the end of the target region. The order is checked while
+            the file is read and the whole file is read if it is not sorted.
+
+        prefetch : int
+            number of chunks that a background thread reads ahead while the
+            current chunk is filtered. If this value is 0 then the chunks are
+            read by the same thread that filters them
+        """
+        # getting the start time for when the program begines to read in the ibd file
+        start_time = datetime.now()
+
+        self._collect_segments(
+            [self],
+            min_centimorgan,
+            cohort_ids,
+            chromosome_early_stop,
+            sorted_input,
+            prefetch,
+        )
+
+        self._check_empty_dataframes()
+
+        self._finalize(cohort_ids)
 
         # We are going to print out how long it took to read in the ibd file
         # if the user puts the program in verbose mod
@@ -517,3 +1433,222 @@ class IbdFilter:
         logger.verbose(
             f"Finished reading in the IBD file. Time spent reading file: {end_time - start_time}"
         )
+
+    def preprocess_targets(
+        self,
+        targets: List[Genes],
+        min_centimorgan: int,
+        cohort_ids: Optional[List[str]] = None,
+        chromosome_early_stop: bool = False,
+        sorted_input: bool = False,
+        prefetch: int = 0,
+    ) -> Dict[Genes, T]:
+        """Method that will filter the ibd file for multiple target regions in a
+        single pass over the file. Each chunk is read once and then every
+        segment is routed to each target that it satisfies the filter for.
+
+        Parameters
+        ----------
+        targets : List[Genes]
+            list of namedtuples that have the chromosome, start position, and
+            end position of each target region
+
+        min_centimorgan : int
+            Minimum segment threshold that is used to filter
+            the ibd file. Program only keeps segments that
+            are greater than or equal to the threshold.
+
+        cohort_ids : List[str]
+            Lists of ids that make up the cohort. The ibd_file
+            will be filtered to only this list.
+
+        chromosome_early_stop : bool
+            whether to stop reading the ibd file once it has moved past the
+            target chromosome. The user provides this option when the file is
+            grouped by chromosome
+
+        sorted_input : bool
+            whether the ibd file is sorted by segment start position. If it
+            is then the file stops being read once the start positions are
+            past the end of the target region. The order is checked while
+            the file is read and the whole file is read if it is not sorted.
+
+        prefetch : int
+            number of chunks that a background thread reads ahead while the
+            current chunk is filtered. If this value is 0 then the chunks are
+            read by the same thread that filters them
+
+        Returns
+        -------
+        Dict[Genes, IbdFilter]
+            returns a dictionary where the keys are the target regions and the
+            values are IbdFilter objects that have the edges, vertices, and
+            haplotype mappings for that target. Targets where no segments
+            passed the filters are not included.
+        """
+        start_time = datetime.now()
+
+        target_filters = self._create_target_filters(targets)
+
+        self._collect_segments(
+            list(target_filters.values()),
+            min_centimorgan,
+            cohort_ids,
+            chromosome_early_stop,
+            sorted_input,
+            prefetch,
+        )
+
+        filtered_targets = {}
+
+        for target, target_filter in target_filters.items():
+            if len(target_filter.edges) == 0:
+                logger.info(
+                    f"No individuals from the analysis cohort share an IBD segment across the target region chr{target.chr}:{target.start}-{target.end}. No networks will be identified for this target."  # noqa: E501
+                )
+                continue
+
+            target_filter._finalize(cohort_ids)
+
+            filtered_targets[target] = target_filter
+
+        end_time = datetime.now()
+
+        logger.verbose(
+            f"Finished reading in the IBD file for {len(targets)} targets. Time spent reading file: {end_time - start_time}"  # noqa: E501
+        )
+
+        return filtered_targets
+
+
+# settings shared by every byte range that a worker process filters. These are
+# sent once to each worker process when the process pool starts
+_RANGE_SETTINGS: Dict[str, Any] = {}
+
+
+def _init_range_worker(range_settings: Dict[str, Any]) -> None:
+    """Store the settings for the byte ranges in the worker process and build
+    the cohort lookup once for the process
+
+    Parameters
+    ----------
+    range_settings : Dict[str, Any]
+        dictionary with the parallel reader, the target regions, the name of
+        the filter method, the minimum centimorgan threshold, the cohort ids,
+        whether to stop early once the target chromosome has been passed,
+        whether the file is sorted by start position, the number of chunks to
+        prefetch, and the number of bytes the edges can use before they are
+        spilled to disk
+    """
+    _RANGE_SETTINGS.update(range_settings)
+
+    _RANGE_SETTINGS["cohort_lookup"] = IbdFilter._build_cohort_lookup(
+        range_settings["cohort_ids"]
+    )
+
+
+def _filter_byte_range(
+    byte_range: ByteRange,
+) -> List[
+    Tuple[npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray]
+]:
+    """Parse and filter one byte range of the ibd file in a worker process
+
+    Parameters
+    ----------
+    byte_range : ByteRange
+        start and end byte of the range
+
+    Returns
+    -------
+    List[Tuple[npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray]]
+        returns the edges and haplotype table for each target region in the
+        same order as the targets
+    """
+    reader: ParallelReader = _RANGE_SETTINGS["reader"]
+
+    target_gene = _RANGE_SETTINGS["target_gene"]
+
+    range_filter = IbdFilter(
+        reader.read_byte_range(byte_range, target_gene.start, target_gene.end),
+        reader.indices,
+        target_gene,
+    )
+
+    return _filter_worker_segments(range_filter)
+
+
+def _filter_input_file(
+    ibd_file: Path,
+) -> List[
+    Tuple[npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray]
+]:
+    """Parse and filter one of the ibd files when more than one file was
+    provided
+
+    Parameters
+    ----------
+    ibd_file : Path
+        Path to the ibd file
+
+    Returns
+    -------
+    List[Tuple[npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray]]
+        returns the edges and haplotype table for each target region in the
+        same order as the targets
+    """  # noqa: E501
+    reader: MultiFileReader = _RANGE_SETTINGS["reader"]
+
+    # Each file is read by one process because the files are already being
+    # read at the same time
+    file_filter = IbdFilter.load_file(
+        ibd_file,
+        reader.indices,
+        _RANGE_SETTINGS["target_gene"],
+        reader.chunksize,
+        reader.cache_dir,
+        reader_engine=reader.reader_engine,
+        min_centimorgan=reader.min_centimorgan,
+    )
+
+    return _filter_worker_segments(file_filter)
+
+
+def _filter_worker_segments(
+    range_filter: IbdFilter,
+) -> List[
+    Tuple[npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray]
+]:
+    """Filter the chunks of a byte range or of a file for every target region
+    with the settings stored in the worker process
+
+    Parameters
+    ----------
+    range_filter : IbdFilter
+        filter object that reads the chunks of the byte range or file
+
+    Returns
+    -------
+    List[Tuple[npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray]]
+        returns the edges and haplotype table for each target region in the
+        same order as the targets
+    """  # noqa: E501
+    range_filter.filter = getattr(range_filter, _RANGE_SETTINGS["filter_name"])
+
+    # The target filters copy the memory limit of this object's edges
+    range_filter.edges = EdgeAccumulator(memory_limit=_RANGE_SETTINGS["memory_limit"])
+
+    target_filters = list(
+        range_filter._create_target_filters(_RANGE_SETTINGS["targets"]).values()
+    )
+
+    range_filter._read_segments(
+        target_filters,
+        _RANGE_SETTINGS["min_centimorgan"],
+        _RANGE_SETTINGS["cohort_lookup"],
+        _RANGE_SETTINGS["chromosome_early_stop"],
+        _RANGE_SETTINGS["sorted_input"],
+        _RANGE_SETTINGS["prefetch"],
+    )
+
+    return [target_filter._segments() for target_filter in target_filters]
@@ -0,0 +1,101 @@
+"""Module that reads several IBD files, such as files that are split by
+chromosome or by sample batch, as if they were one file. Each file is parsed
+and filtered on its own, by a pool of worker processes if more than one
+process is available, and the results are returned in the order of the files
+so that merging them gives the same result as reading the concatenated file."""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from log import CustomLogger
+
+from drive.network.models import FileIndices
+
+logger = CustomLogger.get_logger(__name__)
+
+
+@dataclass
+class MultiFileReader:
+    """Class that reads each of the ibd files in a pool of worker processes
+
+    Parameters
+    ----------
+    ibd_files : List[Path]
+        Paths to the ibd files in the order that they are merged
+
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd files
+
+    threads : int
+        number of worker processes to use. If this value is 1 then the files
+        are read one after another in the main process
+
+    chunksize : Optional[int]
+        number of rows of each DataFrame read from a file. If this value is
+        None then the chunksize of each text file is tuned while it is read
+
+    cache_dir : Optional[Path]
+        directory used to cache the parsed segments of each file
+
+    reader_engine : str
+        engine used to parse each file. Either 'pandas' or 'pyarrow'
+
+    min_centimorgan : Optional[float]
+        minimum segment length used by the pyarrow engine to skip segments
+    """
+
+    ibd_files: List[Path]
+    indices: FileIndices
+    threads: int = 1
+    chunksize: Optional[int] = None
+    cache_dir: Optional[Path] = None
+    reader_engine: str = "pandas"
+    min_centimorgan: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        logger.verbose(
+            f"Reading {len(self.ibd_files)} ibd files with {min(self.threads, len(self.ibd_files))} processes: {', '.join(map(str, self.ibd_files))}"  # noqa: E501
+        )
+
+    def map(
+        self,
+        file_function: Callable[[Path], Any],
+        initializer: Callable[..., None],
+        initargs: Tuple,
+    ) -> Iterator[Any]:
+        """Run a function on every ibd file
+
+        Parameters
+        ----------
+        file_function : Callable[[Path], Any]
+            module level function that is called with the path of each file
+
+        initializer : Callable[..., None]
+            function that is called once when each worker process starts. This
+            function is used to send the settings shared by every file to the
+            worker once
+
+        initargs : Tuple
+            arguments passed to the initializer
+
+        Returns
+        -------
+        Iterator[Any]
+            yields the result of file_function for each file in the order of
+            the files
+        """
+        if self.threads == 1:
+            initializer(*initargs)
+
+            yield from map(file_function, self.ibd_files)
+
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=min(self.threads, len(self.ibd_files)),
+            initializer=initializer,
+            initargs=initargs,
+        ) as executor:
+            yield from executor.map(file_function, self.ibd_files)
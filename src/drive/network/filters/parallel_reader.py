@@ -0,0 +1,235 @@
+"""Module that splits an uncompressed IBD file into byte ranges that start and end
+on line boundaries so that the ranges can be parsed and filtered by separate
+worker processes. The results of the workers are returned in the order of the
+byte ranges so that merging them gives the same result as reading the file
+from start to finish. The file is memory mapped so that the boundaries are
+found without reading the ranges and each worker reads its range straight
+from the page cache."""
+
+import io
+import mmap
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from math import ceil
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+import pyarrow as pa
+from log import CustomLogger
+from pandas import DataFrame
+
+from drive.network.models import FileIndices
+
+logger = CustomLogger.get_logger(__name__)
+
+# Largest number of bytes that a worker reads into memory at one time
+RANGE_SIZE = 64 * 1024 * 1024
+
+# first two bytes of every gzip file
+GZIP_MAGIC = b"\x1f\x8b"
+
+ByteRange = namedtuple("ByteRange", ["start", "end"])
+
+
+def is_gzipped(ibd_file: Path) -> bool:
+    """Check if the file is gzip compressed
+
+    Parameters
+    ----------
+    ibd_file : Path
+        Path to the ibd file
+
+    Returns
+    -------
+    bool
+        returns True if the file starts with the gzip magic number
+    """
+    with open(ibd_file, "rb") as ibd_fh:
+        return ibd_fh.read(2) == GZIP_MAGIC
+
+
+def split_byte_ranges(ibd_file: Path, range_count: int) -> List[ByteRange]:
+    """Split the file into byte ranges of about the same size. Each boundary
+    is moved forward to the start of the next line so that no line is split
+    between two ranges. The newline after each boundary is found in the
+    memory mapped file so only the pages around the boundaries are read
+
+    Parameters
+    ----------
+    ibd_file : Path
+        Path to the uncompressed ibd file
+
+    range_count : int
+        number of ranges to split the file into. Fewer ranges are returned if
+        the file has fewer lines than this
+
+    Returns
+    -------
+    List[ByteRange]
+        returns a list of namedtuples with the start and end byte of each
+        range in the order they appear in the file
+    """
+    file_size = ibd_file.stat().st_size
+
+    boundaries = [0]
+
+    if file_size == 0:
+        return [ByteRange(0, 0)]
+
+    with (
+        open(ibd_file, "rb") as ibd_fh,
+        mmap.mmap(ibd_fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file,
+    ):
+        for range_indx in range(1, range_count):
+            # the boundary is moved to the byte after the next newline which is
+            # the start of the next line
+            boundary = (
+                mapped_file.find(b"\n", file_size * range_indx // range_count) + 1
+            )
+
+            if boundaries[-1] < boundary < file_size:
+                boundaries.append(boundary)
+
+    boundaries.append(file_size)
+
+    return [
+        ByteRange(start, end) for start, end in zip(boundaries[:-1], boundaries[1:])
+    ]
+
+
+@dataclass
+class ParallelReader:
+    """Class that reads the byte ranges of an uncompressed ibd file in a pool of
+    worker processes
+
+    Parameters
+    ----------
+    ibd_file : Path
+        Path to the uncompressed ibd file
+
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd file
+
+    threads : int
+        number of worker processes to use
+
+    chunksize : int
+        number of rows of each DataFrame returned for a byte range
+
+    reader_engine : str
+        engine used to parse each byte range. Either 'pandas' or 'pyarrow'
+
+    min_centimorgan : Optional[float]
+        minimum segment length used by the pyarrow engine to skip segments
+
+    byte_ranges : List[ByteRange]
+        byte ranges that the file is split into
+    """
+
+    ibd_file: Path
+    indices: FileIndices
+    threads: int
+    chunksize: int = 100_000
+    reader_engine: str = "pandas"
+    min_centimorgan: Optional[float] = None
+    byte_ranges: List[ByteRange] = field(init=False)
+
+    def __post_init__(self) -> None:
+        # The file is split into at least one range per worker and every range
+        # is at most RANGE_SIZE bytes so that the memory of each worker is
+        # bounded
+        range_count = max(self.threads, ceil(self.ibd_file.stat().st_size / RANGE_SIZE))
+
+        self.byte_ranges = split_byte_ranges(self.ibd_file, range_count)
+
+        logger.verbose(
+            f"Split the file {self.ibd_file} into {len(self.byte_ranges)} byte ranges that will be read by {self.threads} processes"  # noqa: E501
+        )
+
+    def read_byte_range(
+        self, byte_range: ByteRange, region_start: int, region_end: int
+    ) -> Iterator[DataFrame]:
+        """Parse the lines in one byte range of the file
+
+        Parameters
+        ----------
+        byte_range : ByteRange
+            start and end byte of the range
+
+        region_start : int
+            start position of the target region. This value is only used by
+            the pyarrow engine
+
+        region_end : int
+            end position of the target region. This value is only used by
+            the pyarrow engine
+
+        Returns
+        -------
+        Iterator[DataFrame]
+            yields DataFrames whose column labels are the integer column
+            indices of the ibd file
+        """
+        # These modules import this module so they are imported here
+        from .arrow_reader import read_ibd_arrow
+        from .filter import read_ibd_text
+
+        # The buffer is a view of the memory mapped file so the pages of the
+        # range are only read from the page cache when they are parsed. The
+        # file is closed once every chunk of the range has been read
+        with pa.memory_map(str(self.ibd_file)) as mapped_file:
+            mapped_file.seek(byte_range.start)
+
+            range_buffer = mapped_file.read_buffer(byte_range.end - byte_range.start)
+
+            if self.reader_engine == "pyarrow":
+                # Every process reads its own range so the pyarrow thread pool
+                # is not used
+                yield from read_ibd_arrow(
+                    pa.BufferReader(range_buffer),
+                    self.indices,
+                    self.chunksize,
+                    region_start,
+                    region_end,
+                    self.min_centimorgan,
+                    use_threads=False,
+                )
+            else:
+                yield from read_ibd_text(
+                    io.BytesIO(range_buffer.to_pybytes()),
+                    self.indices,
+                    self.chunksize,
+                )
+
+    def map(
+        self,
+        range_function: Callable[[ByteRange], Any],
+        initializer: Callable[..., None],
+        initargs: Tuple,
+    ) -> Iterator[Any]:
+        """Run a function on every byte range in the process pool
+
+        Parameters
+        ----------
+        range_function : Callable[[ByteRange], Any]
+            module level function that is called with each byte range
+
+        initializer : Callable[..., None]
+            function that is called once when each worker process starts. This
+            function is used to send the settings shared by every byte range
+            to the worker once
+
+        initargs : Tuple
+            arguments passed to the initializer
+
+        Returns
+        -------
+        Iterator[Any]
+            yields the result of range_function for each byte range in the
+            order of the ranges in the file
+        """
+        with ProcessPoolExecutor(
+            max_workers=self.threads, initializer=initializer, initargs=initargs
+        ) as executor:
+            yield from executor.map(range_function, self.byte_ranges)
@@ -0,0 +1,164 @@
+"""Module that reads the chunks of an IBD file in a background thread. The
+thread reads and decompresses the next chunks into a bounded queue while the
+main thread filters the current chunk, so the time spent waiting on the disk
+or on a network file system overlaps with the time spent filtering. Gzip
+decompression and the pandas and pyarrow parsers release the GIL while they
+work so the two threads can run at the same time."""
+
+from dataclasses import dataclass
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from typing import Iterator, Union
+
+from log import CustomLogger
+from pandas import DataFrame
+
+logger = CustomLogger.get_logger(__name__)
+
+# how long the reader thread waits on a full queue before it checks if the
+# consumer has stopped reading
+_PUT_TIMEOUT = 0.1
+
+
+@dataclass
+class _EndOfChunks:
+    """Marker put in the queue once every chunk has been read"""
+
+
+@dataclass
+class _ReaderFailure:
+    """Wrapper for an exception raised by the reader thread so that it can be
+    raised again in the thread that consumes the chunks"""
+
+    error: Exception
+
+
+QueueItem = Union[DataFrame, _EndOfChunks, _ReaderFailure]
+
+
+def _put_until_stopped(
+    chunk_queue: "Queue[QueueItem]", item: QueueItem, stop_reading: Event
+) -> bool:
+    """Put the item in the queue, waiting for space unless the consumer stops
+    reading
+
+    Parameters
+    ----------
+    chunk_queue : Queue[QueueItem]
+        bounded queue shared with the consumer
+
+    item : QueueItem
+        chunk or marker to put in the queue
+
+    stop_reading : Event
+        event that is set once the consumer has stopped reading
+
+    Returns
+    -------
+    bool
+        returns True if the item was put in the queue and False if the
+        consumer stopped reading first
+    """
+    while not stop_reading.is_set():
+        try:
+            chunk_queue.put(item, timeout=_PUT_TIMEOUT)
+            return True
+        except Full:
+            continue
+
+    return False
+
+
+def _read_into_queue(
+    chunks: Iterator[DataFrame], chunk_queue: "Queue[QueueItem]", stop_reading: Event
+) -> None:
+    """Target of the reader thread that moves each chunk into the queue
+
+    Parameters
+    ----------
+    chunks : Iterator[DataFrame]
+        iterator of the chunks of the ibd file. Only the reader thread
+        advances this iterator
+
+    chunk_queue : Queue[QueueItem]
+        bounded queue shared with the consumer
+
+    stop_reading : Event
+        event that is set once the consumer has stopped reading
+    """
+    try:
+        for chunk in chunks:
+            if not _put_until_stopped(chunk_queue, chunk, stop_reading):
+                return
+    except Exception as error:
+        _put_until_stopped(chunk_queue, _ReaderFailure(error), stop_reading)
+        return
+
+    _put_until_stopped(chunk_queue, _EndOfChunks(), stop_reading)
+
+
+def prefetch_chunks(
+    chunks: Iterator[DataFrame], queue_size: int
+) -> Iterator[DataFrame]:
+    """Read the chunks in a background thread while the caller processes the
+    chunks that were already read. The chunks are returned in the same order
+    as the original iterator. If the caller stops early then the generator
+    should be closed so that the reader thread stops
+
+    Parameters
+    ----------
+    chunks : Iterator[DataFrame]
+        iterator of the chunks of the ibd file
+
+    queue_size : int
+        number of chunks that the reader thread can read ahead of the caller.
+        This value bounds the extra memory used by the prefetched chunks
+
+    Returns
+    -------
+    Iterator[DataFrame]
+        yields the chunks in the order of the original iterator
+
+    Raises
+    ------
+    Exception
+        raises any exception from the original iterator in the caller's
+        thread
+    """
+    chunk_queue: "Queue[QueueItem]" = Queue(maxsize=queue_size)
+
+    stop_reading = Event()
+
+    reader_thread = Thread(
+        target=_read_into_queue,
+        args=(chunks, chunk_queue, stop_reading),
+        name="drive-ibd-reader",
+        daemon=True,
+    )
+
+    logger.debug(f"Prefetching up to {queue_size} chunks of the ibd file")
+
+    reader_thread.start()
+
+    try:
+        while True:
+            item = chunk_queue.get()
+
+            if isinstance(item, _EndOfChunks):
+                return
+            elif isinstance(item, _ReaderFailure):
+                raise item.error
+
+            yield item
+    finally:
+        stop_reading.set()
+
+        # the chunks that were read ahead are dropped so that their memory is
+        # released while the reader thread stops
+        while True:
+            try:
+                chunk_queue.get_nowait()
+            except Empty:
+                break
+
+        reader_thread.join()
@@ -0,0 +1,520 @@
+"""Module that stores the typed, column projected IBD segments as an Arrow IPC
+file. These files can be memory mapped so that later runs of DRIVE can skip
+parsing the original text file. The same format is used for the segment index
+where the segments are sorted by chromosome and start position and split into
+blocks whose chromosomes and position ranges are recorded in the file
+metadata. The index also stores the row number of each segment in the ibd file
+so that the segments can be returned in the order of the file."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from log import CustomLogger
+from pandas import DataFrame, StringDtype
+
+from drive.network.models import FileIndices
+
+from .chromosomes import format_chromosome
+
+logger = CustomLogger.get_logger(__name__)
+
+# suffix used for every file written by this module
+STORE_SUFFIX = ".drive_segments.arrow"
+
+# suffix of the sidecar index written next to the ibd file
+INDEX_SUFFIX = ".drive_index"
+
+# key in the schema metadata that has the block statistics of the index
+INDEX_METADATA_KEY = b"drive.segment_index"
+
+# version of the index layout. Indices with a different version have to be
+# rebuilt
+INDEX_VERSION = 2
+
+# column of the index with the row number of each segment in the ibd file
+ROW_COLUMN = "row"
+
+
+def store_columns(indices: FileIndices) -> List[int]:
+    """Determine which columns of the IBD file need to be kept in the store
+
+    Parameters
+    ----------
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd file
+
+    Returns
+    -------
+    List[int]
+        returns the sorted list of column indices for the ids, phases,
+        chromosome, start position, end position, and centimorgan length
+    """
+    return sorted(indices.column_dtypes().keys())
+
+
+def _source_key(ibd_file: Path, indices: FileIndices) -> str:
+    """Generate a string that identifies the exact version of the ibd file
+
+    Parameters
+    ----------
+    ibd_file : Path
+        Path to the original ibd file from hapibd, iLASH, etc...
+
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd file
+
+    Returns
+    -------
+    str
+        returns a string with the absolute path, size, modification time of
+        the file and the file format
+    """
+    file_stats = ibd_file.stat()
+
+    return f"{ibd_file.resolve()}|{file_stats.st_size}|{file_stats.st_mtime_ns}|{indices!r}"
+
+
+def segment_store_path(cache_dir: Path, ibd_file: Path, indices: FileIndices) -> Path:
+    """Generate the path of the cached segments for an ibd file. The filename is
+    keyed by the absolute path, size, and modification time of the input file as
+    well as the file format so that a modified input file never reuses a stale
+    cache.
+
+    Parameters
+    ----------
+    cache_dir : Path
+        directory where the cached segment files are kept
+
+    ibd_file : Path
+        Path to the original ibd file from hapibd, iLASH, etc...
+
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd file
+
+    Returns
+    -------
+    Path
+        returns the filepath for the cached segments
+    """
+    digest = hashlib.sha1(_source_key(ibd_file, indices).encode("utf-8")).hexdigest()[
+        :16
+    ]
+
+    return cache_dir / f"{ibd_file.name}.{digest}{STORE_SUFFIX}"
+
+
+def segment_index_path(ibd_file: Path) -> Path:
+    """Generate the default path of the sidecar index for an ibd file
+
+    Parameters
+    ----------
+    ibd_file : Path
+        Path to the original ibd file from hapibd, iLASH, etc...
+
+    Returns
+    -------
+    Path
+        returns the path of the index which is the ibd file path with the
+        suffix '.drive_index'
+    """
+    return ibd_file.parent / f"{ibd_file.name}{INDEX_SUFFIX}"
+
+
+def _chunks_to_tables(
+    chunks: Iterator[DataFrame], indices: FileIndices
+) -> Iterator[pa.Table]:
+    """Convert the projected columns of each chunk into an Arrow table. Every
+    table is cast to the schema of the first chunk because pandas can infer
+    different types for each chunk
+
+    Parameters
+    ----------
+    chunks : Iterator[DataFrame]
+        chunks of the ibd file as read in by pandas.read_csv
+
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd file
+
+    Returns
+    -------
+    Iterator[pa.Table]
+        yields an Arrow table for each chunk
+    """
+    columns = store_columns(indices)
+
+    schema = None
+
+    for chunk in chunks:
+        table = pa.Table.from_pandas(
+            chunk[columns].rename(columns=str), preserve_index=False
+        )
+
+        if schema is None:
+            schema = table.schema
+        else:
+            table = table.cast(schema)
+
+        yield table
+
+
+def write_segment_store(
+    chunks: Iterator[DataFrame], output_path: Path, indices: FileIndices
+) -> int:
+    """Write the projected columns of each chunk to an Arrow IPC file. The file
+    is first written to a temporary path and then moved so that concurrent
+    DRIVE jobs never read a partially written store.
+
+    Parameters
+    ----------
+    chunks : Iterator[DataFrame]
+        chunks of the ibd file as read in by pandas.read_csv
+
+    output_path : Path
+        filepath to write the store to
+
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd file
+
+    Returns
+    -------
+    int
+        returns the number of segments written to the store
+    """
+    tmp_path = output_path.parent / f".{output_path.name}.{os.getpid()}.tmp"
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    segment_count = 0
+    writer = None
+
+    try:
+        for table in _chunks_to_tables(chunks, indices):
+            if writer is None:
+                writer = pa.ipc.new_file(str(tmp_path), table.schema)
+
+            writer.write_table(table)
+
+            segment_count += table.num_rows
+
+        if writer is None:
+            raise ValueError(
+                f"No segments were read from the ibd file so a store could not be written to {output_path}"  # noqa: E501
+            )
+
+        writer.close()
+
+        os.replace(tmp_path, output_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    logger.verbose(f"Wrote {segment_count} segments to {output_path}")
+
+    return segment_count
+
+
+def write_segment_index(
+    chunks: Iterator[DataFrame],
+    ibd_file: Path,
+    output_path: Path,
+    indices: FileIndices,
+    block_size: int = 65_536,
+) -> int:
+    """Write the sidecar index for an ibd file. The projected segments are
+    sorted by chromosome and start position and written in blocks of
+    block_size rows along with the row number of each segment in the file.
+    The chromosomes, smallest start position, and largest end position of
+    every block are stored in the schema metadata so that a reader can skip
+    every block that can not overlap the target region. The projected columns
+    of the whole file have to fit in memory while they are sorted.
+
+    Parameters
+    ----------
+    chunks : Iterator[DataFrame]
+        chunks of the ibd file as read in by pandas.read_csv
+
+    ibd_file : Path
+        Path to the original ibd file. The size and modification time of this
+        file is recorded so that a stale index is never used.
+
+    output_path : Path
+        filepath to write the index to
+
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd file
+
+    block_size : int
+        number of segments in each block of the index
+
+    Returns
+    -------
+    int
+        returns the number of segments written to the index
+    """
+    tables = list(_chunks_to_tables(chunks, indices))
+
+    if not tables:
+        raise ValueError(
+            f"No segments were read from the ibd file {ibd_file} so an index could not be written to {output_path}"  # noqa: E501
+        )
+
+    chr_col = str(indices.chr_indx)
+    start_col, end_col = str(indices.str_indx), str(indices.end_indx)
+
+    segments = pa.concat_tables(tables)
+
+    segments = (
+        segments.append_column(
+            ROW_COLUMN, pa.array(range(segments.num_rows), type=pa.int64())
+        )
+        .sort_by([(chr_col, "ascending"), (start_col, "ascending")])
+        .combine_chunks()
+    )
+
+    blocks = segments.to_batches(max_chunksize=block_size)
+
+    block_stats = {
+        "version": INDEX_VERSION,
+        "source": _source_key(ibd_file, indices),
+        "block_size": block_size,
+        "chromosomes": [
+            sorted(
+                {
+                    format_chromosome(chromosome)
+                    for chromosome in pc.unique(block.column(chr_col)).to_pylist()
+                }
+            )
+            for block in blocks
+        ],
+        "min_start": [pc.min(block.column(start_col)).as_py() for block in blocks],
+        "max_end": [pc.max(block.column(end_col)).as_py() for block in blocks],
+    }
+
+    schema = segments.schema.with_metadata(
+        {INDEX_METADATA_KEY: json.dumps(block_stats).encode("utf-8")}
+    )
+
+    tmp_path = output_path.parent / f".{output_path.name}.{os.getpid()}.tmp"
+
+    try:
+        with pa.ipc.new_file(str(tmp_path), schema) as writer:
+            for block in blocks:
+                writer.write_batch(block)
+
+        os.replace(tmp_path, output_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    logger.info(
+        f"Wrote {segments.num_rows} segments in {len(blocks)} blocks to the index {output_path}"  # noqa: E501
+    )
+
+    return segments.num_rows
+
+
+def load_index_metadata(
+    index_path: Path, ibd_file: Path, indices: FileIndices
+) -> Optional[Dict[str, Any]]:
+    """Read the block statistics from the index and make sure the index was
+    built from the current version of the ibd file with the same format
+
+    Parameters
+    ----------
+    index_path : Path
+        filepath to the index written by write_segment_index
+
+    ibd_file : Path
+        Path to the original ibd file
+
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd file
+
+    Returns
+    -------
+    Optional[Dict[str, Any]]
+        returns the dictionary of block statistics or None if the file is not
+        an index or if it is out of date with the ibd file
+    """
+    with pa.memory_map(str(index_path), "r") as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+
+    if INDEX_METADATA_KEY not in metadata:
+        logger.warning(
+            f"The file {index_path} is not a DRIVE segment index. The index will not be used."  # noqa: E501
+        )
+        return None
+
+    block_stats = json.loads(metadata[INDEX_METADATA_KEY])
+
+    if block_stats.get("version") != INDEX_VERSION:
+        logger.warning(
+            f"The index {index_path} was built by an older version of DRIVE. The index will not be used. Please rebuild the index with 'drive utilities index'."  # noqa: E501
+        )
+        return None
+
+    if block_stats["source"] != _source_key(ibd_file, indices):
+        logger.warning(
+            f"The index {index_path} was built from a different version or format of the file {ibd_file}. The index will not be used. Please rebuild the index with 'drive utilities index'."  # noqa: E501
+        )
+        return None
+
+    return block_stats
+
+
+def read_segment_index(
+    index_path: Path,
+    block_stats: Dict[str, Any],
+    indices: FileIndices,
+    chunksize: int,
+    region_start: int,
+    region_end: int,
+    target_chromosome: Optional[Union[int, str]] = None,
+) -> Iterator[DataFrame]:
+    """Read only the segments in the blocks of the index that can overlap the
+    region. Blocks are memory mapped so the skipped blocks are never read from
+    disk. The segments that overlap the region are returned in the order of
+    the ibd file so that the haplotype ids and the networks are the same as
+    when the whole file is read.
+
+    Parameters
+    ----------
+    index_path : Path
+        filepath to the index written by write_segment_index
+
+    block_stats : Dict[str, Any]
+        block statistics returned by load_index_metadata
+
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd file
+
+    chunksize : int
+        maximum number of rows to return in each DataFrame
+
+    region_start : int
+        start position of the region. Blocks where every segment ends before
+        this position are skipped
+
+    region_end : int
+        end position of the region. Blocks where every segment starts after
+        this position are skipped
+
+    target_chromosome : Optional[Union[int, str]]
+        chromosome of the region. Blocks without a segment on this chromosome
+        are skipped. If this value is None then the blocks of every
+        chromosome are read
+
+    Returns
+    -------
+    Iterator[DataFrame]
+        yields DataFrames whose column labels are the integer column indices of
+        the original ibd file
+    """
+    start_col, end_col = str(indices.str_indx), str(indices.end_indx)
+
+    chromosome = (
+        format_chromosome(target_chromosome) if target_chromosome is not None else None
+    )
+
+    overlapping_batches = []
+
+    with pa.memory_map(str(index_path), "r") as source:
+        reader = pa.ipc.open_file(source)
+
+        for batch_indx, (block_chromosomes, min_start, max_end) in enumerate(
+            zip(
+                block_stats["chromosomes"],
+                block_stats["min_start"],
+                block_stats["max_end"],
+            )
+        ):
+            if chromosome is not None and chromosome not in block_chromosomes:
+                continue
+            if min_start > region_end or max_end < region_start:
+                continue
+
+            batch = reader.get_batch(batch_indx)
+
+            # Segments that do not overlap the region are removed by every
+            # filter so they are dropped before the rows are put back in order
+            overlapping_batches.append(
+                batch.filter(
+                    pc.and_(
+                        pc.less_equal(batch.column(start_col), region_end),
+                        pc.greater_equal(batch.column(end_col), region_start),
+                    )
+                )
+            )
+
+        logger.verbose(
+            f"Read {len(overlapping_batches)} out of {len(block_stats['min_start'])} blocks from the index {index_path}"  # noqa: E501
+        )
+
+        if not overlapping_batches:
+            return
+
+        segments = (
+            pa.Table.from_batches(overlapping_batches)
+            .sort_by(ROW_COLUMN)
+            .drop_columns([ROW_COLUMN])
+        )
+
+        for batch in segments.to_batches(max_chunksize=chunksize):
+            yield _batch_to_frame(batch)
+
+
+def read_segment_store(store_path: Path, chunksize: int) -> Iterator[DataFrame]:
+    """Read the segments from the store by memory mapping the file. The record
+    batches are converted to DataFrames without copying the string columns.
+
+    Parameters
+    ----------
+    store_path : Path
+        filepath to the Arrow IPC file written by write_segment_store
+
+    chunksize : int
+        maximum number of rows to return in each DataFrame
+
+    Returns
+    -------
+    Iterator[DataFrame]
+        yields DataFrames whose column labels are the integer column indices of
+        the original ibd file
+    """
+    with pa.memory_map(str(store_path), "r") as source:
+        reader = pa.ipc.open_file(source)
+
+        for batch_indx in range(reader.num_record_batches):
+            batch = reader.get_batch(batch_indx)
+
+            for offset in range(0, batch.num_rows, chunksize):
+                yield _batch_to_frame(batch.slice(offset, chunksize))
+
+
+def _batch_to_frame(batch: pa.RecordBatch) -> DataFrame:
+    """Convert a record batch from the store back into the DataFrame layout that
+    pandas.read_csv produces for the ibd file
+
+    Parameters
+    ----------
+    batch : pa.RecordBatch
+        batch of segments from the store
+
+    Returns
+    -------
+    DataFrame
+        returns the DataFrame with integer column labels
+    """
+    data = batch.to_pandas(
+        types_mapper={
+            pa.string(): StringDtype("pyarrow"),
+            pa.large_string(): StringDtype("pyarrow"),
+        }.get
+    )
+
+    return data.rename(columns=int)
@@ -0,0 +1,134 @@
+"""Module with the helper used to stop reading an IBD file that is sorted by
+segment start position. Once the start positions on a target chromosome are
+past the end of every target region on that chromosome, no later segment on
+that chromosome can overlap the targets."""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Set
+
+import numpy as np
+from log import CustomLogger
+from pandas import Series
+
+from drive.network.models import Genes
+
+from .chromosomes import chromosome_mask, format_chromosome
+
+logger = CustomLogger.get_logger(__name__)
+
+
+@dataclass
+class SortedPositionTracker:
+    """Class that keeps track of the start positions of the segments on the
+    target chromosomes in a file that is sorted by start position. The order
+    of the start positions is checked while the file is read and the tracker
+    stops reporting that the targets were passed if the file is not sorted.
+
+    Parameters
+    ----------
+    target_ends : Dict[str, int]
+        largest end position of the target regions on each target chromosome.
+        The chromosomes are formatted by format_chromosome
+
+    passed_chromosomes : Set[str]
+        target chromosomes where a segment started after the largest target
+        end position
+
+    is_sorted : bool
+        whether every start position read so far on each target chromosome
+        has been greater than or equal to the previous start position on
+        that chromosome
+
+    last_starts : Dict[str, int]
+        start position of the last segment read on each target chromosome
+    """
+
+    target_ends: Dict[str, int]
+    passed_chromosomes: Set[str] = field(default_factory=set)
+    is_sorted: bool = True
+    last_starts: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_targets(cls, targets: Iterable[Genes]) -> "SortedPositionTracker":
+        """Create the tracker for the target regions. Targets without a
+        chromosome can not be tracked so the tracker never reports that they
+        were passed
+
+        Parameters
+        ----------
+        targets : Iterable[Genes]
+            namedtuples that have the chromosome, start position, and end
+            position of each target region
+
+        Returns
+        -------
+        SortedPositionTracker
+            returns the tracker for the target regions
+        """
+        target_ends = {}
+
+        for target in targets:
+            if target.chr is None:
+                return cls({})
+
+            chromosome = format_chromosome(target.chr)
+
+            target_ends[chromosome] = max(
+                int(target.end), target_ends.get(chromosome, 0)
+            )
+
+        return cls(target_ends)
+
+    def update(self, chromosome_col: Series, start_col: Series) -> None:
+        """Check that the segments on each target chromosome are sorted by
+        start position and record which target chromosomes have moved past
+        the target regions
+
+        Parameters
+        ----------
+        chromosome_col : Series
+            chromosome column of a chunk of the IBD file before any filtering
+
+        start_col : Series
+            start position column of the same chunk
+        """
+        if not self.is_sorted:
+            return
+
+        for chromosome, target_end in self.target_ends.items():
+            starts = start_col[chromosome_mask(chromosome_col, chromosome)].to_numpy()
+
+            if len(starts) == 0:
+                continue
+
+            if (
+                starts[0] < self.last_starts.get(chromosome, starts[0])
+                or (np.diff(starts) < 0).any()
+            ):
+                self.is_sorted = False
+
+                logger.warning(
+                    f"The option --sorted-input was provided but the segments on chromosome {chromosome} of the IBD file are not sorted by start position. The whole file will be read."  # noqa: E501
+                )
+                return
+
+            self.last_starts[chromosome] = starts[-1]
+
+            if starts[-1] > target_end:
+                self.passed_chromosomes.add(chromosome)
+
+    def passed_targets(self) -> bool:
+        """Check if the file has moved past the end of every target region
+
+        Returns
+        -------
+        bool
+            returns True if the file has been sorted so far and a segment
+            started after the target regions on every target chromosome.
+            Always returns False if there are no target chromosomes
+        """
+        return (
+            self.is_sorted
+            and bool(self.target_ends)
+            and self.passed_chromosomes.issuperset(self.target_ends)
+        )
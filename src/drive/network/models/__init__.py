@@ -1,4 +1,5 @@
 from .data_container import RuntimeState
 from .generate_indices import FileIndices, create_indices
+from .haplotypes import HaplotypeMapper, pack_haplotypes, unpack_haplotypes
 from .networks import Network, Network_Interface
 from .types import Filter, Genes
@@ -1,14 +1,171 @@
 from dataclasses import dataclass
-from typing import Protocol
+from typing import Dict, List, Protocol, Tuple
 
-from pandas import DataFrame
+import numpy as np
+import numpy.typing as npt
+from pandas import DataFrame, Series, factorize
 
 
-# general protocol that defines that every class needs the get_haplotype_id method
+# general protocol that defines that every class needs to declare the columns
+# that DRIVE reads, to be able to split the haplotypes into the sample id and
+# the phase, and to format them back into the haplotype strings
 class FileIndices(Protocol):
-    def get_haplotype_id(
-        self, data: DataFrame, ind_id_indx: int, phase_col_indx: int, col_name: str
-    ) -> None: ...
+    def column_dtypes(self) -> Dict[int, str]: ...
+
+    def get_haplotype_parts(
+        self, data: DataFrame, ind_id_indx: int, phase_col_indx: int
+    ) -> Tuple[Series, npt.NDArray[np.int64]]: ...
+
+    def format_haplotypes(
+        self, samples: npt.NDArray, phases: npt.NDArray[np.int64]
+    ) -> List[str]: ...
+
+
+def _column_dtypes(indices: FileIndices, phase_dtype: str) -> Dict[int, str]:
+    """Create the mapping of the columns that DRIVE reads to the compact dtype
+    of each column. Only these columns are parsed from the ibd file
+
+    Parameters
+    ----------
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd file
+
+    phase_dtype : str
+        dtype of the two phase columns
+
+    Returns
+    -------
+    Dict[int, str]
+        returns a dictionary where the keys are the column indices and the
+        values are the dtypes. The chromosome is read as a string column
+        because a categorical column gets a different set of categories in
+        each chunk and those chunks can not be written to one Arrow file
+    """
+    return {
+        indices.id1_indx: "string[pyarrow]",
+        indices.hap1_indx: phase_dtype,
+        indices.id2_indx: "string[pyarrow]",
+        indices.hap2_indx: phase_dtype,
+        indices.chr_indx: "string[pyarrow]",
+        indices.str_indx: "int32",
+        indices.end_indx: "int32",
+        indices.cM_indx: "float32",
+    }
+
+
+def _phase_from_column(
+    data: DataFrame, ind_id_indx: int, phase_col_indx: int
+) -> Tuple[Series, npt.NDArray[np.int64]]:
+    """Use the id column as the sample and the phase column as the phase for
+    programs that have a separate phase column such as hap-IBD and RaPID
+
+    Parameters
+    ----------
+    data : DataFrame
+        chunk of the ibd file
+
+    ind_id_indx : int
+        index of the individual id column
+
+    phase_col_indx : int
+        index of the phase column
+
+    Returns
+    -------
+    Tuple[Series, npt.NDArray[np.int64]]
+        returns the sample id of each segment and the integer phase
+    """
+    return data[ind_id_indx], data[phase_col_indx].astype("int64").to_numpy()
+
+
+def _split_haplotype_column(
+    data: DataFrame, phase_col_indx: int
+) -> Tuple[Series, npt.NDArray[np.int64]]:
+    """Split the haplotype column of programs such as GERMLINE and iLASH, where
+    the phase is the last two characters of the haplotype id (ex: 'ID.0'),
+    into the sample id and a phase code. The two characters are stored in the
+    code so that the haplotype string can be rebuilt exactly
+
+    Parameters
+    ----------
+    data : DataFrame
+        chunk of the ibd file
+
+    phase_col_indx : int
+        index of the haplotype column
+
+    Returns
+    -------
+    Tuple[Series, npt.NDArray[np.int64]]
+        returns the sample id of each segment and the phase code
+
+    Raises
+    ------
+    ValueError
+        raises a ValueError if the phase suffix has characters that can not be
+        stored in a single byte
+    """
+    haplotypes = data[phase_col_indx].astype("string[pyarrow]")
+
+    # There are only a few different suffixes so each one is encoded once
+    suffix_codes, suffixes = factorize(haplotypes.str[-2:])
+
+    try:
+        phase_codes = np.array(
+            [int.from_bytes(suffix.encode("latin-1"), "big") for suffix in suffixes],
+            dtype=np.int64,
+        )
+    except UnicodeEncodeError as e:
+        raise ValueError(
+            f"Unable to encode the phase suffix of the haplotype ids in column {phase_col_indx}. Expected the last two characters of each haplotype id to be the phase."  # noqa: E501
+        ) from e
+
+    return haplotypes.str[:-2], phase_codes[suffix_codes]
+
+
+def _format_phase_column(
+    samples: npt.NDArray, phases: npt.NDArray[np.int64]
+) -> List[str]:
+    """Rebuild the haplotype strings created by _phase_from_column
+
+    Parameters
+    ----------
+    samples : npt.NDArray
+        sample id of each haplotype
+
+    phases : npt.NDArray[np.int64]
+        phase of each haplotype
+
+    Returns
+    -------
+    List[str]
+        returns the haplotype strings formatted as '{sample}.{phase}'
+    """
+    return [f"{sample}.{phase}" for sample, phase in zip(samples, phases.tolist())]
+
+
+def _format_haplotype_column(
+    samples: npt.NDArray, phases: npt.NDArray[np.int64]
+) -> List[str]:
+    """Rebuild the haplotype strings created by _split_haplotype_column
+
+    Parameters
+    ----------
+    samples : npt.NDArray
+        sample id of each haplotype
+
+    phases : npt.NDArray[np.int64]
+        phase code of each haplotype
+
+    Returns
+    -------
+    List[str]
+        returns the original haplotype id strings
+    """
+    return [
+        f"{sample}{phase.to_bytes(2, 'big').decode('latin-1')}"
+        for sample, phase in zip(samples, phases.tolist())
+    ]
 
 
 @dataclass
@@ -22,12 +179,18 @@ class HapIBD(FileIndices):
     end_indx: int = 6
     cM_indx: int = 7
 
-    def get_haplotype_id(
-        self, data: DataFrame, ind_id_indx: int, phase_col_indx: int, col_name: str
-    ) -> None:
-        data.loc[:, col_name] = (
-            data[ind_id_indx] + "." + data[phase_col_indx].astype(str)
-        )
+    def column_dtypes(self) -> Dict[int, str]:
+        return _column_dtypes(self, "int8")
+
+    def get_haplotype_parts(
+        self, data: DataFrame, ind_id_indx: int, phase_col_indx: int
+    ) -> Tuple[Series, npt.NDArray[np.int64]]:
+        return _phase_from_column(data, ind_id_indx, phase_col_indx)
+
+    def format_haplotypes(
+        self, samples: npt.NDArray, phases: npt.NDArray[np.int64]
+    ) -> List[str]:
+        return _format_phase_column(samples, phases)
 
     def __str__(self):
         """Custom string message used for debugging"""
@@ -46,10 +209,18 @@ class Germline(FileIndices):
     cM_indx: int = 10
     unit: int = 11
 
-    def get_haplotype_id(
-        self, data: DataFrame, ind_id_indx: int, phase_col_indx: int, col_name: str
-    ) -> None:
-        data.loc[:, col_name] = data[phase_col_indx]
+    def column_dtypes(self) -> Dict[int, str]:
+        return _column_dtypes(self, "string[pyarrow]")
+
+    def get_haplotype_parts(
+        self, data: DataFrame, ind_id_indx: int, phase_col_indx: int
+    ) -> Tuple[Series, npt.NDArray[np.int64]]:
+        return _split_haplotype_column(data, phase_col_indx)
+
+    def format_haplotypes(
+        self, samples: npt.NDArray, phases: npt.NDArray[np.int64]
+    ) -> List[str]:
+        return _format_haplotype_column(samples, phases)
 
     def __str__(self):
         """Custom string message used for debugging"""
@@ -67,10 +238,18 @@ class iLASH(FileIndices):
     end_indx: int = 6
     cM_indx: int = 9
 
-    def get_haplotype_id(
-        self, data: DataFrame, ind_id_indx: int, phase_col_indx: int, col_name: str
-    ) -> None:
-        data.loc[:, col_name] = data[phase_col_indx]
+    def column_dtypes(self) -> Dict[int, str]:
+        return _column_dtypes(self, "string[pyarrow]")
+
+    def get_haplotype_parts(
+        self, data: DataFrame, ind_id_indx: int, phase_col_indx: int
+    ) -> Tuple[Series, npt.NDArray[np.int64]]:
+        return _split_haplotype_column(data, phase_col_indx)
+
+    def format_haplotypes(
+        self, samples: npt.NDArray, phases: npt.NDArray[np.int64]
+    ) -> List[str]:
+        return _format_haplotype_column(samples, phases)
 
     def __str__(self):
         """Custom string message used for debugging"""
@@ -88,12 +267,18 @@ class Rapid(FileIndices):
     str_indx: int = 5
     end_indx: int = 6
 
-    def get_haplotype_id(
-        self, data: DataFrame, ind_id_indx: int, phase_col_indx: int, col_name: str
-    ) -> None:
-        data.loc[:, col_name] = (
-            data[ind_id_indx] + "." + data[phase_col_indx].astype(str)
-        )
+    def column_dtypes(self) -> Dict[int, str]:
+        return _column_dtypes(self, "int8")
+
+    def get_haplotype_parts(
+        self, data: DataFrame, ind_id_indx: int, phase_col_indx: int
+    ) -> Tuple[Series, npt.NDArray[np.int64]]:
+        return _phase_from_column(data, ind_id_indx, phase_col_indx)
+
+    def format_haplotypes(
+        self, samples: npt.NDArray, phases: npt.NDArray[np.int64]
+    ) -> List[str]:
+        return _format_phase_column(samples, phases)
 
     def __str__(self):
         """Custom string message used for debugging"""
@@ -113,7 +298,7 @@ def create_indices(ibd_file_format: str) -> FileIndices:
     -------
     FileIndices
         returns an object that conforms to the FileIndices protocol. It will have the
-        method getHAPID. It will also have the correct indices for the ibd program
+        methods get_haplotype_parts and format_haplotypes. It will also have the correct indices for the ibd program
 
     Raises
     ------
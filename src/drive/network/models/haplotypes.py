@@ -0,0 +1,125 @@
+"""Module with the integer encoding of the haplotype ids. Each haplotype is
+stored as one 64 bit integer that packs the index of the sample in a table of
+interned sample ids with the phase of the haplotype. The haplotype strings are
+only rebuilt from these keys when the networks are written."""
+
+from dataclasses import dataclass
+from typing import List, Set, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from .generate_indices import FileIndices
+
+# number of low bits of the haplotype key that store the phase
+PHASE_BITS = 16
+
+PHASE_MASK = (1 << PHASE_BITS) - 1
+
+
+def pack_haplotypes(
+    sample_indices: npt.NDArray, phases: npt.NDArray
+) -> npt.NDArray[np.int64]:
+    """Pack the sample index and the phase of each haplotype into one integer
+
+    Parameters
+    ----------
+    sample_indices : npt.NDArray
+        position of the sample of each haplotype in the sample table
+
+    phases : npt.NDArray
+        phase code of each haplotype returned by FileIndices.get_haplotype_parts
+
+    Returns
+    -------
+    npt.NDArray[np.int64]
+        returns the integer key of each haplotype
+    """
+    return (np.asarray(sample_indices, dtype=np.int64) << PHASE_BITS) | np.asarray(
+        phases, dtype=np.int64
+    )
+
+
+def unpack_haplotypes(
+    haplotype_keys: npt.NDArray,
+) -> Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """Split the haplotype keys back into the sample index and the phase
+
+    Parameters
+    ----------
+    haplotype_keys : npt.NDArray
+        integer keys created by pack_haplotypes
+
+    Returns
+    -------
+    Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]
+        returns a tuple where the first element is the sample index of each
+        haplotype and the second element is the phase code
+    """
+    haplotype_keys = np.asarray(haplotype_keys, dtype=np.int64)
+
+    return haplotype_keys >> PHASE_BITS, haplotype_keys & PHASE_MASK
+
+
+@dataclass
+class HaplotypeMapper:
+    """Class that maps the integer vertex ids of the graph back to the
+    haplotype strings and the sample ids
+
+    Parameters
+    ----------
+    haplotype_keys : npt.NDArray[np.int64]
+        integer key of each haplotype. The position of the key in the array
+        is the vertex id of the haplotype
+
+    samples : npt.NDArray
+        table of the sample ids. The sample index packed into each key is the
+        position of the sample in this array
+
+    indices : FileIndices
+        object for the IBD program that formats the haplotype strings
+    """
+
+    haplotype_keys: npt.NDArray[np.int64]
+    samples: npt.NDArray
+    indices: FileIndices
+
+    def format_haplotypes(self, haplotype_keys: npt.NDArray) -> List[str]:
+        """Rebuild the haplotype strings of the IBD file from the keys
+
+        Parameters
+        ----------
+        haplotype_keys : npt.NDArray
+            integer keys of the haplotypes
+
+        Returns
+        -------
+        List[str]
+            returns the haplotype id string of each key
+        """
+        sample_indices, phases = unpack_haplotypes(haplotype_keys)
+
+        return self.indices.format_haplotypes(self.samples[sample_indices], phases)
+
+    def map_ids(self, members: List[int]) -> Tuple[List[str], Set[str]]:
+        """Find the haplotype strings and the sample ids for the vertex ids
+
+        Parameters
+        ----------
+        members : List[int]
+            vertex ids of the haplotypes in a network
+
+        Returns
+        -------
+        Tuple[List[str], Set[str]]
+            returns a list of the haplotype id strings and a set of the sample
+            ids of the haplotypes
+        """
+        haplotype_keys = self.haplotype_keys[members]
+
+        sample_indices, _ = unpack_haplotypes(haplotype_keys)
+
+        return (
+            self.format_haplotypes(haplotype_keys),
+            set(self.samples[sample_indices].tolist()),
+        )
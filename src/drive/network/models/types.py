@@ -6,8 +6,9 @@ from typing import Protocol
 
 from pandas import DataFrame
 
-# namedtuple that will contain information about the gene being run
-Genes = namedtuple("Genes", ["chr", "start", "end"])
+# namedtuple that will contain information about the gene being run. The name is
+# optional and is only provided when the targets are read from a BED file
+Genes = namedtuple("Genes", ["chr", "start", "end", "name"], defaults=[None])
 
 
 # interface for the filter object
@@ -1,14 +1,21 @@
 import json
 import re
+import sys
 from pathlib import Path
+from typing import Any, Dict, List, Set
 
 from log import CustomLogger
 
 import drive.network.factory as factory
 from drive.network.cluster import ClusterHandler, cluster
 from drive.network.filters import IbdFilter
-from drive.network.models import RuntimeState, create_indices
-from drive.utilities.functions import split_target_string
+from drive.network.models import FileIndices, RuntimeState, create_indices
+from drive.utilities.functions import (
+    is_standard_stream,
+    load_target_file,
+    split_target_string,
+    target_span,
+)
 from drive.utilities.parser import (
     PhenotypeFileParser,
     load_phenotype_descriptions,
@@ -47,6 +54,15 @@ def find_json_file() -> Path:
 
 def run_network_identification(args) -> None:
     """main entrypoint to run the clustering algorithm for DRIVE"""
+    # Standard output can only hold the networks of one output file
+    if is_standard_stream(args.output) and (
+        args.target_file or args.split_phecode_categories
+    ):
+        logger.critical(
+            "The output can not be written to standard output when a target file or the --split-phecode-categories flag is used because these options write more than one output file. Please provide an output prefix instead."  # noqa: E501
+        )
+        sys.exit(1)
+
     # We need to make sure that there is a configuration file
     json_config = args.json_config if args.json_config else find_json_file()
 
@@ -80,24 +96,131 @@ def run_network_identification(args) -> None:
 
     logger.debug(f"created indices object: {indices}")
 
-    ##target gene region or variant position
-    target_gene = split_target_string(args.target)
+    ##target gene region or variant position. The user can either provide a single
+    # target or a BED file with multiple targets
+    if args.target_file:
+        targets = load_target_file(args.target_file)
+
+        logger.info(f"Identified {len(targets)} target regions in {args.target_file}")
+
+        target_gene = target_span(targets)
+    else:
+        target_gene = split_target_string(args.target)
+
+        targets = [target_gene]
 
     logger.debug(f"Identified a target region: {target_gene}")
 
     filter_obj: IbdFilter = IbdFilter.load_file(
-        args.input, indices, target_gene, args.chunksize
+        args.input,
+        indices,
+        target_gene,
+        args.chunksize,
+        args.ibd_cache,
+        args.ibd_index,
+        args.ibd_reader,
+        args.min_cm,
+        args.threads,
+        args.memory_limit,
     )
 
     # choosing the proper way to filter the ibd files
     filter_obj.set_filter(args.segment_overlap)
 
-    filter_obj.preprocess(args.min_cm, cohort_ids)
+    if args.target_file:
+        target_filters = filter_obj.preprocess_targets(
+            targets,
+            args.min_cm,
+            cohort_ids,
+            args.chromosome_early_stop,
+            args.sorted_input,
+            args.prefetch_chunks,
+        )
+    else:
+        filter_obj.preprocess(
+            args.min_cm,
+            cohort_ids,
+            args.chromosome_early_stop,
+            args.sorted_input,
+            args.prefetch_chunks,
+        )
+
+        target_filters = {target_gene: filter_obj}
+
+    # This section will load in the analysis plugins that are run for each target
+    with open(json_config, encoding="utf-8") as json_config:
+        config = json.load(json_config)
+
+        factory.load_plugins(config["plugins"])
+
+        analysis_plugins = [factory.factory_create(item) for item in config["modules"]]
 
-    # We need to invert the hapid_map dictionary so that the
-    # integer mappings are keys and the values are the
-    # haplotype string
-    hapid_inverted = {value: key for key, value in filter_obj.hapid_map.items()}
+        logger.debug(
+            f"Using plugins: {', '.join([obj.name for obj in analysis_plugins])}"
+        )
+
+    for target, target_filter in target_filters.items():
+        # When there are multiple targets, each target is written to its own
+        # output file that has the target name appended to the output prefix
+        if args.target_file:
+            output_path = args.output.parent / f"{args.output.name}.{target.name}"
+
+            logger.info(
+                f"Identifying networks for the target {target.name} at chr{target.chr}:{target.start}-{target.end}"  # noqa: E501
+            )
+        else:
+            output_path = args.output
+
+        identify_target_networks(
+            args,
+            target_filter,
+            indices,
+            output_path,
+            phenotype_counts,
+            phecodeDescriptions,
+            analysis_plugins,
+        )
+
+
+def identify_target_networks(
+    args,
+    filter_obj: IbdFilter,
+    indices: FileIndices,
+    output_path: Path,
+    phenotype_counts: Dict[str, Dict[str, Set[str]]],
+    phecodeDescriptions: PhecodesMapper,
+    analysis_plugins: List[Any],
+) -> None:
+    """Cluster the filtered segments for one target region and then run each of
+    the analysis plugins on the networks
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        parsed command line arguments
+
+    filter_obj : IbdFilter
+        filter object that has the edges and vertices for the target region
+
+    indices : FileIndices
+        object that has the indices for the necessary columns in the ibd file
+
+    output_path : Path
+        output prefix for the files written by the plugins
+
+    phenotype_counts : Dict[str, Dict[str, Set[str]]]
+        dictionary where the keys are phenotypes and the values are the cases,
+        controls, and excluded individuals
+
+    phecodeDescriptions : PhecodesMapper
+        object that maps the phecode ids to their descriptions
+
+    analysis_plugins : List[Any]
+        list of the plugin objects created by the factory
+    """
+    # The haplotype table is indexed by the integer id of each haplotype so the
+    # mapper can rebuild the haplotype strings for the ids in each network
+    haplotype_mappings = filter_obj.haplotype_mapper()
 
     # creating the object that will handle clustering within the networks
     cluster_handler = ClusterHandler(
@@ -108,16 +231,17 @@ def run_network_identification(args) -> None:
         args.min_network_size,
         args.segment_distribution_threshold,
         args.hub_threshold,
-        hapid_inverted,
+        haplotype_mappings,
         args.recluster,
+        args.workers,
     )
 
-    networks = cluster(filter_obj, cluster_handler, indices.cM_indx)
+    networks = cluster(filter_obj, cluster_handler)
 
     # creating the data container that all the plugins can interact with
     plugin_api = RuntimeState(
         networks,
-        args.output,
+        output_path,
         phenotype_counts,
         phecodeDescriptions,
         config_options={
@@ -129,19 +253,6 @@ def run_network_identification(args) -> None:
 
     logger.debug(f"Data container: {plugin_api}")
 
-    # making sure that the output directory is created
-    # This section will load in the analysis plugins and run each plugin
-    with open(json_config, encoding="utf-8") as json_config:
-        config = json.load(json_config)
-
-        factory.load_plugins(config["plugins"])
-
-        analysis_plugins = [factory.factory_create(item) for item in config["modules"]]
-
-        logger.debug(
-            f"Using plugins: {', '.join([obj.name for obj in analysis_plugins])}"
-        )
-
-        # iterating over every plugin and then running the analyze and write method
-        for analysis_obj in analysis_plugins:
-            analysis_obj.analyze(data=plugin_api)
+    # iterating over every plugin and then running the analyze and write method
+    for analysis_obj in analysis_plugins:
+        analysis_obj.analyze(data=plugin_api)
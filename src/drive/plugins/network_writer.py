@@ -1,12 +1,14 @@
 import gzip
 import sys
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Callable, Iterable, List
+from typing import Callable, Iterable, Iterator, List, TextIO
 
 from log import CustomLogger
 
 from drive.network.factory import factory_register
 from drive.network.models import Network_Interface, RuntimeState
+from drive.utilities.functions import is_standard_stream
 from drive.utilities.parser.phenotype_descriptions_parser import PhecodesMapper
 
 logger = CustomLogger.get_logger(__name__)
@@ -85,6 +87,35 @@ class NetworkWriter:
 
             return output_str + "\n"
 
+    @staticmethod
+    @contextmanager
+    def _standard_output(compress_output: bool) -> Iterator[TextIO]:
+        """Context manager that returns a text stream to standard output. The
+        stream is flushed but not closed when the context exits
+
+        Parameters
+        ----------
+        compress_output : bool
+            whether to gzip compress the output before it is written to
+            standard output
+
+        Returns
+        -------
+        Iterator[TextIO]
+            yields the text stream that the networks are written to
+        """
+        if compress_output:
+            # closing the gzip stream writes the gzip trailer but it does not
+            # close the standard output buffer that it wraps
+            with gzip.open(sys.stdout.buffer, "wt") as networks_output:
+                yield networks_output
+
+            sys.stdout.buffer.flush()
+        else:
+            yield sys.stdout
+
+            sys.stdout.flush()
+
     @staticmethod
     def check_keep_categories(
         categories_to_keep: list[str], phecodeDesc: PhecodesMapper
@@ -234,7 +265,8 @@ class NetworkWriter:
         phenotypes: list[str],
         compress_output: bool,
     ) -> None:
-        """Write output to a single file
+        """Write output to a single file. If the output path is '-' then
+        the networks are written to standard output as they are formatted
 
         Parameters:
         -----------
@@ -256,21 +288,30 @@ class NetworkWriter:
             indicates whether the user wants to compress the output or not
         """
 
-        # Create the output path for the file
-        network_file_output = data.output_path.parent / (
-            data.output_path.name + ".drive_networks.txt"
-        )  # noqa: E501
+        if is_standard_stream(data.output_path):
+            logger.debug(
+                "The output in the network_writer plugin is being written to standard output"  # noqa: E501
+            )
 
-        if compress_output:
-            network_file_output = (
-                network_file_output.parent / f"{network_file_output.name}.gz"
+            output_handle = NetworkWriter._standard_output(compress_output)
+        else:
+            # Create the output path for the file
+            network_file_output = data.output_path.parent / (
+                data.output_path.name + ".drive_networks.txt"
+            )  # noqa: E501
+
+            if compress_output:
+                network_file_output = (
+                    network_file_output.parent / f"{network_file_output.name}.gz"
+                )
+
+            logger.debug(
+                f"The output in the network_writer plugin is being written to: {network_file_output}"  # noqa: E501
             )
 
-        logger.debug(
-            f"The output in the network_writer plugin is being written to: {network_file_output}"  # noqa: E501
-        )
+            output_handle = writer(network_file_output, "wt")
 
-        with writer(network_file_output, "wt") as networks_output:
+        with output_handle as networks_output:
             header_str = NetworkWriter._form_header(phenotypes)
             # iterate over each network and pull out the appropriate
             # information into strings
@@ -0,0 +1 @@
+from .build_segment_index import run_build_index
@@ -0,0 +1,32 @@
+import sys
+
+from log import CustomLogger
+
+from drive.network.filters.filter import read_ibd_text
+from drive.network.filters.segment_store import segment_index_path, write_segment_index
+from drive.network.models import create_indices
+
+logger = CustomLogger.get_logger(__name__)
+
+
+def run_build_index(args) -> None:
+    """main entrypoint to build the sidecar segment index for an ibd file"""
+    indices = create_indices(args.format.lower())
+
+    index_file = args.index_file if args.index_file else segment_index_path(args.input)
+
+    logger.info(
+        f"Building the segment index for the ibd file {args.input}. The index will be written to {index_file}"  # noqa: E501
+    )
+
+    try:
+        write_segment_index(
+            read_ibd_text(args.input, indices, args.chunksize),
+            args.input,
+            index_file,
+            indices,
+            args.block_size,
+        )
+    except ValueError as e:
+        logger.fatal(e)
+        sys.exit(1)
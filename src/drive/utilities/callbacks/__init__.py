@@ -1 +1 @@
-from .callbacks import CheckInputExist
+from .callbacks import CheckInputExist, ExpandInputFiles
@@ -1,6 +1,10 @@
 import argparse
+import glob
 import sys
 from pathlib import Path
+from typing import List
+
+from drive.utilities.functions import is_standard_stream
 
 
 class CheckInputExist(argparse.Action):
@@ -23,3 +27,66 @@ class CheckInputExist(argparse.Action):
                 f"ERROR: The file, {values}, was not found. Please make sure that there is not a typo in the file name."
             )
             sys.exit(1)
+
+
+class ExpandInputFiles(argparse.Action):
+    """Action that accepts one or more input files. Values that contain glob
+    characters (ex: 'chr*.ibd.gz') are expanded to the matching files in
+    sorted order. A value of '-' reads the segments from standard input and
+    can not be combined with other files. If allow_standard_input is False
+    then '-' is rejected, such as for commands that read the input more than
+    once. The option is stored as a list of Paths"""
+
+    def __init__(
+        self, option_strings, dest, allow_standard_input: bool = True, **kwargs
+    ) -> None:
+        self.allow_standard_input = allow_standard_input
+        super(ExpandInputFiles, self).__init__(option_strings, dest, **kwargs)
+
+    def __call__(
+        self,
+        parser: argparse.ArgumentParser,
+        namespace: argparse.Namespace,
+        values: List[Path],
+        option_string: str = None,
+    ) -> None:
+        input_files = []
+
+        if any(is_standard_stream(value) for value in values):
+            if not self.allow_standard_input:
+                print(
+                    f"ERROR: The input for the {option_string} option can not be streamed from standard input, '-', because it is read more than once. Please provide the path to the file instead."
+                )
+                sys.exit(1)
+
+            if len(values) > 1:
+                print(
+                    "ERROR: Standard input, '-', can not be combined with other input files. Please either provide the files or stream a single input through standard input."
+                )
+                sys.exit(1)
+
+            setattr(namespace, self.dest, list(values))
+            return
+
+        for value in values:
+            if any(character in str(value) for character in "*?["):
+                matching_files = sorted(glob.glob(str(value)))
+
+                if not matching_files:
+                    print(
+                        f"ERROR: No files matched the pattern, {value}. Please make sure that there is not a typo in the pattern."
+                    )
+                    sys.exit(1)
+
+                input_files.extend(
+                    Path(matching_file) for matching_file in matching_files
+                )
+            elif value.exists():
+                input_files.append(value)
+            else:
+                print(
+                    f"ERROR: The file, {value}, was not found. Please make sure that there is not a typo in the file name."
+                )
+                sys.exit(1)
+
+        setattr(namespace, self.dest, input_files)
@@ -1,2 +1,4 @@
 from .split_region_str import split_target_string
 from .generate_random_filename import generate_random_logfile_suffix
+from .load_target_file import load_target_file, target_span
+from .standard_streams import STANDARD_STREAM, is_standard_stream
@@ -0,0 +1,116 @@
+from collections import Counter
+from pathlib import Path
+from typing import List, Union
+
+from drive.network.models import Genes
+
+
+def _format_chromosome(chromosome: str) -> Union[int, str]:
+    """Remove the 'chr' prefix from the chromosome and convert it to an integer
+    if it is numeric so that it matches the chromosome from the target string
+
+    Parameters
+    ----------
+    chromosome : str
+        chromosome from the first column of the BED file
+
+    Returns
+    -------
+    Union[int, str]
+        returns the chromosome number as an integer or the chromosome name
+        for non numeric chromosomes such as X
+    """
+    chromosome = chromosome.removeprefix("chr")
+
+    return int(chromosome) if chromosome.isdigit() else chromosome
+
+
+def load_target_file(target_file: Path) -> List[Genes]:
+    """Read in the target regions from a BED file. The first three columns are
+    the chromosome, the 0-based start position, and the end position. The
+    optional fourth column is the name of the region. BED start positions are
+    converted to the 1-based positions that the --target argument uses.
+
+    Parameters
+    ----------
+    target_file : Path
+        filepath to the BED file with one target region per line
+
+    Returns
+    -------
+    List[Genes]
+        returns a list of namedtuples that have the chromosome, start position,
+        end position, and name of each target region
+
+    Raises
+    ------
+    ValueError
+        raises a value error if a line has fewer than three columns, if the
+        start position is larger than the end position, if two regions have
+        the same name, or if the file has no regions
+    """
+    targets = []
+
+    with open(target_file, "r", encoding="utf-8") as bed_file:
+        for line_num, line in enumerate(bed_file, start=1):
+            if not line.strip() or line.startswith(("#", "track", "browser")):
+                continue
+
+            fields = line.strip().split("\t")
+
+            if len(fields) < 3:
+                raise ValueError(
+                    f"Expected line {line_num} of the target file, {target_file}, to have at least three tab separated columns for the chromosome, start position, and end position. Instead the line was: {line.strip()}"  # noqa: E501
+                )
+
+            chromosome = _format_chromosome(fields[0])
+            start, end = int(fields[1]) + 1, int(fields[2])
+
+            if start > end:
+                raise ValueError(
+                    f"expected the start position of the region on line {line_num} of the target file to be < the end position. Instead the start position was {fields[1]} and the end position was {fields[2]}"  # noqa: E501
+                )
+
+            name = fields[3] if len(fields) > 3 else f"chr{chromosome}_{start}_{end}"
+
+            targets.append(Genes(chromosome, start, end, name))
+
+    if not targets:
+        raise ValueError(f"No target regions were found in the file {target_file}")
+
+    name_counts = Counter(target.name for target in targets)
+
+    duplicate_names = {name for name, count in name_counts.items() if count > 1}
+
+    if duplicate_names:
+        raise ValueError(
+            f"Each target region needs a unique name because the name is used in the output filename. The following names were used more than once in the file {target_file}: {', '.join(sorted(duplicate_names))}"  # noqa: E501
+        )
+
+    return targets
+
+
+def target_span(targets: List[Genes]) -> Genes:
+    """Create a region that spans every target region. This region is used to
+    determine which parts of the ibd file have to be read
+
+    Parameters
+    ----------
+    targets : List[Genes]
+        list of target regions
+
+    Returns
+    -------
+    Genes
+        returns a namedtuple that starts at the smallest start position and
+        ends at the largest end position. The chromosome is None if the
+        targets are on different chromosomes
+    """
+    chromosomes = {target.chr for target in targets}
+
+    return Genes(
+        chromosomes.pop() if len(chromosomes) == 1 else None,
+        min(target.start for target in targets),
+        max(target.end for target in targets),
+        "target_span",
+    )
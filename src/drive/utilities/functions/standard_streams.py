@@ -0,0 +1,23 @@
+from pathlib import Path
+from typing import Union
+
+# Value used on the command line in place of a filepath to read from standard
+# input or to write to standard output
+STANDARD_STREAM = "-"
+
+
+def is_standard_stream(filepath: Union[Path, str]) -> bool:
+    """Check if the filepath passed on the command line refers to standard
+    input or standard output instead of a file
+
+    Parameters
+    ----------
+    filepath : Union[Path, str]
+        filepath provided by the user
+
+    Returns
+    -------
+    bool
+        returns True if the filepath is '-'
+    """
+    return str(filepath) == STANDARD_STREAM
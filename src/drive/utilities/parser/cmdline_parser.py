@@ -6,8 +6,9 @@ from rich_argparse import RichHelpFormatter
 
 from drive.dendrogram import generate_dendrograms
 from drive.network import run_network_identification
+from drive.utilities.build_index import run_build_index
 from drive.utilities.pull_samples import run_pull_samples
-from drive.utilities.callbacks import CheckInputExist
+from drive.utilities.callbacks import CheckInputExist, ExpandInputFiles
 from drive.utilities.testing import run_integration_test
 
 
@@ -73,9 +74,10 @@ def generate_cmd_parser() -> argparse.ArgumentParser:
         "--input",
         "-i",
         type=Path,
-        help="IBD input file from ibd detection software",
+        nargs="+",
+        help="One or more IBD input files from ibd detection software. Glob patterns such as 'chr*.ibd.gz' can be used to provide a file for each chromosome or sample batch. The files are read as if they were concatenated together. When more than one file is provided, the files are read concurrently by the number of processes given by --threads. Use '-' to stream the segments from standard input, such as from a pipe.",
         required=True,
-        action=CheckInputExist,
+        action=ExpandInputFiles,
     )
 
     cluster_parser.add_argument(
@@ -87,19 +89,28 @@ def generate_cmd_parser() -> argparse.ArgumentParser:
         choices=["hapibd", "ilash", "germline", "rapid"],
     )
 
-    cluster_parser.add_argument(
+    # The user can either provide a single target region or a BED file of targets
+    target_group = cluster_parser.add_mutually_exclusive_group(required=True)
+
+    target_group.add_argument(
         "--target",
         "-t",
         type=str,
         help="Target region or position, chr:start-end or chr:pos",
-        required=True,
+    )
+
+    target_group.add_argument(
+        "--target-file",
+        type=Path,
+        help="BED file of target regions. The file is expected to be tab separated where the first three columns are the chromosome, the 0-based start position, and the end position. An optional fourth column can provide a unique name for each region. DRIVE reads the IBD file once and identifies networks for every region. The output for each region is written to a file with the region name appended to the output prefix.",
+        action=CheckInputExist,
     )
 
     cluster_parser.add_argument(
         "--output",
         "-o",
         type=Path,
-        help="output file prefix. The program will append .drive_networks.txt to the filename provided",
+        help="output file prefix. The program will append .drive_networks.txt to the filename provided. Use '-' to write the networks to standard output. The log file is then written to the current directory",
         required=True,
     )
 
@@ -199,11 +210,76 @@ def generate_cmd_parser() -> argparse.ArgumentParser:
         help="whether or not the user wishes the program to automically recluster based on things like hub threshold, max network size and how connected the graph is. ",  # noqa: E501
     )
 
+    cluster_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of processes used to recluster the networks that are too large and too sparse. The networks in each recheck round are independent so they are reclustered at the same time, starting with the largest networks. The networks are named and written in the same order as when one process is used. (default: %(default)s)",
+    )
+
     cluster_parser.add_argument(
         "--chunksize",
         type=int,
-        default=100_000,
-        help="change the chunksize used to read in the shared segment data. Larger chunksizes will speed up the analysis but will use more memory. There is a asymptotic limit on the speed up still. Due to how pandas reads in data, trying to read in the whole file at once will still be slower than chunking if the file is really big. (default: %(default)s)",
+        default=None,
+        help="change the chunksize used to read in the shared segment data. Larger chunksizes will speed up the analysis but will use more memory. There is a asymptotic limit on the speed up still. Due to how pandas reads in data, trying to read in the whole file at once will still be slower than chunking if the file is really big. If no chunksize is provided then DRIVE measures the bytes per row of the first chunk and picks a chunksize that fits the available memory, doubling it while that increases the number of rows read per second. Readers other than the default text reader use 100,000 rows. (default: tuned automatically)",
+    )
+
+    cluster_parser.add_argument(
+        "--ibd-cache",
+        type=Path,
+        default=None,
+        help="Optional directory used to cache the parsed IBD segments as a memory mapped columnar file. The first run against an IBD file writes the cache and later runs against the same unmodified file load the cache instead of parsing the text file. The cache is keyed by the input file path, size, modification time, and format.",
+    )
+
+    cluster_parser.add_argument(
+        "--ibd-index",
+        type=Path,
+        default=None,
+        help="Optional path to a segment index built with 'drive utilities index'. DRIVE will read only the blocks of the index that can overlap the target region. If this argument is not provided, DRIVE will use an index with the suffix '.drive_index' next to the IBD file if one exists. When more than one IBD file is provided, this argument is ignored and each file uses the index next to it.",
+        action=CheckInputExist,
+    )
+
+    cluster_parser.add_argument(
+        "--ibd-reader",
+        type=str,
+        default="pandas",
+        choices=["pandas", "pyarrow"],
+        help="engine used to read the IBD file when no cache or index is used. The 'pyarrow' engine streams the file and only converts the segments that overlap the target region and pass the minimum centimorgan threshold which uses less time and memory for small target regions. (default: %(default)s)",
+    )
+
+    cluster_parser.add_argument(
+        "--threads",
+        type=int,
+        default=1,
+        help="number of processes used to read the IBD file. If this value is larger than 1 then an uncompressed IBD file is split into byte ranges that are parsed and filtered in parallel, and the blocks of a bgzip compressed file are decompressed by this many threads. Plain gzipped files, the IBD cache, and the segment index are read by one process. (default: %(default)s)",
+    )
+
+    cluster_parser.add_argument(
+        "--memory-limit",
+        type=int,
+        default=None,
+        help="Optional number of megabytes that the filtered IBD segments can use in memory. Once the segments would use more than this amount, they are spilled to memory mapped files in a temporary directory (set by the TMPDIR environment variable) so that large targets can be run on nodes with limited memory.",
+    )
+
+    cluster_parser.add_argument(
+        "--sorted-input",
+        default=False,
+        help="Optional flag to indicate that the IBD file is sorted by segment start position within each chromosome. DRIVE will stop reading the file once the start positions are past the end of the target region(s). The order is checked while the file is read and the whole file is read if it is not sorted. (default: %(default)s)",
+        action="store_true",
+    )
+
+    cluster_parser.add_argument(
+        "--prefetch-chunks",
+        default=2,
+        type=int,
+        help="number of chunks of the IBD file that a background thread reads and decompresses ahead of the chunk that is being filtered. This overlaps the time spent waiting on the disk or network file system with the filtering. Each prefetched chunk uses as much memory as one chunk of --chunksize rows. A value of 0 reads and filters the chunks in one thread. (default: %(default)s)",
+    )
+
+    cluster_parser.add_argument(
+        "--chromosome-early-stop",
+        default=False,
+        help="Optional flag to indicate that the IBD file is grouped by chromosome, such as when the per chromosome IBD files of one batch of samples are concatenated together. DRIVE will stop reading the file once it has moved past the target chromosome(s), so any segment on a target chromosome later in the file is not read. Do not use this flag for files that repeat the chromosomes, such as files from several sample batches that are concatenated together. (default: %(default)s)",
+        action="store_true",
     )
 
     cluster_parser.add_argument(
@@ -253,9 +329,11 @@ def generate_cmd_parser() -> argparse.ArgumentParser:
     dendrogram_parser.add_argument(
         "--ibd",
         type=Path,
-        help="path to the input ibd file that was used to create the networks from",
+        nargs="+",
+        help="path to the input ibd file that was used to create the networks from. If the networks were created from several files, then each file or a glob pattern that matches the files can be provided. The file is read once for every network so it can not be streamed from standard input.",
         required=True,
-        action=CheckInputExist,
+        action=ExpandInputFiles,
+        allow_standard_input=False,
     )
 
     dendrogram_parser.add_argument(
@@ -306,6 +384,64 @@ def generate_cmd_parser() -> argparse.ArgumentParser:
         help="minimum centimorgan threshold. The program expects this to be an integer value. (default: %(default)s)",
     )
 
+    dendrogram_parser.add_argument(
+        "--ibd-cache",
+        type=Path,
+        default=None,
+        help="Optional directory used to cache the parsed IBD segments as a memory mapped columnar file. The first run against an IBD file writes the cache and later runs against the same unmodified file load the cache instead of parsing the text file.",
+    )
+
+    dendrogram_parser.add_argument(
+        "--ibd-index",
+        type=Path,
+        default=None,
+        help="Optional path to a segment index built with 'drive utilities index'. If this argument is not provided, DRIVE will use an index with the suffix '.drive_index' next to the IBD file if one exists. When more than one IBD file is provided, this argument is ignored and each file uses the index next to it.",
+        action=CheckInputExist,
+    )
+
+    dendrogram_parser.add_argument(
+        "--ibd-reader",
+        type=str,
+        default="pandas",
+        choices=["pandas", "pyarrow"],
+        help="engine used to read the IBD file when no cache or index is used. The 'pyarrow' engine only converts the segments that overlap the target region and pass the minimum centimorgan threshold. (default: %(default)s)",
+    )
+
+    dendrogram_parser.add_argument(
+        "--threads",
+        type=int,
+        default=1,
+        help="number of processes used to read an uncompressed IBD file. (default: %(default)s)",
+    )
+
+    dendrogram_parser.add_argument(
+        "--memory-limit",
+        type=int,
+        default=None,
+        help="Optional number of megabytes that the filtered IBD segments can use in memory before they are spilled to memory mapped files in a temporary directory.",
+    )
+
+    dendrogram_parser.add_argument(
+        "--sorted-input",
+        default=False,
+        help="Optional flag to indicate that the IBD file is sorted by segment start position within each chromosome so that DRIVE can stop reading the file once it has moved past the target region. (default: %(default)s)",
+        action="store_true",
+    )
+
+    dendrogram_parser.add_argument(
+        "--prefetch-chunks",
+        default=2,
+        type=int,
+        help="number of chunks of the IBD file that a background thread reads and decompresses ahead of the chunk that is being filtered. This overlaps the time spent waiting on the disk or network file system with the filtering. Each prefetched chunk uses as much memory as one chunk of --chunksize rows. A value of 0 reads and filters the chunks in one thread. (default: %(default)s)",
+    )
+
+    dendrogram_parser.add_argument(
+        "--chromosome-early-stop",
+        default=False,
+        help="Optional flag to indicate that the IBD file is grouped by chromosome so that DRIVE can stop reading the file once it has moved past the target chromosome. Do not use this flag for files that repeat the chromosomes. (default: %(default)s)",
+        action="store_true",
+    )
+
     dendrogram_parser.add_argument(
         "--map-ids",
         default=False,
@@ -424,6 +560,57 @@ def generate_cmd_parser() -> argparse.ArgumentParser:
 
     pull_samples_parser.set_defaults(func=run_pull_samples)
 
+    # This command builds the sidecar index that lets the cluster and dendrogram
+    # commands read only the parts of the ibd file that overlap the target region
+    index_parser = utility_cmd_subparser.add_parser(
+        name="index",
+        help="build a segment index for an IBD file so that target regions can be read without scanning the whole file",
+        formatter_class=RichHelpFormatter,
+        parents=[common_parser],
+        description="index",
+    )
+
+    index_parser.add_argument(
+        "-i",
+        "--input",
+        type=Path,
+        required=True,
+        help="IBD input file from ibd detection software",
+        action=CheckInputExist,
+    )
+
+    index_parser.add_argument(
+        "--format",
+        "-f",
+        default="hapibd",
+        type=str,
+        help="IBD program used to detect segments. Allowed values are hapibd, ilash, germline, rapid. Program expects for value to be lowercase. (default: %(default)s)",
+        choices=["hapibd", "ilash", "germline", "rapid"],
+    )
+
+    index_parser.add_argument(
+        "--index-file",
+        type=Path,
+        default=None,
+        help="filepath to write the index to. By default the index is written next to the IBD file with the suffix '.drive_index'. DRIVE automatically uses an index at this default location when the cluster or dendrogram commands are run.",
+    )
+
+    index_parser.add_argument(
+        "--block-size",
+        type=int,
+        default=65_536,
+        help="number of segments in each block of the index. Smaller blocks let DRIVE skip more of the file for small target regions. (default: %(default)s)",
+    )
+
+    index_parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=100_000,
+        help="change the chunksize used to read in the shared segment data while building the index. (default: %(default)s)",
+    )
+
+    index_parser.set_defaults(func=run_build_index)
+
     testing_parser = utility_cmd_subparser.add_parser(
         name="test",
         help="run the integration test to ensure that DRIVE was installed correctly",
@@ -0,0 +1,50 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.network.filters.arrow_reader import read_ibd_arrow
+from drive.network.filters.filter import read_ibd_text
+from drive.network.filters.segment_store import store_columns
+from drive.network.models.generate_indices import HapIBD
+
+hapibd = HapIBD()
+
+ibd_input = Path("tests/test_inputs/simulated_ibd_test_data_v2_chr20.ibd.gz")
+
+
+@pytest.mark.unit
+def test_arrow_reader_pushes_down_predicate() -> None:
+    """Unit test that will make sure the pyarrow reader returns the same segments as filtering the pandas chunks"""
+    region_start, region_end, min_cm = 4666882, 4682236, 3
+
+    arrow_segments = pd.concat(
+        read_ibd_arrow(ibd_input, hapibd, 1_000, region_start, region_end, min_cm),
+        ignore_index=True,
+    )
+
+    segments = pd.concat(read_ibd_text(ibd_input, hapibd, 10_000), ignore_index=True)
+
+    expected = segments[
+        (segments[hapibd.str_indx] <= region_end)
+        & (segments[hapibd.end_indx] >= region_start)
+        & (segments[hapibd.cM_indx] >= min_cm)
+    ][store_columns(hapibd)].reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(
+        arrow_segments.astype(str), expected.astype(str), check_dtype=False
+    )
+
+
+@pytest.mark.unit
+def test_arrow_reader_uses_declared_dtypes() -> None:
+    """Unit test that will make sure the pyarrow reader parses the same columns with the same dtypes as the pandas reader"""
+    arrow_segments = next(read_ibd_arrow(ibd_input, hapibd, 1_000, 4666882, 4682236, 3))
+
+    text_segments = next(read_ibd_text(ibd_input, hapibd, 1_000))
+
+    pd.testing.assert_series_equal(
+        arrow_segments.dtypes, text_segments[store_columns(hapibd)].dtypes
+    )
@@ -0,0 +1,47 @@
+import gzip
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.network.filters.bgzf_reader import is_bgzf, read_ibd_bgzf
+from drive.network.filters.filter import read_ibd_text
+from drive.network.models.generate_indices import HapIBD
+
+hapibd = HapIBD()
+
+# The test file is compressed with bgzip
+ibd_input = Path("tests/test_inputs/simulated_ibd_test_data_v2_chr20.ibd.gz")
+
+
+@pytest.mark.unit
+def test_is_bgzf(tmp_path) -> None:
+    """Unit test that will make sure bgzip files are detected and plain gzip files are not"""
+    plain_gzip = tmp_path / "plain.ibd.gz"
+
+    with gzip.open(ibd_input, "rb") as compressed:
+        plain_gzip.write_bytes(gzip.compress(compressed.read()))
+
+    errors = []
+
+    if not is_bgzf(ibd_input):
+        errors.append(f"Expected the file {ibd_input} to be detected as BGZF")
+
+    if is_bgzf(plain_gzip):
+        errors.append("Expected a plain gzip file to not be detected as BGZF")
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.unit
+def test_bgzf_reader_matches_text_reader() -> None:
+    """Unit test that will make sure decompressing the blocks in parallel gives the same segments as reading the file with pandas"""
+    expected = pd.concat(read_ibd_text(ibd_input, hapibd, 10_000), ignore_index=True)
+
+    bgzf_segments = pd.concat(
+        read_ibd_bgzf(ibd_input, hapibd, 1_000, threads=3), ignore_index=True
+    )
+
+    pd.testing.assert_frame_equal(bgzf_segments, expected)
@@ -0,0 +1,117 @@
+import gzip
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.network.filters import IbdFilter
+from drive.network.filters.chromosomes import ChromosomeTracker, chromosome_mask
+from drive.network.models import Genes
+from drive.network.models.generate_indices import HapIBD
+
+ibd_input = Path("tests/test_inputs/simulated_ibd_test_data_v2_chr20.ibd.gz")
+
+
+@pytest.mark.unit
+def test_filter_removes_other_chromosomes() -> None:
+    """Unit test that will make sure segments on other chromosomes with the same positions as the target are removed"""
+    hapibd = HapIBD()
+
+    filter_obj = IbdFilter(iter(()), hapibd, Genes(20, 100, 200))
+
+    chunk = pd.DataFrame(
+        {
+            hapibd.chr_indx: ["chr19", "chr20", "chr21"],
+            hapibd.str_indx: [50, 50, 50],
+            hapibd.end_indx: [300, 300, 300],
+            hapibd.cM_indx: [5.0, 5.0, 5.0],
+        }
+    )
+
+    filtered_chunk = filter_obj._contains_filter(chunk, 3)
+
+    assert filtered_chunk.index.tolist() == [
+        1
+    ], f"Expected only the segment on chromosome 20 to be kept. Instead the rows {filtered_chunk.index.tolist()} were kept"
+
+
+@pytest.mark.unit
+def test_chromosome_mask_numeric_column() -> None:
+    """Unit test that will make sure a target with the 'chr' prefix matches a numeric chromosome column"""
+    mask = chromosome_mask(pd.Series([19, 20, 20]), "chr20")
+
+    assert mask.tolist() == [
+        False,
+        True,
+        True,
+    ], f"Expected the last two rows to match chromosome 20. Instead the mask was {mask.tolist()}"
+
+
+@pytest.mark.unit
+def test_tracker_detects_grouped_file() -> None:
+    """Unit test that will make sure the tracker only reports the target chromosome as passed if the file is grouped by chromosome"""
+    grouped_tracker = ChromosomeTracker.from_targets([20])
+
+    grouped_tracker.update(pd.Series([19, 19, 20]))
+
+    errors = []
+
+    if grouped_tracker.passed_targets():
+        errors.append(
+            "Expected the target to not be passed while reading chromosome 20"
+        )
+
+    grouped_tracker.update(pd.Series([20, 21]))
+
+    if not grouped_tracker.passed_targets():
+        errors.append("Expected the target to be passed once chromosome 21 was read")
+
+    interleaved_tracker = ChromosomeTracker.from_targets([20])
+
+    interleaved_tracker.update(pd.Series([20, 21, 20, 21]))
+
+    if interleaved_tracker.passed_targets():
+        errors.append(
+            "Expected the target to not be passed when the file is not grouped by chromosome"
+        )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.integtest
+def test_batch_concatenated_file_is_read_by_default(tmp_path) -> None:
+    """Integration test that will make sure the segments in every block of a file that repeats the chromosomes for a second sample batch are kept unless the user indicates that the file is grouped by chromosome"""
+    hapibd = HapIBD()
+
+    batch_ibd = tmp_path / "batches.ibd.gz"
+
+    with gzip.open(ibd_input, "rt") as ibd_fh:
+        lines = ibd_fh.readlines()
+
+    # Each batch has the segments split into blocks on chromosomes 19, 20,
+    # and 21 and the second batch repeats the chromosomes
+    with gzip.open(batch_ibd, "wt") as output:
+        for _ in range(2):
+            for line_number, line in enumerate(lines):
+                fields = line.split("\t")
+                fields[hapibd.chr_indx] = ["19", "20", "21"][
+                    line_number * 3 // len(lines)
+                ]
+                output.write("\t".join(fields))
+
+    edge_counts = {}
+
+    for chromosome_early_stop in [False, True]:
+        filter_obj = IbdFilter.load_file(
+            batch_ibd, hapibd, Genes(20, 4666882, 4682236), chunksize=5_000
+        )
+        filter_obj.set_filter("overlaps")
+        filter_obj.preprocess(3, chromosome_early_stop=chromosome_early_stop)
+
+        edge_counts[chromosome_early_stop] = filter_obj.ibd_pd.shape[0]
+
+    assert (
+        edge_counts[False] > edge_counts[True]
+    ), f"Expected the second batch to add segments when the whole file is read. Instead {edge_counts[False]} segments were kept when reading the whole file and {edge_counts[True]} when stopping early"
@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.network.filters import IbdFilter
+from drive.network.filters.chunk_tuner import MIN_CHUNKSIZE, ChunkSizeTuner
+from drive.network.models import Genes
+from drive.network.models.generate_indices import HapIBD
+
+ibd_input = Path("tests/test_inputs/simulated_ibd_test_data_v2_chr20.ibd.gz")
+
+
+@pytest.mark.unit
+def test_tuner_respects_memory_budget() -> None:
+    """Unit test that will make sure the chunksize never grows past the rows that fit in the memory budget"""
+    tuner = ChunkSizeTuner(memory_budget=100 * 50_000, chunksize=40_000)
+
+    errors = []
+
+    # the first chunk uses 100 bytes per row so 50,000 rows fit in the budget
+    next_chunksize = tuner.update(40_000, 40_000 * 100, 1.0)
+
+    if next_chunksize != 50_000:
+        errors.append(
+            f"Expected the chunksize to grow to the 50000 rows that fit in the memory budget. Instead it was {next_chunksize}"
+        )
+
+    # a faster chunk at the memory limit settles the chunksize at the limit
+    next_chunksize = tuner.update(50_000, 50_000 * 100, 0.5)
+
+    if next_chunksize != 50_000 or not tuner.settled:
+        errors.append(
+            f"Expected the tuner to settle on 50000 rows at the memory limit. Instead the chunksize was {next_chunksize} and settled was {tuner.settled}"
+        )
+
+    wide_tuner = ChunkSizeTuner(memory_budget=1_000, chunksize=100_000)
+
+    next_chunksize = wide_tuner.update(100_000, 100_000 * 100, 1.0)
+
+    if next_chunksize != MIN_CHUNKSIZE:
+        errors.append(
+            f"Expected the chunksize to shrink to the minimum of {MIN_CHUNKSIZE} rows when the rows do not fit the budget. Instead it was {next_chunksize}"
+        )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.unit
+def test_tuner_keeps_previous_size_when_throughput_drops() -> None:
+    """Unit test that will make sure the tuner goes back to the previous chunksize once doubling it stops increasing the throughput"""
+    tuner = ChunkSizeTuner(memory_budget=10**12, chunksize=10_000)
+
+    chunksizes = [tuner.update(10_000, 10_000 * 50, 1.0)]
+
+    # twice the rows in less time is faster so the chunksize doubles again
+    chunksizes.append(tuner.update(20_000, 20_000 * 50, 1.0))
+
+    # twice the rows in more than twice the time is slower
+    chunksizes.append(tuner.update(40_000, 40_000 * 50, 5.0))
+
+    assert (
+        chunksizes == [20_000, 40_000, 20_000] and tuner.settled
+    ), f"Expected the chunksizes 20000, 40000, and then 20000 once the throughput dropped. Instead the chunksizes were {chunksizes}"
+
+
+@pytest.mark.integtest
+def test_tuned_chunks_match_fixed_chunks() -> None:
+    """Integration test that will make sure reading the file with a tuned chunksize gives the same edges as a fixed chunksize"""
+    target = Genes(20, 4666882, 4682236)
+
+    filters = []
+
+    for chunksize in [5_000, None]:
+        filter_obj = IbdFilter.load_file(ibd_input, HapIBD(), target, chunksize)
+        filter_obj.set_filter("overlaps")
+        filter_obj.preprocess(3)
+        filters.append(filter_obj)
+
+    fixed_filter, tuned_filter = filters
+
+    pd.testing.assert_frame_equal(fixed_filter.ibd_pd, tuned_filter.ibd_pd)
@@ -0,0 +1,112 @@
+import itertools
+
+import igraph as ig
+import numpy as np
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.network.cluster import ClusterHandler
+
+
+def _expected_cluster_edges(graph: ig.Graph, members: list):
+    """Find the internal edge count and the false negative edges of one cluster
+    with a lookup for every pair of members"""
+    internal_edge_count = len(graph.subgraph(members).get_edgelist())
+
+    all_edges = set()
+
+    for member in members:
+        all_edges.update(graph.incident(member))
+
+    pair_edges = graph.get_eids(
+        pairs=list(itertools.combinations(members, 2)), directed=False, error=False
+    )
+
+    return internal_edge_count, sorted(all_edges.difference(pair_edges))
+
+
+@pytest.mark.unit
+def test_summary_matches_pairwise_lookup() -> None:
+    """Unit test that will make sure the members, internal edge counts, and false negative edges of each cluster match a pairwise lookup on a graph with a self loop"""
+    idnum1 = np.array([0, 1, 0, 2, 3, 3, 4, 5, 1], dtype=np.int32)
+    idnum2 = np.array([1, 2, 2, 3, 4, 5, 5, 5, 4], dtype=np.int32)
+    cm = np.arange(1, len(idnum1) + 1, dtype=np.float32)
+
+    graph = ClusterHandler.generate_graph(
+        idnum1, idnum2, cm, np.arange(6, dtype=np.int32)
+    )
+
+    membership = [0, 0, 0, 1, 1, 1]
+
+    summary = ClusterHandler._summarize_clusters(graph, membership)
+
+    errors = []
+
+    for cluster_id, expected_members in enumerate([[0, 1, 2], [3, 4, 5]]):
+        members = summary.vertex_ids[cluster_id].tolist()
+
+        if members != expected_members:
+            errors.append(
+                f"Expected cluster {cluster_id} to have the members {expected_members}. Instead it had {members}"
+            )
+
+        expected_count, expected_false_negatives = _expected_cluster_edges(
+            graph, expected_members
+        )
+
+        if summary.internal_edge_counts[cluster_id] != expected_count:
+            errors.append(
+                f"Expected cluster {cluster_id} to have {expected_count} internal edges. Instead it had {summary.internal_edge_counts[cluster_id]}"
+            )
+
+        false_negatives = summary.false_negative_edges[cluster_id].tolist()
+
+        if false_negatives != expected_false_negatives:
+            errors.append(
+                f"Expected cluster {cluster_id} to have the false negative edges {expected_false_negatives}. Instead it had {false_negatives}"
+            )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.unit
+def test_summary_counts_repeated_edges() -> None:
+    """Unit test that will make sure repeated edges between two members count as internal edges and that all but one of them are false negative edges"""
+    graph = ClusterHandler.generate_graph(
+        np.array([0, 0, 1, 2, 2], dtype=np.int32),
+        np.array([1, 1, 2, 3, 3], dtype=np.int32),
+        np.array([3.0, 4.0, 5.0, 6.0, 7.0], dtype=np.float32),
+        np.arange(4, dtype=np.int32),
+    )
+
+    summary = ClusterHandler._summarize_clusters(graph, [0, 0, 0, 1])
+
+    errors = []
+
+    if summary.internal_edge_counts.tolist() != [3, 0]:
+        errors.append(
+            f"Expected the clusters to have 3 and 0 internal edges. Instead they had {summary.internal_edge_counts.tolist()}"
+        )
+
+    false_negative_counts = [len(edges) for edges in summary.false_negative_edges]
+
+    if false_negative_counts != [3, 2]:
+        errors.append(
+            f"Expected the clusters to have 3 and 2 false negative edges. Instead they had {false_negative_counts}"
+        )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.unit
+def test_summary_rejects_mismatched_membership() -> None:
+    """Unit test that will make sure a membership list that does not cover every vertex of the graph raises a ValueError"""
+    graph = ClusterHandler.generate_graph(
+        np.array([0, 1], dtype=np.int32),
+        np.array([1, 2], dtype=np.int32),
+        np.array([3.0, 4.0], dtype=np.float32),
+    )
+
+    with pytest.raises(ValueError):
+        ClusterHandler._summarize_clusters(graph, [0, 0])
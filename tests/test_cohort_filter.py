@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.network.filters import IbdFilter
+from drive.network.models import Genes
+from drive.network.models.generate_indices import HapIBD
+
+
+@pytest.mark.unit
+def test_filter_for_cohort_keeps_pairs_in_cohort() -> None:
+    """Unit test that will make sure only pairs where both individuals are in the cohort are kept"""
+    hapibd = HapIBD()
+
+    filter_obj = IbdFilter(iter(()), hapibd, Genes("20", 1, 2))
+
+    chunk = pd.DataFrame(
+        {
+            hapibd.id1_indx: pd.Series(["a", "b", "c", "a"], dtype="string[pyarrow]"),
+            hapibd.id2_indx: pd.Series(["b", "d", "a", "c"], dtype="string[pyarrow]"),
+        }
+    )
+
+    cohort_lookup = IbdFilter._build_cohort_lookup(["a", "b", "c", "c"])
+
+    filtered_chunk = filter_obj._filter_for_cohort(chunk, cohort_lookup)
+
+    errors = []
+
+    if filtered_chunk.index.tolist() != [0, 2, 3]:
+        errors.append(
+            f"Expected the rows 0, 2, and 3 to be kept. Instead the rows {filtered_chunk.index.tolist()} were kept"
+        )
+
+    if IbdFilter._build_cohort_lookup([]) is not None:
+        errors.append(
+            "Expected no cohort lookup to be built when no cohort ids are provided"
+        )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
@@ -0,0 +1,174 @@
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.network.filters import IbdFilter
+from drive.network.filters.columnar_reader import (
+    columnar_format,
+    read_ibd_ipc,
+    read_ibd_parquet,
+)
+from drive.network.models import Genes
+from drive.network.models.generate_indices import HapIBD
+
+ibd_input = Path("tests/test_inputs/simulated_ibd_test_data_v2_chr20.ibd.gz")
+
+target = Genes(20, 4666882, 4682236)
+
+
+@pytest.fixture()
+def ibd_table() -> pa.Table:
+    """Fixture that loads the test ibd file as an arrow table sorted by start position"""
+    ibd_df = pd.read_csv(ibd_input, sep="\t", header=None)
+    ibd_df.columns = [f"column{column_indx}" for column_indx in ibd_df.columns]
+
+    return pa.Table.from_pandas(
+        ibd_df.sort_values("column5", kind="stable"), preserve_index=False
+    )
+
+
+def _filter_file(ibd_file: Path) -> IbdFilter:
+    """Run the overlaps filter on the file and return the filter object"""
+    filter_obj = IbdFilter.load_file(ibd_file, HapIBD(), target, chunksize=5_000)
+    filter_obj.set_filter("overlaps")
+    filter_obj.preprocess(3)
+
+    return filter_obj
+
+
+def _formatted_segments(filter_obj: IbdFilter) -> list:
+    """Return the sorted haplotype pairs and lengths of the filtered segments"""
+    haplotypes = dict(
+        zip(
+            filter_obj.ibd_vs["idnum"],
+            filter_obj.haplotype_mapper().format_haplotypes(
+                filter_obj.ibd_vs["hapID"].to_numpy()
+            ),
+        )
+    )
+
+    return sorted(
+        zip(
+            filter_obj.ibd_pd["idnum1"].map(haplotypes),
+            filter_obj.ibd_pd["idnum2"].map(haplotypes),
+            filter_obj.ibd_pd["cm"],
+        )
+    )
+
+
+@pytest.mark.integtest
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_columnar_file_matches_text_file(tmp_path, ibd_table, file_format) -> None:
+    """Integration test that will make sure a Parquet or Arrow IPC copy of the ibd file gives the same edges and haplotypes as the text file"""
+    columnar_path = tmp_path / f"ibd.{file_format}"
+
+    if file_format == "parquet":
+        pq.write_table(ibd_table, columnar_path, row_group_size=2_000)
+    else:
+        feather.write_feather(ibd_table, columnar_path, chunksize=2_000)
+
+    errors = []
+
+    if columnar_format(columnar_path) != file_format:
+        errors.append(
+            f"Expected the file to be detected as {file_format}. Instead it was detected as {columnar_format(columnar_path)}"
+        )
+
+    # the columnar file is sorted by position so the segments are compared
+    # after sorting them the same way
+    text_filter, columnar_filter = [
+        _filter_file(ibd_file) for ibd_file in [ibd_input, columnar_path]
+    ]
+
+    text_segments, columnar_segments = [
+        _formatted_segments(filter_obj) for filter_obj in [text_filter, columnar_filter]
+    ]
+
+    if text_segments != columnar_segments:
+        errors.append(
+            f"Expected the {file_format} file to keep the same {len(text_segments)} segments as the text file. Instead {len(columnar_segments)} segments were kept"
+        )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.unit
+def test_parquet_row_groups_are_pruned(tmp_path, ibd_table) -> None:
+    """Unit test that will make sure the row groups of a position sorted Parquet file that can not overlap the target are skipped"""
+    parquet_path = tmp_path / "ibd.parquet"
+
+    pq.write_table(ibd_table, parquet_path, row_group_size=1_000)
+
+    read_segments = pd.concat(
+        read_ibd_parquet(
+            parquet_path, HapIBD(), 1_000, target.start, target.end, 3, target.chr
+        )
+    )
+
+    errors = []
+
+    if len(read_segments) >= ibd_table.num_rows:
+        errors.append(
+            f"Expected the row groups past the target to be skipped. Instead all {ibd_table.num_rows} segments were read"
+        )
+
+    outside_region = read_segments[
+        (read_segments[5] > target.end) | (read_segments[6] < target.start)
+    ]
+
+    if not outside_region.empty:
+        errors.append(
+            f"Expected every segment that was read to overlap the target region. Instead {len(outside_region)} segments were outside of it"
+        )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_columnar_file_is_closed_when_reading_stops_early(
+    tmp_path, ibd_table, monkeypatch, file_format
+) -> None:
+    """Unit test that will make sure the Parquet or Arrow IPC file is closed when the caller stops reading the segments before the end of the file"""
+    columnar_path = tmp_path / f"ibd.{file_format}"
+
+    opened_files = []
+
+    if file_format == "parquet":
+        pq.write_table(ibd_table, columnar_path, row_group_size=1_000)
+
+        class RecordedParquetFile(pq.ParquetFile):
+            def __init__(self, *args, **kwargs) -> None:
+                super().__init__(*args, **kwargs)
+                opened_files.append(self)
+
+        monkeypatch.setattr(pq, "ParquetFile", RecordedParquetFile)
+
+        reader = read_ibd_parquet
+    else:
+        feather.write_feather(ibd_table, columnar_path, chunksize=1_000)
+
+        memory_map = pa.memory_map
+
+        def recorded_memory_map(*args, **kwargs):
+            opened_files.append(memory_map(*args, **kwargs))
+            return opened_files[-1]
+
+        monkeypatch.setattr(pa, "memory_map", recorded_memory_map)
+
+        reader = read_ibd_ipc
+
+    segments = reader(columnar_path, HapIBD(), 100, 0, 2**31 - 1)
+
+    next(segments)
+    segments.close()
+
+    assert opened_files and all(
+        opened_file.closed for opened_file in opened_files
+    ), f"Expected the {file_format} file to be closed once the reader was closed"
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.network.filters.edge_accumulator import EdgeAccumulator
+
+
+@pytest.mark.unit
+def test_accumulator_grows_past_capacity() -> None:
+    """Unit test that will make sure the edges are kept in order when the arrays have to grow"""
+    accumulator = EdgeAccumulator(capacity=4)
+
+    for start in range(0, 10, 3):
+        ids = np.arange(start, start + 3)
+        accumulator.append(ids, ids + 1, ids / 2)
+
+    edges = accumulator.to_frame()
+
+    errors = []
+
+    if len(accumulator) != 12:
+        errors.append(
+            f"Expected 12 edges to be stored. Instead there were {len(accumulator)}"
+        )
+
+    if accumulator.capacity != 16:
+        errors.append(
+            f"Expected the capacity to double to 16. Instead it was {accumulator.capacity}"
+        )
+
+    if not np.array_equal(edges["idnum1"], np.arange(12)):
+        errors.append(
+            f"Expected idnum1 to be 0 to 11. Instead it was {edges['idnum1'].tolist()}"
+        )
+
+    if not np.allclose(edges["cm"], np.arange(12) / 2):
+        errors.append(
+            f"Expected the cm column to match the appended lengths. Instead it was {edges['cm'].tolist()}"
+        )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.unit
+def test_accumulator_spills_past_memory_limit() -> None:
+    """Unit test that will make sure the edges are moved to memory mapped files once the memory limit is exceeded"""
+    accumulator = EdgeAccumulator(capacity=4, memory_limit=100)
+
+    ids = np.arange(20)
+    accumulator.append(ids, ids + 1, ids / 2)
+
+    edges = accumulator.to_frame()
+
+    errors = []
+
+    if not accumulator.spilled:
+        errors.append("Expected the edges to be spilled to disk")
+
+    if not isinstance(accumulator.idnum1, np.memmap):
+        errors.append(
+            f"Expected idnum1 to be a memory mapped array. Instead it was a {type(accumulator.idnum1)}"
+        )
+
+    if not np.array_equal(edges["idnum2"], ids + 1):
+        errors.append(
+            f"Expected idnum2 to be 1 to 20. Instead it was {edges['idnum2'].tolist()}"
+        )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.network.cluster.cluster import EdgeIndex
+
+
+@pytest.mark.unit
+def test_network_edges_match_edge_scan() -> None:
+    """Unit test that will make sure the edges found through the edges of each member are the same edges, in the same order, as scanning every edge of the graph"""
+    rng = np.random.default_rng(3)
+
+    idnum1 = rng.integers(0, 40, 300).astype(np.int32)
+    idnum2 = rng.integers(0, 40, 300).astype(np.int32)
+    cm = rng.uniform(3, 20, 300).astype(np.float32)
+
+    edge_index = EdgeIndex.from_edges(idnum1, idnum2, cm, 45)
+
+    errors = []
+
+    for member_count in [1, 5, 20, 45]:
+        members = np.sort(rng.choice(45, member_count, replace=False))
+
+        expected_edges = np.flatnonzero(
+            np.isin(idnum1, members) & np.isin(idnum2, members)
+        )
+
+        network_edges = edge_index.network_edges(members)
+
+        if not np.array_equal(network_edges, expected_edges):
+            errors.append(
+                f"Expected the network with {member_count} members to have the edges {expected_edges.tolist()}. Instead it had {network_edges.tolist()}"
+            )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.network.cluster import ClusterHandler
+
+
+@pytest.mark.unit
+def test_graph_from_subset_of_vertices() -> None:
+    """Unit test that will make sure the edges of a subgraph are mapped to the positions of the vertex codes and that each vertex is named by its code"""
+    idnum1 = np.array([4, 7, 4], dtype=np.int32)
+    idnum2 = np.array([7, 9, 9], dtype=np.int32)
+    cm = np.array([3.5, 4.0, 5.25], dtype=np.float32)
+
+    graph = ClusterHandler.generate_graph(
+        idnum1, idnum2, cm, np.array([4, 7, 9], dtype=np.int32)
+    )
+
+    errors = []
+
+    if graph.vs["name"] != [4, 7, 9]:
+        errors.append(
+            f"Expected the vertices to be named 4, 7, and 9. Instead they were {graph.vs['name']}"
+        )
+
+    if graph.get_edgelist() != [(0, 1), (1, 2), (0, 2)]:
+        errors.append(
+            f"Expected the edges to be mapped to the vertex positions [(0, 1), (1, 2), (0, 2)]. Instead they were {graph.get_edgelist()}"
+        )
+
+    if graph.es["cm"] != [3.5, 4.0, 5.25]:
+        errors.append(
+            f"Expected the edges to keep the lengths [3.5, 4.0, 5.25]. Instead they were {graph.es['cm']}"
+        )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.unit
+def test_graph_without_vertices_uses_codes() -> None:
+    """Unit test that will make sure the codes are used as vertex ids when no vertices are provided"""
+    graph = ClusterHandler.generate_graph(
+        np.array([1, 2], dtype=np.int32),
+        np.array([2, 5], dtype=np.int32),
+        np.array([3.0, 4.0], dtype=np.float32),
+    )
+
+    assert graph.vcount() == 6 and graph.get_edgelist() == [
+        (1, 2),
+        (2, 5),
+    ], f"Expected 6 vertices with the edges [(1, 2), (2, 5)]. Instead there were {graph.vcount()} vertices with the edges {graph.get_edgelist()}"
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.network.filters.filter import read_ibd_text
+from drive.network.models.generate_indices import HapIBD
+
+ibd_input = Path("tests/test_inputs/simulated_ibd_test_data_v2_chr20.ibd.gz")
+
+
+@pytest.mark.unit
+def test_reader_only_parses_declared_columns() -> None:
+    """Unit test that will make sure the text reader only parses the columns declared by the FileIndices object with the declared dtypes"""
+    indices = HapIBD()
+
+    column_dtypes = indices.column_dtypes()
+
+    chunk = next(read_ibd_text(ibd_input, indices, 1_000))
+
+    errors = []
+
+    if sorted(chunk.columns) != sorted(column_dtypes.keys()):
+        errors.append(
+            f"Expected only the columns {sorted(column_dtypes.keys())} to be read. Instead the columns were {list(chunk.columns)}"
+        )
+
+    for column, dtype in column_dtypes.items():
+        if str(chunk[column].dtype) != dtype.split("[")[0]:
+            errors.append(
+                f"Expected column {column} to have the dtype {dtype}. Instead it was {chunk[column].dtype}"
+            )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.network.models import HaplotypeMapper, create_indices, pack_haplotypes
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "ibd_program,data,expected_haplotypes",
+    [
+        (
+            "hapibd",
+            pd.DataFrame({0: ["ID1", "ID2"], 1: [1, 2]}),
+            ["ID1.1", "ID2.2"],
+        ),
+        (
+            "germline",
+            pd.DataFrame({0: ["ID1", "ID2"], 1: ["ID1.0", "ID2_1"]}),
+            ["ID1.0", "ID2_1"],
+        ),
+    ],
+)
+def test_haplotype_keys_round_trip(
+    ibd_program: str, data: pd.DataFrame, expected_haplotypes: list
+) -> None:
+    """Unit test that will make sure the haplotype strings can be rebuilt from the integer keys"""
+    indices = create_indices(ibd_program)
+
+    samples, phases = indices.get_haplotype_parts(data, 0, 1)
+
+    mapper = HaplotypeMapper(
+        pack_haplotypes(np.arange(len(samples)), phases),
+        samples.to_numpy(dtype=object),
+        indices,
+    )
+
+    haplotypes, member_ids = mapper.map_ids([0, 1])
+
+    errors = []
+
+    if haplotypes != expected_haplotypes:
+        errors.append(
+            f"Expected the haplotypes {expected_haplotypes} to be rebuilt from the keys. Instead the haplotypes were {haplotypes}"
+        )
+
+    if member_ids != {"ID1", "ID2"}:
+        errors.append(
+            f"Expected the member ids to be ID1 and ID2. Instead they were {member_ids}"
+        )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
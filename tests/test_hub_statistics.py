@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.network.cluster import ClusterHandler
+
+
+def _expected_hub_statistics(edges: pd.DataFrame, members: list) -> pd.DataFrame:
+    """Find the connectivity of each member by scanning the edges for every
+    member"""
+    rows = []
+
+    for idnum in members:
+        member_edges = edges[(edges["idnum1"] == idnum) | (edges["idnum2"] == idnum)]
+
+        neighbors = list(edges.loc[edges["idnum1"] == idnum, "idnum2"]) + list(
+            edges.loc[edges["idnum2"] == idnum, "idnum1"]
+        )
+
+        neighbor_edges = len(
+            edges[edges["idnum1"].isin(neighbors) & edges["idnum2"].isin(neighbors)]
+        )
+
+        if len(neighbors) == 1:
+            connected_ratio = 1.0
+        else:
+            connected_ratio = neighbor_edges / (
+                len(neighbors) * (len(neighbors) - 1) / 2
+            )
+
+        rows.append(
+            [
+                idnum,
+                sum(1 / member_edges["cm"].to_numpy(dtype=np.float64)),
+                len(neighbors),
+                connected_ratio,
+            ]
+        )
+
+    return pd.DataFrame(rows, columns=["idnum", "conn", "conn.N", "TP"], index=members)
+
+
+@pytest.mark.unit
+def test_hub_statistics_match_member_scan() -> None:
+    """Unit test that will make sure the connectivity of every member matches scanning the edges of each member on a graph with repeated edges and self loops"""
+    rng = np.random.default_rng(12)
+
+    idnum1 = rng.integers(0, 25, 150).astype(np.int32)
+    idnum2 = rng.integers(0, 25, 150).astype(np.int32)
+    cm = rng.uniform(3, 20, 150).astype(np.float32)
+
+    edges = pd.DataFrame({"idnum1": idnum1, "idnum2": idnum2, "cm": cm})
+
+    members = sorted(set(idnum1.tolist()) | set(idnum2.tolist()))
+
+    hub_statistics = ClusterHandler._hub_statistics(idnum1, idnum2, cm, members)
+
+    pd.testing.assert_frame_equal(
+        hub_statistics,
+        _expected_hub_statistics(edges, members),
+        check_dtype=False,
+        check_index_type=False,
+    )
+
+
+@pytest.mark.unit
+def test_hub_statistics_reject_member_without_edges() -> None:
+    """Unit test that will make sure a member without any edges in the network raises a ZeroDivisionError"""
+    with pytest.raises(ZeroDivisionError):
+        ClusterHandler._hub_statistics(
+            np.array([0, 1], dtype=np.int32),
+            np.array([1, 2], dtype=np.int32),
+            np.array([3.0, 4.0], dtype=np.float32),
+            [0, 1, 2, 3],
+        )
@@ -0,0 +1,130 @@
+import gzip
+import logging
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.network.filters import IbdFilter
+from drive.network.filters import filter as filter_module
+from drive.network.models import Genes
+from drive.network.models.generate_indices import HapIBD
+
+ibd_input = Path("tests/test_inputs/simulated_ibd_test_data_v2_chr20.ibd.gz")
+
+
+@pytest.fixture()
+def split_ibd_files(tmp_path) -> List[Path]:
+    """Fixture that splits the test ibd file into three files like a file per sample batch"""
+    with gzip.open(ibd_input, "rt") as ibd_file:
+        lines = ibd_file.readlines()
+
+    split_size = len(lines) // 3 + 1
+
+    split_files = []
+
+    for file_indx, start in enumerate(range(0, len(lines), split_size)):
+        output_path = tmp_path / f"batch{file_indx}.ibd"
+        output_path.write_text("".join(lines[start : start + split_size]))
+        split_files.append(output_path)
+
+    return split_files
+
+
+@pytest.mark.integtest
+@pytest.mark.parametrize("threads", [1, 2])
+def test_multiple_files_match_single_file(split_ibd_files, threads) -> None:
+    """Integration test that will make sure reading the split files gives the same edges and haplotypes as reading the original file"""
+    target = Genes(20, 4666882, 4682236)
+
+    filters = []
+
+    for ibd_files in [ibd_input, split_ibd_files]:
+        filter_obj = IbdFilter.load_file(
+            ibd_files, HapIBD(), target, chunksize=5_000, threads=threads
+        )
+        filter_obj.set_filter("overlaps")
+        filter_obj.preprocess(3)
+        filters.append(filter_obj)
+
+    single_filter, split_filter = filters
+
+    pd.testing.assert_frame_equal(single_filter.ibd_pd, split_filter.ibd_pd)
+
+    single_haplotypes, split_haplotypes = [
+        filter_obj.haplotype_mapper().format_haplotypes(
+            filter_obj.ibd_vs["hapID"].to_numpy()
+        )
+        for filter_obj in filters
+    ]
+
+    assert (
+        single_haplotypes == split_haplotypes
+    ), "Expected the split files to have the same haplotypes as the original file"
+
+
+@pytest.mark.integtest
+def test_file_workers_use_memory_limit_and_prefetch(
+    split_ibd_files, monkeypatch
+) -> None:
+    """Integration test that will make sure the edges of the files read in the main process use the memory limit, prefetch the chunks, give the same edges as the original file, and clear the worker settings once the files are read"""
+    target = Genes(20, 4666882, 4682236)
+
+    memory_limits = []
+
+    segments = IbdFilter._segments
+
+    def record_memory_limit(self):
+        memory_limits.append(self.edges.memory_limit)
+        return segments(self)
+
+    monkeypatch.setattr(IbdFilter, "_segments", record_memory_limit)
+
+    single_filter = IbdFilter.load_file(ibd_input, HapIBD(), target, chunksize=5_000)
+    single_filter.set_filter("overlaps")
+    single_filter.preprocess(3)
+
+    split_filter = IbdFilter.load_file(
+        split_ibd_files, HapIBD(), target, chunksize=5_000, threads=1
+    )
+    split_filter.edges.memory_limit = 1024
+    split_filter.set_filter("overlaps")
+    split_filter.preprocess(3, prefetch=2)
+
+    errors = []
+
+    if memory_limits != [1024] * len(split_ibd_files):
+        errors.append(
+            f"Expected the edges of every file to have a memory limit of 1024 bytes. Instead the files had the memory limits {memory_limits}"
+        )
+
+    if filter_module._RANGE_SETTINGS:
+        errors.append(
+            f"Expected the worker settings to be cleared after the files were read. Instead they had the keys {list(filter_module._RANGE_SETTINGS)}"
+        )
+
+    if not single_filter.ibd_pd.equals(split_filter.ibd_pd):
+        errors.append(
+            "Expected the split files to have the same edges as the original file"
+        )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.unit
+def test_index_file_is_ignored_with_warning(split_ibd_files, tmp_path, caplog) -> None:
+    """Unit test that will make sure a warning is logged when an ibd index is provided with more than one ibd file because the index can only describe one file"""
+    with caplog.at_level(logging.WARNING):
+        IbdFilter.load_file(
+            split_ibd_files,
+            HapIBD(),
+            Genes(20, 4666882, 4682236),
+            index_file=tmp_path / "batch0.ibd.drive_index",
+        )
+
+    assert (
+        "ibd index" in caplog.text and "is ignored" in caplog.text
+    ), "Expected a warning that the ibd index is ignored when more than one ibd file is provided"
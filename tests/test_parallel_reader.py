@@ -0,0 +1,97 @@
+import gzip
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.network.filters import IbdFilter
+from drive.network.filters.filter import read_ibd_text
+from drive.network.filters.parallel_reader import split_byte_ranges
+from drive.network.models import Genes
+from drive.network.models.generate_indices import HapIBD
+
+ibd_input = Path("tests/test_inputs/simulated_ibd_test_data_v2_chr20.ibd.gz")
+
+
+@pytest.fixture()
+def uncompressed_ibd(tmp_path) -> Path:
+    """Fixture that decompresses the test ibd file because byte ranges can only be used with uncompressed files"""
+    output_path = tmp_path / "test.ibd"
+
+    with gzip.open(ibd_input, "rb") as compressed, open(output_path, "wb") as output:
+        shutil.copyfileobj(compressed, output)
+
+    return output_path
+
+
+@pytest.mark.unit
+def test_byte_ranges_split_on_lines(uncompressed_ibd) -> None:
+    """Unit test that will make sure the byte ranges cover the whole file and that every range starts at the beginning of a line"""
+    byte_ranges = split_byte_ranges(uncompressed_ibd, 7)
+
+    file_bytes = uncompressed_ibd.read_bytes()
+
+    errors = []
+
+    if byte_ranges[0].start != 0 or byte_ranges[-1].end != len(file_bytes):
+        errors.append(
+            f"Expected the byte ranges to cover the whole file. Instead they started at {byte_ranges[0].start} and ended at {byte_ranges[-1].end}"
+        )
+
+    for byte_range in byte_ranges[1:]:
+        if file_bytes[byte_range.start - 1 : byte_range.start] != b"\n":
+            errors.append(
+                f"Expected the byte range starting at {byte_range.start} to start after a newline"
+            )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.integtest
+def test_parallel_preprocess_matches_serial(uncompressed_ibd) -> None:
+    """Integration test that will make sure reading the file in parallel gives the same edges and haplotype ids as reading it with one process"""
+    target = Genes(20, 4666882, 4682236)
+
+    filters = []
+
+    for threads in [1, 3]:
+        filter_obj = IbdFilter.load_file(
+            uncompressed_ibd, HapIBD(), target, chunksize=5_000, threads=threads
+        )
+        filter_obj.set_filter("overlaps")
+        filter_obj.preprocess(3)
+        filters.append(filter_obj)
+
+    serial_filter, parallel_filter = filters
+
+    pd.testing.assert_frame_equal(serial_filter.ibd_pd, parallel_filter.ibd_pd)
+    # The haplotype keys depend on the order that the samples were interned so
+    # the haplotype strings rebuilt from the keys are compared instead
+    pd.testing.assert_frame_equal(
+        serial_filter.ibd_vs[["idnum", "IID"]], parallel_filter.ibd_vs[["idnum", "IID"]]
+    )
+
+    serial_haplotypes, parallel_haplotypes = [
+        filter_obj.haplotype_mapper().format_haplotypes(
+            filter_obj.ibd_vs["hapID"].to_numpy()
+        )
+        for filter_obj in filters
+    ]
+
+    assert (
+        serial_haplotypes == parallel_haplotypes
+    ), "Expected the parallel reader to find the same haplotypes as the serial reader"
+
+
+@pytest.mark.unit
+def test_memory_mapped_reader_matches_buffered_reader(uncompressed_ibd) -> None:
+    """Unit test that will make sure memory mapping the uncompressed file gives the same segments as reading it through a file buffer"""
+    buffered_chunks, mapped_chunks = [
+        pd.concat(read_ibd_text(uncompressed_ibd, HapIBD(), 5_000, memory_map))
+        for memory_map in [False, True]
+    ]
+
+    pd.testing.assert_frame_equal(buffered_chunks, mapped_chunks)
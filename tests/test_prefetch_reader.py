@@ -0,0 +1,80 @@
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.network.filters import IbdFilter
+from drive.network.filters.prefetch_reader import prefetch_chunks
+from drive.network.models import Genes
+from drive.network.models.generate_indices import HapIBD
+
+ibd_input = Path("tests/test_inputs/simulated_ibd_test_data_v2_chr20.ibd.gz")
+
+
+def _reader_threads() -> list:
+    """Return the prefetch threads that are still running"""
+    return [
+        thread for thread in threading.enumerate() if thread.name == "drive-ibd-reader"
+    ]
+
+
+@pytest.mark.unit
+def test_prefetch_keeps_order_and_stops_early() -> None:
+    """Unit test that will make sure the prefetched chunks are returned in order and that the reader thread stops when the consumer stops early"""
+    chunks = [pd.DataFrame({0: [chunk_indx]}) for chunk_indx in range(20)]
+
+    errors = []
+
+    prefetched = [chunk.iloc[0, 0] for chunk in prefetch_chunks(iter(chunks), 2)]
+
+    if prefetched != list(range(20)):
+        errors.append(
+            f"Expected the chunks to be returned in order. Instead the order was {prefetched}"
+        )
+
+    early_stop = prefetch_chunks(iter(chunks), 2)
+
+    next(early_stop)
+
+    early_stop.close()
+
+    if _reader_threads():
+        errors.append(
+            "Expected the reader thread to stop after the prefetching generator was closed"
+        )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.unit
+def test_prefetch_raises_reader_errors() -> None:
+    """Unit test that will make sure an error raised while reading a chunk is raised in the consumer's thread"""
+
+    def failing_chunks():
+        yield pd.DataFrame({0: [1]})
+        raise ValueError("malformed line")
+
+    with pytest.raises(ValueError, match="malformed line"):
+        list(prefetch_chunks(failing_chunks(), 2))
+
+
+@pytest.mark.integtest
+def test_prefetch_matches_serial_read() -> None:
+    """Integration test that will make sure prefetching the chunks gives the same edges as reading and filtering the chunks in one thread"""
+    target = Genes(20, 4666882, 4682236)
+
+    filters = []
+
+    for prefetch in [0, 2]:
+        filter_obj = IbdFilter.load_file(ibd_input, HapIBD(), target, chunksize=5_000)
+        filter_obj.set_filter("overlaps")
+        filter_obj.preprocess(3, prefetch=prefetch)
+        filters.append(filter_obj)
+
+    serial_filter, prefetch_filter = filters
+
+    pd.testing.assert_frame_equal(serial_filter.ibd_pd, prefetch_filter.ibd_pd)
+    pd.testing.assert_frame_equal(serial_filter.ibd_vs, prefetch_filter.ibd_vs)
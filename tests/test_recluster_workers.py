@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.network.cluster import ClusterHandler, cluster
+from drive.network.filters import IbdFilter
+from drive.network.models import Genes
+from drive.network.models.generate_indices import HapIBD
+
+ibd_input = Path("tests/test_inputs/simulated_ibd_test_data_v2_chr20.ibd.gz")
+
+
+@pytest.mark.integtest
+def test_worker_pool_matches_serial_reclustering() -> None:
+    """Integration test that will make sure reclustering the networks in a pool of worker processes gives the same networks in the same order as reclustering them in the main process"""
+    filter_obj = IbdFilter.load_file(ibd_input, HapIBD(), Genes(20, 4666882, 4682236))
+    filter_obj.set_filter("contains")
+    filter_obj.preprocess(3)
+
+    results = []
+
+    for workers in [1, 3]:
+        cluster_handler = ClusterHandler(
+            0.5, 10, 5, 3, 3, 0.2, 0.01, filter_obj.haplotype_mapper(), True, workers
+        )
+
+        networks = cluster(filter_obj, cluster_handler)
+
+        results.append(
+            [
+                (
+                    network.clst_id,
+                    network.true_positive_count,
+                    network.haplotypes,
+                    network.print_members_list(),
+                )
+                for network in networks
+            ]
+        )
+
+    serial_networks, pool_networks = results
+
+    errors = []
+
+    if cluster_handler.check_times == 0:
+        errors.append("Expected the test region to have networks that are reclustered")
+
+    if serial_networks != pool_networks:
+        errors.append(
+            "Expected the worker pool to find the same networks in the same order as the main process"
+        )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
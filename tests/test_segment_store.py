@@ -0,0 +1,196 @@
+import gzip
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.network.filters.filter import read_ibd_text
+from drive.network.filters.segment_store import (
+    load_index_metadata,
+    read_segment_index,
+    read_segment_store,
+    segment_store_path,
+    store_columns,
+    write_segment_index,
+    write_segment_store,
+)
+from drive.network.models.generate_indices import HapIBD
+
+hapibd = HapIBD()
+
+ibd_input = Path("tests/test_inputs/simulated_ibd_test_data_v2_chr20.ibd.gz")
+
+
+@pytest.fixture()
+def multi_chromosome_ibd(tmp_path) -> Path:
+    """Fixture that writes the test ibd file with the segments split into
+    blocks on chromosomes 19, 20, and 21 so that each chunk has a different
+    set of chromosomes"""
+    output_path = tmp_path / "multi_chromosome.ibd.gz"
+
+    with gzip.open(ibd_input, "rt") as ibd_fh, gzip.open(output_path, "wt") as output:
+        for line_number, line in enumerate(ibd_fh):
+            fields = line.split("\t")
+            fields[hapibd.chr_indx] = ["19", "20", "21"][(line_number // 7_000) % 3]
+            output.write("\t".join(fields))
+
+    return output_path
+
+
+@pytest.mark.unit
+def test_store_path_changes_with_format(tmp_path) -> None:
+    """Unit test that will make sure the cache key includes the file format"""
+    from drive.network.models.generate_indices import Rapid
+
+    hapibd_path = segment_store_path(tmp_path, ibd_input, hapibd)
+    rapid_path = segment_store_path(tmp_path, ibd_input, Rapid())
+
+    assert (
+        hapibd_path != rapid_path
+    ), f"Expected the cache paths for two formats to differ. Instead both were {hapibd_path}"
+
+
+@pytest.mark.unit
+def test_store_round_trip(tmp_path) -> None:
+    """Unit test that will make sure the segments read from the store are the same as the segments parsed from the text file"""
+    store_path = segment_store_path(tmp_path, ibd_input, hapibd)
+
+    segment_count = write_segment_store(
+        read_ibd_text(ibd_input, hapibd, 10_000), store_path, hapibd
+    )
+
+    expected = pd.concat(read_ibd_text(ibd_input, hapibd, 10_000), ignore_index=True)[
+        store_columns(hapibd)
+    ]
+
+    cached = pd.concat(read_segment_store(store_path, 10_000), ignore_index=True)
+
+    assert segment_count == expected.shape[0]
+
+    pd.testing.assert_frame_equal(cached, expected, check_dtype=False)
+
+
+@pytest.mark.unit
+def test_index_reads_overlapping_segments(tmp_path) -> None:
+    """Unit test that will make sure the index returns every segment that overlaps the region while skipping blocks that can not overlap it"""
+    index_path = tmp_path / "test.drive_index"
+
+    write_segment_index(
+        read_ibd_text(ibd_input, hapibd, 10_000),
+        ibd_input,
+        index_path,
+        hapibd,
+        block_size=2_000,
+    )
+
+    block_stats = load_index_metadata(index_path, ibd_input, hapibd)
+
+    region_start, region_end = 4666882, 4682236
+
+    indexed = pd.concat(
+        read_segment_index(
+            index_path, block_stats, hapibd, 10_000, region_start, region_end
+        ),
+        ignore_index=True,
+    )
+
+    segments = pd.concat(read_ibd_text(ibd_input, hapibd, 10_000), ignore_index=True)
+
+    overlapping = segments[
+        (segments[hapibd.str_indx] <= region_end)
+        & (segments[hapibd.end_indx] >= region_start)
+    ]
+
+    indexed_overlapping = indexed[
+        (indexed[hapibd.str_indx] <= region_end)
+        & (indexed[hapibd.end_indx] >= region_start)
+    ]
+
+    errors = []
+
+    if indexed_overlapping.shape[0] != overlapping.shape[0]:
+        errors.append(
+            f"Expected the index to return {overlapping.shape[0]} overlapping segments. Instead it returned {indexed_overlapping.shape[0]}"
+        )
+
+    if indexed.shape[0] >= segments.shape[0]:
+        errors.append(
+            f"Expected the index to skip blocks that can not overlap the region. Instead all {segments.shape[0]} segments were read"
+        )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.unit
+def test_store_round_trip_with_several_chromosomes(
+    tmp_path, multi_chromosome_ibd
+) -> None:
+    """Unit test that will make sure a file with a different set of chromosomes in each chunk can be written to the store and read back"""
+    store_path = segment_store_path(tmp_path, multi_chromosome_ibd, hapibd)
+
+    write_segment_store(
+        read_ibd_text(multi_chromosome_ibd, hapibd, 10_000), store_path, hapibd
+    )
+
+    expected = pd.concat(
+        read_ibd_text(multi_chromosome_ibd, hapibd, 10_000), ignore_index=True
+    )[store_columns(hapibd)]
+
+    cached = pd.concat(read_segment_store(store_path, 10_000), ignore_index=True)
+
+    pd.testing.assert_frame_equal(cached, expected, check_dtype=False)
+
+
+@pytest.mark.unit
+def test_index_returns_segments_in_file_order(tmp_path, multi_chromosome_ibd) -> None:
+    """Unit test that will make sure the index returns the segments on the target chromosome that overlap the region in the same order as the ibd file"""
+    index_path = tmp_path / "multi_chromosome.drive_index"
+
+    write_segment_index(
+        read_ibd_text(multi_chromosome_ibd, hapibd, 10_000),
+        multi_chromosome_ibd,
+        index_path,
+        hapibd,
+        block_size=2_000,
+    )
+
+    block_stats = load_index_metadata(index_path, multi_chromosome_ibd, hapibd)
+
+    region_start, region_end = 4666882, 4682236
+
+    indexed = pd.concat(
+        read_segment_index(
+            index_path, block_stats, hapibd, 10_000, region_start, region_end, "20"
+        ),
+        ignore_index=True,
+    )
+
+    segments = pd.concat(
+        read_ibd_text(multi_chromosome_ibd, hapibd, 10_000), ignore_index=True
+    )[store_columns(hapibd)]
+
+    expected = segments[
+        (segments[hapibd.chr_indx] == "20")
+        & (segments[hapibd.str_indx] <= region_end)
+        & (segments[hapibd.end_indx] >= region_start)
+    ].reset_index(drop=True)
+
+    indexed_on_target = indexed[indexed[hapibd.chr_indx] == "20"].reset_index(drop=True)
+
+    errors = []
+
+    if indexed.shape[0] != indexed_on_target.shape[0]:
+        errors.append(
+            f"Expected the index to skip the blocks on the other chromosomes. Instead {indexed.shape[0] - indexed_on_target.shape[0]} segments on other chromosomes were read"
+        )
+
+    try:
+        pd.testing.assert_frame_equal(indexed_on_target, expected, check_dtype=False)
+    except AssertionError as e:
+        errors.append(
+            f"Expected the index to return the overlapping segments in file order. {e}"
+        )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.network.filters.sorted_positions import SortedPositionTracker
+from drive.network.models import Genes
+
+
+@pytest.mark.unit
+def test_tracker_passes_targets_in_sorted_file() -> None:
+    """Unit test that will make sure the tracker only reports that the targets were passed once the start positions are past the end of every target"""
+    tracker = SortedPositionTracker.from_targets(
+        [Genes("20", 100, 200), Genes("20", 150, 400)]
+    )
+
+    errors = []
+
+    tracker.update(pd.Series(["20", "20", "21"]), pd.Series([50, 300, 10]))
+
+    if tracker.passed_targets():
+        errors.append(
+            "Expected the targets to not be passed because the second target ends at 400"
+        )
+
+    tracker.update(pd.Series(["20", "20"]), pd.Series([350, 450]))
+
+    if not tracker.passed_targets():
+        errors.append(
+            "Expected the targets to be passed once a segment started after 400"
+        )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.unit
+def test_tracker_detects_unsorted_file() -> None:
+    """Unit test that will make sure the tracker never reports that the targets were passed if the start positions decrease between chunks"""
+    tracker = SortedPositionTracker.from_targets([Genes("20", 100, 200)])
+
+    tracker.update(pd.Series([20, 20]), pd.Series([50, 150]))
+    tracker.update(pd.Series([20, 20]), pd.Series([120, 500]))
+
+    errors = []
+
+    if tracker.is_sorted:
+        errors.append("Expected the decreasing start position to be detected")
+
+    if tracker.passed_targets():
+        errors.append("Expected the targets to not be passed in an unsorted file")
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
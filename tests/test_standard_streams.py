@@ -0,0 +1,72 @@
+import io
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser
+from drive.network.filters import IbdFilter
+from drive.network.models import Genes
+from drive.network.models.generate_indices import HapIBD
+
+ibd_input = Path("tests/test_inputs/simulated_ibd_test_data_v2_chr20.ibd.gz")
+
+
+@pytest.mark.integtest
+def test_stdin_matches_file(monkeypatch) -> None:
+    """Integration test that will make sure streaming the gzipped ibd file through standard input gives the same edges as reading the file"""
+    target = Genes(20, 4666882, 4682236)
+
+    monkeypatch.setattr(
+        "sys.stdin",
+        io.TextIOWrapper(io.BufferedReader(io.BytesIO(ibd_input.read_bytes()))),
+    )
+
+    filters = []
+
+    for ibd_file in [ibd_input, Path("-")]:
+        filter_obj = IbdFilter.load_file(ibd_file, HapIBD(), target, chunksize=5_000)
+        filter_obj.set_filter("overlaps")
+        filter_obj.preprocess(3)
+        filters.append(filter_obj)
+
+    file_filter, stdin_filter = filters
+
+    pd.testing.assert_frame_equal(file_filter.ibd_pd, stdin_filter.ibd_pd)
+
+
+@pytest.mark.unit
+def test_stdin_can_not_be_combined_with_files() -> None:
+    """Unit test that will make sure the parser exits if standard input is provided with other input files"""
+    parser = generate_cmd_parser()
+
+    with pytest.raises(SystemExit):
+        parser.parse_args(
+            ["cluster", "-i", "-", str(ibd_input), "-t", "20:1-2", "-o", "-"]
+        )
+
+
+@pytest.mark.unit
+def test_dendrogram_rejects_stdin(capsys) -> None:
+    """Unit test that will make sure the parser exits if the dendrogram ibd input is streamed from standard input because the input is read once for every network"""
+    parser = generate_cmd_parser()
+
+    with pytest.raises(SystemExit):
+        parser.parse_args(
+            [
+                "dendrogram",
+                "-i",
+                str(ibd_input),
+                "--ibd",
+                "-",
+                "-t",
+                "20:1-2",
+                "-f",
+                "hapibd",
+            ]
+        )
+
+    assert (
+        "can not be streamed from standard input" in capsys.readouterr().out
+    ), "Expected the parser to explain that the dendrogram ibd input can not be read from standard input"
@@ -0,0 +1,47 @@
+import pytest
+
+# The parser module has to be imported first to avoid a circular import
+from drive.utilities.parser import generate_cmd_parser  # noqa: F401
+from drive.utilities.functions import load_target_file, target_span
+
+
+@pytest.mark.unit
+def test_bed_positions_are_converted(tmp_path) -> None:
+    """Unit test that will make sure the 0-based BED start positions are converted to the 1-based positions used by the --target argument"""
+    bed_file = tmp_path / "targets.bed"
+    bed_file.write_text(
+        "track name=genes\nchr20\t4666881\t4682236\tgeneA\n20\t29999999\t31000000\n"
+    )
+
+    targets = load_target_file(bed_file)
+
+    errors = []
+
+    if (targets[0].chr, targets[0].start, targets[0].end) != (20, 4666882, 4682236):
+        errors.append(
+            f"Expected the first target to be chr20:4666882-4682236. Instead it was {targets[0]}"
+        )
+
+    if targets[1].name != "chr20_30000000_31000000":
+        errors.append(
+            f"Expected the unnamed target to have the name chr20_30000000_31000000. Instead it was named {targets[1].name}"
+        )
+
+    span = target_span(targets)
+
+    if (span.chr, span.start, span.end) != (20, 4666882, 31000000):
+        errors.append(
+            f"Expected the span of the targets to be chr20:4666882-31000000. Instead it was {span}"
+        )
+
+    assert not errors, "errors occured:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.unit
+def test_duplicate_target_names(tmp_path) -> None:
+    """Unit test that will make sure a ValueError is raised if two targets have the same name"""
+    bed_file = tmp_path / "targets.bed"
+    bed_file.write_text("20\t100\t200\tgeneA\n20\t300\t400\tgeneA\n")
+
+    with pytest.raises(ValueError):
+        load_target_file(bed_file)